@@ -7,6 +7,42 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def run_sidecar():
+    import signal
+    from core.config import load_config
+    from services.sidecar import SidecarServer
+    from web.dependencies import create_sidecar_service
+
+    # Stopped with SIGTERM: exit through serve_forever so the socket is removed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    config = load_config()
+    service = create_sidecar_service(config)
+    try:
+        SidecarServer(service, config.sidecar_path).serve_forever()
+    finally:
+        # Its workers are joined at exit, so the pool has to be shut down first.
+        if service.repository.parallel is not None:
+            service.repository.parallel.close()
+
+
+def start_sidecar():
+    import multiprocessing
+
+    # Spawned, so it doesn't inherit the parent's threads or sockets. Not a daemon:
+    # daemonic processes can't start the parallel filter's worker processes.
+    process = multiprocessing.get_context("spawn").Process(target=run_sidecar, name="siem-sidecar")
+    process.start()
+    return process
+
+
+def stop_sidecar(process, timeout: float = 5.0):
+    process.terminate()
+    process.join(timeout)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="SIEM Web Interface - Security Event Monitoring"
@@ -27,6 +63,16 @@ def main():
         action="store_true",
         help="Enable auto-reload for development"
     )
+    parser.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Start the aggregation sidecar alongside the web server (needs SIEM_SIDECAR_PATH)"
+    )
+    parser.add_argument(
+        "--sidecar-only",
+        action="store_true",
+        help="Run only the aggregation sidecar (needs SIEM_SIDECAR_PATH)"
+    )
     
     args = parser.parse_args()
     
@@ -40,6 +86,19 @@ def main():
         print("Error: SIEM_ADMIN_PASSWORD environment variable is required")
         print("Set it with: export SIEM_ADMIN_PASSWORD='your_password'")
         sys.exit(1)
+
+    if (args.sidecar or args.sidecar_only) and not os.environ.get("SIEM_SIDECAR_PATH"):
+        print("Error: SIEM_SIDECAR_PATH environment variable is required for the sidecar")
+        sys.exit(1)
+
+    if args.sidecar_only:
+        try:
+            run_sidecar()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    sidecar = start_sidecar() if args.sidecar else None
     
     try:
         import uvicorn
@@ -69,6 +128,9 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if sidecar is not None:
+            stop_sidecar(sidecar)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+import random
+from typing import Any, Dict, List
+
+EVENT_TYPES = [
+    "user_login", "authentication_failure", "ssh_connection",
+    "process_start", "file_access", "network_connection"
+]
+SEVERITIES = ["low", "medium", "high", "critical"]
+
+
+def synthetic_events(count: int, start: int = 0, seed: int = 1) -> List[Dict[str, Any]]:
+    # Shaped like agent output: a few hundred hosts, mixed timestamp formats,
+    # the odd missing field, extra key and unparseable timestamp.
+    rnd = random.Random(seed)
+    events = []
+    for i in range(start, start + count):
+        suffix = ("Z", "", ".123Z")[i % 3]
+        event = {
+            "_id": i,
+            "timestamp": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:{i * 7 % 60:02d}{suffix}",
+            "hostname": f"host-{rnd.randrange(200)}",
+            "source": rnd.choice(["syslog", "auditd", "winlog"]),
+            "event_type": rnd.choice(EVENT_TYPES),
+            "severity": rnd.choice(SEVERITIES),
+            "user": rnd.choice([None, "root", "alice", "bob", f"svc{rnd.randrange(50)}"]),
+            "process": rnd.choice(["sshd", "bash", "python", "nginx", None]),
+            "command": f"cmd --id {rnd.randrange(10 ** 6)}",
+            "raw_log": f"kernel: event {i} " + "x" * rnd.randrange(50, 250),
+            "agent_last_seen": f"2024-06-{1 + i % 28:02d}T00:00:00Z",
+        }
+        if i % 50 == 0:
+            event["extra"] = {"k": i}
+        if i % 97 == 0:
+            del event["user"]
+        if i % 101 == 0:
+            event["timestamp"] = "garbage"
+        events.append(event)
+    return events
@@ -0,0 +1,76 @@
+# FrameDecoder against the `+=` receive loop it replaced, over a socketpair.
+#
+#     python -m benchmarks.message_framing [response sizes in MB, default 1 10]
+import json
+import socket
+import sys
+import threading
+import time
+from typing import Any, Callable, List
+
+from benchmarks.events import synthetic_events
+from core.message_framing import FrameDecoder, MessageFraming
+
+REPEATS = 5
+
+
+def main(sizes: List[float]) -> None:
+    for size in sizes:
+        body = _response_body(int(size * 1024 * 1024))
+        frame = MessageFraming.frame_message(body)
+        expected = json.loads(body)
+        print(f"{len(frame) / 2 ** 20:.1f} MB response")
+        for name, receive in (("FrameDecoder", _decoder_receive), ("+= loop", _concatenating_receive)):
+            seconds = min(_receive_once(frame, receive, expected) for _ in range(REPEATS))
+            print(f"  {name:12} {seconds * 1000:8.1f} ms (best of {REPEATS})")
+
+
+def _response_body(size: int) -> str:
+    # As close to size as the frame limit allows.
+    size = min(size, MessageFraming.MAX_MESSAGE_SIZE - 64 * 1024)
+    sample = synthetic_events(1000)
+    events = synthetic_events(int(size * len(sample) / len(json.dumps(sample))))
+    body = json.dumps({"status": "success", "data": events})
+    while len(body) > size:
+        del events[-max(1, len(events) // 100):]
+        body = json.dumps({"status": "success", "data": events})
+    return body
+
+
+def _receive_once(frame: bytes, receive: Callable[[socket.socket], Any], expected: Any) -> float:
+    reader, writer = socket.socketpair()
+    sender = threading.Thread(target=writer.sendall, args=(frame,))
+    try:
+        started = time.perf_counter()
+        sender.start()
+        result = receive(reader)
+        seconds = time.perf_counter() - started
+        sender.join()
+    finally:
+        reader.close()
+        writer.close()
+    if result != expected:
+        raise AssertionError("decoded response differs from what was sent")
+    return seconds
+
+
+def _decoder_receive(sock: socket.socket) -> Any:
+    decoder = FrameDecoder()
+    decoder.read_frame(sock)
+    return decoder.decode_json()
+
+
+# The client's receive loop before FrameDecoder: a new bytes object per chunk, and the header re-parsed every time.
+def _concatenating_receive(sock: socket.socket) -> Any:
+    data = b""
+    while not MessageFraming.has_complete_message(data):
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionResetError("Connection closed by peer")
+        data += chunk
+    message, _ = MessageFraming.extract_message(data)
+    return json.loads(message)
+
+
+if __name__ == "__main__":
+    main([float(arg) for arg in sys.argv[1:]] or [1, 10])
@@ -0,0 +1,80 @@
+# Memory and GC cost of holding search results: decoded dicts, SecurityEvent
+# instances and packed event rows, as EventListResults keeps them.
+#
+#     python -m benchmarks.models [event counts, default 50000]
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.events import synthetic_events
+from core.models import SecurityEvent, pack_event, unpack_event
+from data.search_results import EventListResults
+
+REPEATS = 5
+
+FORMS: Dict[str, Callable[[List[Dict[str, Any]]], List[Any]]] = {
+    "dicts": lambda documents: documents,
+    "SecurityEvent": lambda documents: [SecurityEvent.from_dict(d) for d in documents],
+    "packed rows": lambda documents: [pack_event(d) for d in documents],
+}
+
+
+def main(counts: List[int]) -> None:
+    for count in counts:
+        # Decoded from JSON, so every string is its own object as in a response.
+        raw = json.dumps(synthetic_events(count))
+        documents = json.loads(raw)
+        if [unpack_event(pack_event(d)) for d in documents] != documents:
+            raise AssertionError("packed rows don't give back the documents")
+
+        print(f"{count} events")
+        for name, convert in FORMS.items():
+            size = _bytes_per_event(raw, convert, count)
+            tracked, collect = _gc_cost(raw, convert)
+            print(
+                f"  {name:14} {size:6.0f} bytes/event  {tracked:7} tracked  "
+                f"full gc.collect {collect * 1000:6.1f} ms"
+            )
+
+        started = time.perf_counter()
+        results = EventListResults(documents)
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(100):
+            results.page(count // 2, 50)
+        paged = (time.perf_counter() - started) / 100
+        print(f"  EventListResults: built in {built * 1000:.1f} ms, 50-event page {paged * 1000:.3f} ms")
+
+
+def _bytes_per_event(raw: str, convert: Callable[[List[Dict[str, Any]]], List[Any]], count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        held = convert(json.loads(raw))
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del held
+    return size / count
+
+
+def _gc_cost(raw: str, convert: Callable[[List[Dict[str, Any]]], List[Any]]):
+    held = convert(json.loads(raw))
+    # A full collection untracks tuples that hold nothing the GC cares about.
+    gc.collect()
+    tracked = sum(1 for item in held if gc.is_tracked(item))
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        gc.collect()
+    seconds = (time.perf_counter() - started) / REPEATS
+    del held
+    gc.collect()
+    return tracked, seconds
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50000])
@@ -0,0 +1,96 @@
+# Compiled search predicate against the multi-pass filter it replaced.
+#
+#     python -m benchmarks.search_query [event counts, default 100000 1000000]
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.events import synthetic_events
+from data.search_query import SearchQuery, parse_search
+
+CASES = [
+    ("severity", {"severity": "high"}, None),
+    ("hostname + severity", {"hostname": "host-1", "severity": "high"}, None),
+    ("query 'root'", {"query": "root"}, None),
+    ("query regex", {"query": r"event \d+7 x"}, None),
+    ("date range + severity", {"start_date": "2024-03-01", "end_date": "2024-06-30", "severity": "critical"}, None),
+    ("all six filters", {
+        "query": "kernel", "hostname": "host-1", "start_date": "2024-02-01",
+        "end_date": "2024-11-30", "severity": "low", "event_type": "login",
+    }, None),
+    ("5-term q=", {}, 'host:host-1* severity:high -user:root "kernel" from:2024-02-01'),
+]
+
+_TEXT_FIELDS = ["hostname", "source", "event_type", "severity", "user", "process", "command", "raw_log"]
+
+
+def main(counts: List[int]) -> None:
+    for count in counts:
+        events = synthetic_events(count)
+        print(f"{count} events")
+        for name, filters, text in CASES:
+            compiled = SearchQuery.from_filters(**filters)
+            if text:
+                compiled = compiled & parse_search(text)
+            matched, seconds = _timed(lambda: compiled.filter(events))
+            line = f"  {name:24} compiled {seconds:6.2f}s"
+            if not text:
+                expected, before = _timed(lambda: _multi_pass_filter(events, **filters))
+                line += f"  multi-pass {before:6.2f}s  same result: {matched == expected}"
+            print(f"{line}  ({len(matched)} matched)")
+        del events
+
+
+def _timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+
+# The filter from before the query compiler: one pass per filter, strptime per event and pass.
+def _multi_pass_filter(
+    events: List[Dict[str, Any]],
+    query: Optional[str] = None,
+    hostname: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    severity: Optional[str] = None,
+    event_type: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    filtered = events
+    if query:
+        try:
+            pattern = re.compile(query)
+            filtered = [e for e in filtered if any(pattern.search(str(e.get(f, ""))) for f in _TEXT_FIELDS)]
+        except re.error:
+            filtered = [e for e in filtered if any(query in str(e.get(f, "")) for f in _TEXT_FIELDS)]
+    if hostname:
+        filtered = [e for e in filtered if hostname.lower() in str(e.get("hostname", "")).lower()]
+    if start_date:
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        filtered = [e for e in filtered if _parse_event_date(e.get("timestamp", "")) >= start]
+    if end_date:
+        end = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+        filtered = [e for e in filtered if _parse_event_date(e.get("timestamp", "")) <= end]
+    if severity:
+        filtered = [e for e in filtered if str(e.get("severity", "")).lower() == severity.lower()]
+    if event_type:
+        filtered = [e for e in filtered if event_type.lower() in str(e.get("event_type", "")).lower()]
+    return filtered
+
+
+def _parse_event_date(timestamp: str) -> datetime:
+    if not timestamp:
+        return datetime.min
+    for fmt in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+        try:
+            return datetime.strptime(timestamp.split(".")[0].replace("Z", ""), fmt)
+        except ValueError:
+            continue
+    return datetime.min
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100000, 1000000])
@@ -1,10 +1,11 @@
 from .models import SecurityEvent
 from .config import Config, load_config
-from .message_framing import MessageFraming
+from .message_framing import MessageFraming, FrameDecoder
 
 __all__ = [
     "SecurityEvent",
     "Config",
     "load_config",
-    "MessageFraming"
+    "MessageFraming",
+    "FrameDecoder"
 ]
@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -14,6 +14,35 @@ class Config:
     admin_user: str
     admin_password: str
     
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+    db_pool_idle_timeout: float = 60.0
+    db_multiplex: bool = False
+    db_query_operators: Optional[List[str]] = None
+    db_compression: Optional[str] = None
+    db_compression_threshold: int = 16 * 1024
+    db_circuit_failure_threshold: float = 0.5
+    db_circuit_reset_timeout: float = 30.0
+    web_request_timeout: float = 30.0
+    event_cache_max_bytes: int = 256 * 1024 * 1024
+    event_cache_refresh_interval: float = 5.0
+    event_cache_max_staleness: float = 60.0
+    event_snapshot_path: Optional[str] = None
+    event_snapshot_interval: float = 300.0
+    dashboard_cache_ttl: float = 5.0
+    dashboard_cache_max_staleness: float = 60.0
+    search_cache_max_bytes: int = 64 * 1024 * 1024
+    search_cache_ttl: float = 30.0
+    parallel_filter_workers: int = 0
+    parallel_filter_threshold: int = 50000
+    rollup_minute_retention: float = 86400.0
+    rollup_hour_retention: float = 30 * 86400.0
+    rollup_day_retention: float = 365 * 86400.0
+    dashboard_sketch_range: float = 0.0
+    dashboard_sketch_top_error: float = 0.01
+    dashboard_sketch_distinct_error: float = 0.01
+    sidecar_path: Optional[str] = None
+    
     def __post_init__(self):
         if not self.admin_password:
             raise ValueError("SIEM_ADMIN_PASSWORD environment variable is required")
@@ -23,6 +52,79 @@ class Config:
         
         if self.web_port <= 0 or self.web_port > 65535:
             raise ValueError(f"Invalid web server port: {self.web_port}")
+        
+        if self.db_pool_min_size < 0 or self.db_pool_max_size < max(1, self.db_pool_min_size):
+            raise ValueError(
+                f"Invalid database pool size: min={self.db_pool_min_size}, max={self.db_pool_max_size}"
+            )
+        
+        if self.db_compression is not None and self.db_compression not in ("zlib", "lzma"):
+            raise ValueError(f"Invalid database compression: {self.db_compression}")
+        
+        if self.db_compression_threshold < 0:
+            raise ValueError(f"Invalid database compression threshold: {self.db_compression_threshold}")
+        
+        if not 0 < self.db_circuit_failure_threshold <= 1:
+            raise ValueError(
+                f"Invalid database circuit failure threshold: {self.db_circuit_failure_threshold}"
+            )
+        
+        if self.db_circuit_reset_timeout <= 0:
+            raise ValueError(f"Invalid database circuit reset timeout: {self.db_circuit_reset_timeout}")
+        
+        if self.web_request_timeout <= 0:
+            raise ValueError(f"Invalid web request timeout: {self.web_request_timeout}")
+        
+        if self.event_cache_max_bytes < 0:
+            raise ValueError(f"Invalid event cache size: {self.event_cache_max_bytes}")
+        
+        if not 0 <= self.event_cache_refresh_interval <= self.event_cache_max_staleness:
+            raise ValueError(
+                f"Invalid event cache staleness: refresh_interval={self.event_cache_refresh_interval}, "
+                f"max_staleness={self.event_cache_max_staleness}"
+            )
+        
+        if self.event_snapshot_interval <= 0:
+            raise ValueError(f"Invalid event snapshot interval: {self.event_snapshot_interval}")
+        
+        if not 0 <= self.dashboard_cache_ttl <= self.dashboard_cache_max_staleness:
+            raise ValueError(
+                f"Invalid dashboard cache staleness: ttl={self.dashboard_cache_ttl}, "
+                f"max_staleness={self.dashboard_cache_max_staleness}"
+            )
+        
+        if self.search_cache_max_bytes < 0:
+            raise ValueError(f"Invalid search cache size: {self.search_cache_max_bytes}")
+        
+        if self.search_cache_ttl <= 0:
+            raise ValueError(f"Invalid search cache TTL: {self.search_cache_ttl}")
+        
+        if self.parallel_filter_workers < 0:
+            raise ValueError(f"Invalid parallel filter workers: {self.parallel_filter_workers}")
+        
+        if self.parallel_filter_threshold < 0:
+            raise ValueError(f"Invalid parallel filter threshold: {self.parallel_filter_threshold}")
+        
+        for name, retention in self.rollup_retention.items():
+            if retention < 0:
+                raise ValueError(f"Invalid {name} rollup retention: {retention}")
+        
+        if self.dashboard_sketch_range < 0:
+            raise ValueError(f"Invalid dashboard sketch range: {self.dashboard_sketch_range}")
+        
+        if not 0 < self.dashboard_sketch_top_error < 1 or not 0 < self.dashboard_sketch_distinct_error < 1:
+            raise ValueError(
+                f"Invalid dashboard sketch error: top={self.dashboard_sketch_top_error}, "
+                f"distinct={self.dashboard_sketch_distinct_error}"
+            )
+    
+    @property
+    def rollup_retention(self) -> Dict[str, float]:
+        return {
+            "minute": self.rollup_minute_retention,
+            "hour": self.rollup_hour_retention,
+            "day": self.rollup_day_retention,
+        }
 
 
 def load_config() -> Config:
@@ -43,11 +145,150 @@ def load_config() -> Config:
     admin_user = os.environ.get("SIEM_ADMIN_USER", "admin")
     admin_password = os.environ.get("SIEM_ADMIN_PASSWORD", "")
     
+    try:
+        db_pool_min_size = int(os.environ.get("SIEM_DB_POOL_MIN_SIZE", "1"))
+        db_pool_max_size = int(os.environ.get("SIEM_DB_POOL_MAX_SIZE", "10"))
+    except ValueError:
+        raise ValueError("SIEM_DB_POOL_MIN_SIZE and SIEM_DB_POOL_MAX_SIZE must be valid integers")
+    
+    try:
+        db_pool_idle_timeout = float(os.environ.get("SIEM_DB_POOL_IDLE_TIMEOUT", "60"))
+    except ValueError:
+        raise ValueError("SIEM_DB_POOL_IDLE_TIMEOUT must be a valid number")
+    
+    db_multiplex = os.environ.get("SIEM_DB_MULTIPLEX", "false").lower() in ("1", "true", "yes")
+    
+    query_operators_env = os.environ.get("SIEM_DB_QUERY_OPERATORS")
+    db_query_operators = None
+    if query_operators_env is not None and query_operators_env.strip():
+        db_query_operators = [
+            op.strip() for op in query_operators_env.split(",")
+            if op.strip() and op.strip().lower() != "none"
+        ]
+    
+    db_compression = os.environ.get("SIEM_DB_COMPRESSION", "none").strip().lower()
+    if db_compression in ("", "none"):
+        db_compression = None
+    
+    try:
+        db_compression_threshold = int(os.environ.get("SIEM_DB_COMPRESSION_THRESHOLD", "16384"))
+    except ValueError:
+        raise ValueError("SIEM_DB_COMPRESSION_THRESHOLD must be a valid integer")
+    
+    try:
+        db_circuit_failure_threshold = float(os.environ.get("SIEM_DB_CIRCUIT_FAILURE_THRESHOLD", "0.5"))
+        db_circuit_reset_timeout = float(os.environ.get("SIEM_DB_CIRCUIT_RESET_TIMEOUT", "30"))
+    except ValueError:
+        raise ValueError(
+            "SIEM_DB_CIRCUIT_FAILURE_THRESHOLD and SIEM_DB_CIRCUIT_RESET_TIMEOUT must be valid numbers"
+        )
+    
+    try:
+        web_request_timeout = float(os.environ.get("SIEM_WEB_REQUEST_TIMEOUT", "30"))
+    except ValueError:
+        raise ValueError("SIEM_WEB_REQUEST_TIMEOUT must be a valid number")
+    
+    try:
+        event_cache_max_bytes = int(os.environ.get("SIEM_EVENT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    except ValueError:
+        raise ValueError("SIEM_EVENT_CACHE_MAX_BYTES must be a valid integer")
+    
+    try:
+        event_cache_refresh_interval = float(os.environ.get("SIEM_EVENT_CACHE_REFRESH_INTERVAL", "5"))
+        event_cache_max_staleness = float(os.environ.get("SIEM_EVENT_CACHE_MAX_STALENESS", "60"))
+    except ValueError:
+        raise ValueError(
+            "SIEM_EVENT_CACHE_REFRESH_INTERVAL and SIEM_EVENT_CACHE_MAX_STALENESS must be valid numbers"
+        )
+    
+    event_snapshot_path = os.environ.get("SIEM_EVENT_SNAPSHOT_PATH", "").strip() or None
+    
+    try:
+        event_snapshot_interval = float(os.environ.get("SIEM_EVENT_SNAPSHOT_INTERVAL", "300"))
+    except ValueError:
+        raise ValueError("SIEM_EVENT_SNAPSHOT_INTERVAL must be a valid number")
+    
+    try:
+        dashboard_cache_ttl = float(os.environ.get("SIEM_DASHBOARD_CACHE_TTL", "5"))
+        dashboard_cache_max_staleness = float(os.environ.get("SIEM_DASHBOARD_CACHE_MAX_STALENESS", "60"))
+    except ValueError:
+        raise ValueError(
+            "SIEM_DASHBOARD_CACHE_TTL and SIEM_DASHBOARD_CACHE_MAX_STALENESS must be valid numbers"
+        )
+    
+    try:
+        search_cache_max_bytes = int(os.environ.get("SIEM_SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    except ValueError:
+        raise ValueError("SIEM_SEARCH_CACHE_MAX_BYTES must be a valid integer")
+    
+    try:
+        search_cache_ttl = float(os.environ.get("SIEM_SEARCH_CACHE_TTL", "30"))
+    except ValueError:
+        raise ValueError("SIEM_SEARCH_CACHE_TTL must be a valid number")
+    
+    try:
+        parallel_filter_workers = int(os.environ.get("SIEM_PARALLEL_FILTER_WORKERS", "0"))
+        parallel_filter_threshold = int(os.environ.get("SIEM_PARALLEL_FILTER_THRESHOLD", "50000"))
+    except ValueError:
+        raise ValueError(
+            "SIEM_PARALLEL_FILTER_WORKERS and SIEM_PARALLEL_FILTER_THRESHOLD must be valid integers"
+        )
+    
+    try:
+        rollup_minute_retention = float(os.environ.get("SIEM_ROLLUP_MINUTE_RETENTION", "86400"))
+        rollup_hour_retention = float(os.environ.get("SIEM_ROLLUP_HOUR_RETENTION", "2592000"))
+        rollup_day_retention = float(os.environ.get("SIEM_ROLLUP_DAY_RETENTION", "31536000"))
+    except ValueError:
+        raise ValueError(
+            "SIEM_ROLLUP_MINUTE_RETENTION, SIEM_ROLLUP_HOUR_RETENTION and "
+            "SIEM_ROLLUP_DAY_RETENTION must be valid numbers"
+        )
+    
+    try:
+        dashboard_sketch_range = float(os.environ.get("SIEM_DASHBOARD_SKETCH_RANGE", "0"))
+        dashboard_sketch_top_error = float(os.environ.get("SIEM_DASHBOARD_SKETCH_TOP_ERROR", "0.01"))
+        dashboard_sketch_distinct_error = float(os.environ.get("SIEM_DASHBOARD_SKETCH_DISTINCT_ERROR", "0.01"))
+    except ValueError:
+        raise ValueError(
+            "SIEM_DASHBOARD_SKETCH_RANGE, SIEM_DASHBOARD_SKETCH_TOP_ERROR and "
+            "SIEM_DASHBOARD_SKETCH_DISTINCT_ERROR must be valid numbers"
+        )
+    
+    sidecar_path = os.environ.get("SIEM_SIDECAR_PATH", "").strip() or None
+    
     return Config(
         db_host=db_host,
         db_port=db_port,
         web_host=web_host,
         web_port=web_port,
         admin_user=admin_user,
-        admin_password=admin_password
+        admin_password=admin_password,
+        db_pool_min_size=db_pool_min_size,
+        db_pool_max_size=db_pool_max_size,
+        db_pool_idle_timeout=db_pool_idle_timeout,
+        db_multiplex=db_multiplex,
+        db_query_operators=db_query_operators,
+        db_compression=db_compression,
+        db_compression_threshold=db_compression_threshold,
+        db_circuit_failure_threshold=db_circuit_failure_threshold,
+        db_circuit_reset_timeout=db_circuit_reset_timeout,
+        web_request_timeout=web_request_timeout,
+        event_cache_max_bytes=event_cache_max_bytes,
+        event_cache_refresh_interval=event_cache_refresh_interval,
+        event_cache_max_staleness=event_cache_max_staleness,
+        event_snapshot_path=event_snapshot_path,
+        event_snapshot_interval=event_snapshot_interval,
+        dashboard_cache_ttl=dashboard_cache_ttl,
+        dashboard_cache_max_staleness=dashboard_cache_max_staleness,
+        search_cache_max_bytes=search_cache_max_bytes,
+        search_cache_ttl=search_cache_ttl,
+        parallel_filter_workers=parallel_filter_workers,
+        parallel_filter_threshold=parallel_filter_threshold,
+        rollup_minute_retention=rollup_minute_retention,
+        rollup_hour_retention=rollup_hour_retention,
+        rollup_day_retention=rollup_day_retention,
+        dashboard_sketch_range=dashboard_sketch_range,
+        dashboard_sketch_top_error=dashboard_sketch_top_error,
+        dashboard_sketch_distinct_error=dashboard_sketch_distinct_error,
+        sidecar_path=sidecar_path
     )
\ No newline at end of file
@@ -1,16 +1,84 @@
+import json
+import lzma
 import struct
+import zlib
+from typing import Any, Optional, Union
 
 
 class MessageFraming:
     MAX_MESSAGE_SIZE = 10 * 1024 * 1024  # 10MB limit
+    HEADER_SIZE = 4
+    
+    # The length never exceeds MAX_MESSAGE_SIZE, so the top byte of the header
+    # carries frame flags. Flags are only sent on connections that negotiated them.
+    FLAGS_MASK = 0xFF000000
+    FLAG_TAGGED = 0x80000000  # a 4-byte request id follows the header
+    FLAG_COMPRESSED = 0x40000000  # the payload is a codec byte followed by compressed data
+    TAG_SIZE = 4
+    
+    COMPRESSION_CODECS = {"zlib": 1, "lzma": 2}
+    DEFAULT_COMPRESSION_THRESHOLD = 16 * 1024
 
     @staticmethod
-    def frame_message(message: str) -> bytes:
+    def frame_message(
+        message: str,
+        request_id: Optional[int] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD
+    ) -> bytes:
         encoded = message.encode('utf-8')
         if len(encoded) > MessageFraming.MAX_MESSAGE_SIZE:
             raise ValueError("Message size exceeds maximum allowed size")
-        length_prefix = struct.pack('>I', len(encoded))
-        return length_prefix + encoded
+        
+        flags = 0
+        if compression is not None and len(encoded) >= compression_threshold:
+            compressed = MessageFraming.compress_payload(encoded, compression)
+            # Incompressible payloads go out as they are.
+            if len(compressed) < len(encoded):
+                encoded = compressed
+                flags |= MessageFraming.FLAG_COMPRESSED
+        
+        if request_id is None:
+            length_prefix = struct.pack('>I', flags | len(encoded))
+            return length_prefix + encoded
+        header = struct.pack('>II', MessageFraming.FLAG_TAGGED | flags | len(encoded), request_id)
+        return header + encoded
+    
+    @staticmethod
+    def compress_payload(data: bytes, compression: str) -> bytes:
+        codec = MessageFraming.COMPRESSION_CODECS.get(compression)
+        if codec is None:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "lzma":
+            return bytes([codec]) + lzma.compress(data, preset=1)
+        return bytes([codec]) + zlib.compress(data, 6)
+    
+    @staticmethod
+    def decode_payload(flags: int, payload: Union[bytes, bytearray]) -> Union[bytes, bytearray]:
+        if not flags & MessageFraming.FLAG_COMPRESSED:
+            return payload
+        if not payload:
+            raise ValueError("Compressed frame is missing its codec")
+        
+        codec = payload[0]
+        if codec == MessageFraming.COMPRESSION_CODECS["zlib"]:
+            decompressor = zlib.decompressobj()
+        elif codec == MessageFraming.COMPRESSION_CODECS["lzma"]:
+            decompressor = lzma.LZMADecompressor()
+        else:
+            raise ValueError(f"Unknown compression codec: {codec}")
+        
+        # Bound the output so a small frame can't expand past the message limit.
+        limit = MessageFraming.MAX_MESSAGE_SIZE
+        try:
+            data = decompressor.decompress(memoryview(payload)[1:], limit + 1)
+        except (zlib.error, lzma.LZMAError) as e:
+            raise ValueError(f"Corrupt compressed frame: {e}")
+        if len(data) > limit:
+            raise ValueError("Decompressed message length exceeds maximum allowed size")
+        if not decompressor.eof:
+            raise ValueError("Truncated compressed frame")
+        return data
     
     @staticmethod
     def extract_message(data: bytes) -> tuple[str, int]:
@@ -39,3 +107,109 @@ class MessageFraming:
             return False
         
         return len(data) >= 4 + length
+    
+    @staticmethod
+    def parse_header(header: bytes) -> int:
+        flags, length = MessageFraming.parse_frame_header(header)
+        
+        if flags:
+            raise ValueError("Unexpected flags in message header")
+        
+        return length
+    
+    @staticmethod
+    def parse_frame_header(header: bytes) -> tuple[int, int]:
+        if len(header) < MessageFraming.HEADER_SIZE:
+            raise ValueError("Incomplete message header")
+        
+        value = struct.unpack('>I', header[:MessageFraming.HEADER_SIZE])[0]
+        flags = value & MessageFraming.FLAGS_MASK
+        length = value & ~MessageFraming.FLAGS_MASK
+        
+        if length > MessageFraming.MAX_MESSAGE_SIZE:
+            raise ValueError("Message length exceeds maximum allowed size")
+        
+        return flags, length
+    
+    @staticmethod
+    def parse_tag(tag: bytes) -> int:
+        return struct.unpack('>I', tag[:MessageFraming.TAG_SIZE])[0]
+
+
+class FrameDecoder:
+    INITIAL_RECV_SIZE = 64 * 1024
+    MAX_RECV_SIZE = 1024 * 1024
+    
+    def __init__(self):
+        self._header = bytearray(MessageFraming.HEADER_SIZE + MessageFraming.TAG_SIZE)
+        self._header_view = memoryview(self._header)
+        self.reset()
+    
+    def reset(self) -> None:
+        self.flags = 0
+        self.length = 0
+        self.request_id: Optional[int] = None
+        self._header_size = MessageFraming.HEADER_SIZE
+        self._header_received = 0
+        self._buffer: Optional[bytearray] = None
+        self._view: Optional[memoryview] = None
+        self._received = 0
+        self._recv_size = self.INITIAL_RECV_SIZE
+    
+    @property
+    def bytes_received(self) -> int:
+        return self._header_received + self._received
+    
+    @property
+    def complete(self) -> bool:
+        return self._buffer is not None and self._received == self.length
+    
+    @property
+    def payload(self) -> bytearray:
+        if not self.complete:
+            raise ValueError("Frame is not complete")
+        return self._buffer
+    
+    def recv_from(self, sock) -> int:
+        if self._buffer is None:
+            count = sock.recv_into(self._header_view[self._header_received:self._header_size])
+            if count:
+                self._header_received += count
+                self._on_header_bytes()
+            return count
+        
+        remaining = self.length - self._received
+        if remaining == 0:
+            return 0
+        
+        count = sock.recv_into(self._view[self._received:], min(remaining, self._recv_size))
+        self._received += count
+        if count == self._recv_size and self._recv_size < self.MAX_RECV_SIZE:
+            self._recv_size *= 2
+        return count
+    
+    def read_frame(self, sock) -> bytearray:
+        self.reset()
+        while not self.complete:
+            if self.recv_from(sock) == 0:
+                raise ConnectionResetError("Connection closed by peer")
+        return self._buffer
+    
+    def decode_json(self) -> Any:
+        return json.loads(MessageFraming.decode_payload(self.flags, self.payload))
+    
+    def _on_header_bytes(self) -> None:
+        if self._header_received < self._header_size:
+            return
+        
+        if self._header_size == MessageFraming.HEADER_SIZE:
+            self.flags, self.length = MessageFraming.parse_frame_header(self._header)
+            if self.flags & MessageFraming.FLAG_TAGGED:
+                self._header_size += MessageFraming.TAG_SIZE
+                return
+        else:
+            self.request_id = MessageFraming.parse_tag(self._header[MessageFraming.HEADER_SIZE:])
+        
+        # The length is known up front, so the body lands in one exactly-sized buffer.
+        self._buffer = bytearray(self.length)
+        self._view = memoryview(self._buffer)
@@ -1,5 +1,30 @@
+import sys
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+
+# Document keys in field order.
+DOCUMENT_KEYS = (
+    "_id", "timestamp", "hostname", "source", "event_type", "severity",
+    "user", "process", "command", "raw_log", "agent_last_seen"
+)
+
+# Few distinct values each: interned, so events share one copy of every value.
+CATEGORICAL_FIELDS = ("hostname", "source", "event_type", "severity", "user", "process")
+
+_KNOWN_KEYS = frozenset(DOCUMENT_KEYS)
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+# Holds the place of a key the document didn't have, so unpack_event gives back what came in.
+MISSING: Any = _Missing()
+
+# A document as a plain tuple in DOCUMENT_KEYS order, unknown keys last.
+EventRow = Tuple[Any, ...]
 
 
 @dataclass
@@ -43,3 +68,37 @@ class SecurityEvent:
             "command": self.command,
             "raw_log": self.raw_log
         }
+
+
+def pack_event(data: Dict[str, Any]) -> EventRow:
+    # For holding many events at once. The GC stops tracking an exact tuple of
+    # plain values, never a dataclass instance or a tuple subclass.
+    get = data.get
+    return (
+        get("_id", MISSING),
+        get("timestamp", MISSING),
+        _intern(get("hostname", MISSING)),
+        _intern(get("source", MISSING)),
+        _intern(get("event_type", MISSING)),
+        _intern(get("severity", MISSING)),
+        _intern(get("user", MISSING)),
+        _intern(get("process", MISSING)),
+        get("command", MISSING),
+        get("raw_log", MISSING),
+        get("agent_last_seen", MISSING),
+        {key: value for key, value in data.items() if key not in _KNOWN_KEYS}
+        if data.keys() - _KNOWN_KEYS else None,
+    )
+
+
+def unpack_event(row: EventRow) -> Dict[str, Any]:
+    # Exactly the document pack_event was given.
+    data = {key: value for key, value in zip(DOCUMENT_KEYS, row) if value is not MISSING}
+    extras = row[-1]
+    if extras:
+        data.update(extras)
+    return data
+
+
+def _intern(value: Any, intern=sys.intern) -> Any:
+    return intern(value) if value.__class__ is str else value
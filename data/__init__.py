@@ -7,16 +7,37 @@ from .client import (
     QueryError,
     ResponseSizeError,
     TimeoutError,
+    PoolExhaustedError,
+    CircuitOpenError,
     create_client_from_config,
     DEFAULT_RETRY_ATTEMPTS,
     DEFAULT_RETRY_DELAY,
     DEFAULT_TIMEOUT,
 )
 
-from .repository import EventRepository
+from .async_client import AsyncDatabaseClient
+from .circuit_breaker import CircuitBreaker
+from .cursor import EventCursor
+from .dashboard import DashboardAggregator
+from .deadline import Deadline
+from .event_cache import EventCache
+from .event_snapshot import EventSnapshot
+from .external_sort import ExternalSorter
+from .parallel_filter import ParallelFilter
+from .sketches import SpaceSaving, HyperLogLog, DashboardSketches
+from .singleflight import SingleFlight, AsyncSingleFlight
+from .pool import ConnectionPool, AsyncConnectionPool
+from .multiplex import MultiplexedConnection, AsyncMultiplexedConnection
+from .local_server import LocalDatabaseServer
+from .rollups import EventRollups, TimelineQuery
+from .query_translator import QueryTranslation, translate_filters, translate_search
+from .search_query import SearchQuery, parse_search
+from .repository import EventRepository, AsyncEventRepository
+from .sidecar_client import SidecarClient, AsyncSidecarClient, SidecarUnavailableError
 
 __all__ = [
     "DatabaseClient",
+    "AsyncDatabaseClient",
     "DatabaseConfig",
     "DatabaseConstants",
     "DatabaseError",
@@ -24,6 +45,37 @@ __all__ = [
     "QueryError",
     "ResponseSizeError",
     "TimeoutError",
+    "PoolExhaustedError",
+    "CircuitOpenError",
+    "CircuitBreaker",
+    "EventCursor",
+    "DashboardAggregator",
+    "Deadline",
+    "EventCache",
+    "EventSnapshot",
+    "ExternalSorter",
+    "ParallelFilter",
+    "SpaceSaving",
+    "HyperLogLog",
+    "DashboardSketches",
+    "SingleFlight",
+    "AsyncSingleFlight",
+    "ConnectionPool",
+    "AsyncConnectionPool",
+    "MultiplexedConnection",
+    "AsyncMultiplexedConnection",
+    "LocalDatabaseServer",
+    "EventRollups",
+    "TimelineQuery",
+    "QueryTranslation",
+    "translate_filters",
+    "translate_search",
+    "SearchQuery",
+    "parse_search",
     "create_client_from_config",
     "EventRepository",
+    "AsyncEventRepository",
+    "SidecarClient",
+    "AsyncSidecarClient",
+    "SidecarUnavailableError",
 ]
@@ -0,0 +1,484 @@
+import asyncio
+import json
+import socket
+import logging
+from typing import Optional, Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Tuple, TypeVar
+
+from core.message_framing import MessageFraming
+from data.client import (
+    BaseDatabaseClient,
+    DatabaseConfig,
+    DatabaseConstants,
+    _StaleConnectionError,
+    _framing_error,
+)
+from data.exceptions import (
+    ConnectionError,
+    QueryError,
+    ResponseSizeError,
+    TimeoutError,
+)
+from data.circuit_breaker import CLOSED
+from data.deadline import Deadline
+from data.singleflight import AsyncSingleFlight
+from data.pool import AsyncConnectionPool, AsyncPooledConnection
+from data.multiplex import MULTIPLEX_FEATURE, AsyncMultiplexedConnection, supports_multiplex
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncDatabaseClient(BaseDatabaseClient):
+    def __init__(self, config: DatabaseConfig):
+        super().__init__(config)
+        self._pool = AsyncConnectionPool(
+            self._connect,
+            min_size=config.pool_min_size,
+            max_size=config.pool_max_size,
+            idle_timeout=config.pool_idle_timeout,
+            acquire_timeout=config.timeout
+        )
+        self._multiplex_enabled = config.multiplex
+        self._mux: Optional[AsyncMultiplexedConnection] = None
+        self._mux_lock: Optional[asyncio.Lock] = None
+        self._query_operators: Optional[FrozenSet[str]] = None
+        self._flights: AsyncSingleFlight = AsyncSingleFlight()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
+
+    async def _connect(self, timeout: Optional[float] = None) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        deadline = Deadline(timeout)
+        last_error: Optional[Exception] = None
+        attempts = 0
+
+        for attempt in range(self.config.retry_attempts):
+            attempts += 1
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.config.host, self.config.port),
+                    deadline.clamp(self.config.timeout)
+                )
+                sock = writer.get_extra_info("socket")
+                if sock is not None:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                logger.debug(f"Connected to database at {self.config.host}:{self.config.port}")
+                return reader, writer
+            except (OSError, asyncio.TimeoutError) as e:
+                last_error = e
+                logger.warning(
+                    f"Connection attempt {attempt + 1}/{self.config.retry_attempts} failed: {e!r}"
+                )
+                if attempt < self.config.retry_attempts - 1:
+                    pause = self._retry_pause(attempt, deadline)
+                    if pause is None:
+                        break
+                    await asyncio.sleep(pause)
+
+        raise ConnectionError(
+            f"Failed to connect to database at {self.config.host}:{self.config.port} "
+            f"after {attempts} attempts: {last_error!r}"
+        )
+
+    async def _send_request(
+        self,
+        request: Dict[str, Any],
+        operation_context: str = "",
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        deadline = deadline or Deadline()
+
+        async def attempt() -> Dict[str, Any]:
+            mux = await self._get_multiplexed_connection(deadline)
+            if mux is not None:
+                request_json = self._serialize_request(request, operation_context)
+                payload = await asyncio.wait_for(
+                    mux.request(request_json, operation_context), deadline.clamp(self.config.timeout)
+                )
+                return json.loads(payload)
+
+            framed_message = self._encode_request(request, operation_context)
+            conn, response = await self._open_exchange(framed_message, operation_context, deadline)
+            self._pool.release(conn)
+            return response
+
+        return await self._with_retries(attempt, operation_context, deadline)
+
+    async def _with_retries(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        operation_context: str,
+        deadline: Optional[Deadline] = None
+    ) -> T:
+        deadline = deadline or Deadline()
+        if deadline.expired:
+            raise self._timeout_error(deadline, operation_context)
+
+        self._check_circuit(operation_context)
+        try:
+            result = await self._retry(operation, operation_context, deadline)
+        except BaseException as e:
+            self._record_outcome(e)
+            raise
+        self._record_outcome(None)
+        return result
+
+    async def _retry(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        operation_context: str,
+        deadline: Deadline
+    ) -> T:
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.config.retry_attempts):
+            if last_error is not None and self._breaker.state != CLOSED:
+                # Other requests already tripped the circuit; stop hammering the server.
+                raise last_error
+            try:
+                return await operation()
+
+            except asyncio.TimeoutError:
+                last_error = self._timeout_error(deadline, operation_context)
+                logger.warning(
+                    f"Timeout on attempt {attempt + 1}/{self.config.retry_attempts}: "
+                    f"{operation_context}"
+                )
+
+            except (ConnectionError, ResponseSizeError) as e:
+                logger.error(f"Non-retryable error: {e}")
+                raise
+
+            except json.JSONDecodeError as e:
+                last_error = QueryError(
+                    f"Invalid JSON response from database: {e}. "
+                    f"Operation: {operation_context}"
+                )
+                logger.warning(
+                    f"JSON decode error on attempt {attempt + 1}/{self.config.retry_attempts}: "
+                    f"{operation_context}"
+                )
+
+            except Exception as e:
+                if isinstance(e, (QueryError, TimeoutError)):
+                    last_error = e
+                else:
+                    last_error = QueryError(
+                        f"Database query failed: {e!r}. Operation: {operation_context}"
+                    )
+                logger.warning(
+                    f"Error on attempt {attempt + 1}/{self.config.retry_attempts}: {e!r}"
+                )
+
+            if attempt < self.config.retry_attempts - 1:
+                pause = self._retry_pause(attempt, deadline)
+                if pause is None:
+                    raise last_error
+                await asyncio.sleep(pause)
+
+        if last_error:
+            raise last_error
+        raise QueryError(f"Database query failed after retries. Operation: {operation_context}")
+
+    async def _get_multiplexed_connection(
+        self,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[AsyncMultiplexedConnection]:
+        if not self._multiplex_enabled:
+            return None
+
+        if self._mux is not None and self._mux.is_open:
+            return self._mux
+
+        if self._mux_lock is None:
+            self._mux_lock = asyncio.Lock()
+
+        async with self._mux_lock:
+            if not self._multiplex_enabled:
+                return None
+            if self._mux is not None and self._mux.is_open:
+                return self._mux
+
+            deadline = deadline or Deadline()
+            reader, writer = await self._connect(deadline.remaining())
+            try:
+                hello = self._encode_request(
+                    self._create_hello_request(self._hello_features(MULTIPLEX_FEATURE)), "hello"
+                )
+                response = await asyncio.wait_for(
+                    self._exchange(reader, writer, hello, "hello"), deadline.clamp(self.config.timeout)
+                )
+            except (QueryError, json.JSONDecodeError) as e:
+                response = {"status": "error", "message": str(e)}
+            except BaseException:
+                writer.close()
+                raise
+
+            if not supports_multiplex(response):
+                writer.close()
+                self._multiplex_enabled = False
+                logger.info("Database server does not support multiplexing, using pooled connections")
+                return None
+
+            logger.debug(
+                f"Multiplexed connection established to {self.config.host}:{self.config.port}, "
+                f"compression: {self._parse_compression(response) or 'none'}"
+            )
+            self._mux = AsyncMultiplexedConnection(reader, writer)
+            return self._mux
+
+    async def _open_exchange(
+        self,
+        framed_message: bytes,
+        operation_context: str,
+        deadline: Deadline
+    ) -> Tuple[AsyncPooledConnection, Dict[str, Any]]:
+        conn: Optional[AsyncPooledConnection] = await self._pool.acquire(deadline.remaining())
+        try:
+            try:
+                await asyncio.wait_for(self._negotiate(conn), deadline.clamp(self.config.timeout))
+                response = await asyncio.wait_for(
+                    self._exchange(conn.reader, conn.writer, framed_message, operation_context),
+                    deadline.clamp(self.config.timeout)
+                )
+            except _StaleConnectionError:
+                if not conn.reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a new one.
+                logger.debug(f"Pooled connection went stale, reconnecting. Operation: {operation_context}")
+                self._pool.discard(conn)
+                conn = None
+                conn = await self._pool.acquire(deadline.remaining(), fresh=True)
+                await asyncio.wait_for(self._negotiate(conn), deadline.clamp(self.config.timeout))
+                response = await asyncio.wait_for(
+                    self._exchange(conn.reader, conn.writer, framed_message, operation_context),
+                    deadline.clamp(self.config.timeout)
+                )
+        except BaseException:
+            if conn is not None:
+                self._pool.discard(conn)
+            raise
+
+        return conn, response
+
+    async def _negotiate(self, conn: AsyncPooledConnection) -> None:
+        if conn.negotiated or not self.config.compression:
+            return
+
+        hello = self._encode_request(self._create_hello_request(self._hello_features()), "hello")
+        response = await self._exchange(conn.reader, conn.writer, hello, "hello")
+        conn.negotiated = True
+        logger.debug(f"Negotiated connection compression: {self._parse_compression(response) or 'none'}")
+
+    async def _exchange(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        framed_message: bytes,
+        operation_context: str
+    ) -> Dict[str, Any]:
+        try:
+            writer.write(framed_message)
+            await writer.drain()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError) as e:
+            raise _StaleConnectionError(
+                f"Connection closed by server before request was sent: {e}. "
+                f"Operation: {operation_context}"
+            )
+
+        return await self._read_response(reader, operation_context)
+
+    async def _read_response(self, reader: asyncio.StreamReader, operation_context: str) -> Dict[str, Any]:
+        try:
+            header = await reader.readexactly(MessageFraming.HEADER_SIZE)
+        except asyncio.IncompleteReadError as e:
+            error_cls = _StaleConnectionError if not e.partial else QueryError
+            raise error_cls(
+                f"Connection closed by server before complete response. "
+                f"Operation: {operation_context}"
+            )
+        except (ConnectionResetError, ConnectionAbortedError) as e:
+            raise _StaleConnectionError(
+                f"Connection reset by server before response: {e}. "
+                f"Operation: {operation_context}"
+            )
+
+        try:
+            flags, length = MessageFraming.parse_frame_header(header)
+        except ValueError as e:
+            raise _framing_error(e, operation_context)
+
+        if flags & ~MessageFraming.FLAG_COMPRESSED:
+            raise QueryError(
+                f"Message framing error: unexpected frame flags {flags:#x}. "
+                f"Operation: {operation_context}"
+            )
+
+        try:
+            payload = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise QueryError(
+                f"Connection closed by server before complete response. "
+                f"Operation: {operation_context}"
+            )
+
+        try:
+            payload = MessageFraming.decode_payload(flags, payload)
+        except ValueError as e:
+            raise _framing_error(e, operation_context)
+        response = json.loads(payload)
+
+        logger.debug(
+            f"Database operation successful. Operation: {operation_context}, "
+            f"Response size: {length + MessageFraming.HEADER_SIZE} bytes"
+        )
+
+        return response
+
+    async def query_operators(self, deadline: Optional[Deadline] = None) -> FrozenSet[str]:
+        if self.config.query_operators is not None:
+            return frozenset(self.config.query_operators)
+
+        if self._query_operators is None:
+            try:
+                response = await self._send_request(
+                    self._create_hello_request(self._hello_features()), "hello", deadline
+                )
+            except QueryError as e:
+                logger.warning(f"Database did not answer capability request, filtering in-process: {e}")
+                response = {"status": "error"}
+            self._query_operators = self._parse_query_operators(response)
+            logger.info(f"Database query operators: {sorted(self._query_operators) or 'none'}")
+
+        return self._query_operators
+
+    async def find(
+        self,
+        collection: str,
+        query: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        deadline = self._resolve_deadline(timeout, deadline)
+        request = self._create_find_request(collection, query, fields=fields)
+        operation_context = self._find_context(collection, query, fields=fields)
+
+        async def load() -> List[Dict[str, Any]]:
+            response = await self._send_request(request, operation_context, deadline)
+            return self._parse_find_response(response, operation_context)
+
+        # Concurrent identical finds share one request; each caller gets its own list.
+        return list(await self.coalesce(self.find_key(collection, query, fields), load, deadline))
+
+    async def find_security_events(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.find(self.SECURITY_EVENTS_COLLECTION, query, timeout, fields, deadline)
+
+    async def iter_find_batches(
+        self,
+        collection: str,
+        query: Optional[Dict[str, Any]] = None,
+        batch_size: int = DatabaseConstants.DEFAULT_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        deadline = deadline or Deadline()
+        request = self._create_find_request(collection, query, batch_size, fields)
+        operation_context = self._find_context(collection, query, batch_size, fields)
+        framed_message = self._encode_request(request, operation_context)
+
+        # Only opening the cursor is retried; once batches were handed out a retry would duplicate them.
+        conn, response = await self._with_retries(
+            lambda: self._open_exchange(framed_message, operation_context, deadline),
+            operation_context,
+            deadline
+        )
+
+        exhausted = False
+        total = 0
+        try:
+            while True:
+                batch = self._response_data(response, operation_context)
+                total += len(batch)
+                has_more = bool(response.get("has_more"))
+                yield batch
+
+                if not has_more:
+                    exhausted = True
+                    break
+
+                try:
+                    response = await asyncio.wait_for(
+                        self._read_response(conn.reader, operation_context),
+                        deadline.clamp(self.config.timeout)
+                    )
+                except asyncio.TimeoutError:
+                    raise self._timeout_error(deadline, operation_context)
+                except (OSError, json.JSONDecodeError) as e:
+                    raise QueryError(
+                        f"Database cursor failed: {e!r}. Operation: {operation_context}"
+                    )
+        finally:
+            # An abandoned cursor leaves unread batches on the socket, so it can't be reused.
+            if exhausted:
+                self._pool.release(conn)
+            else:
+                self._pool.discard(conn)
+
+        logger.info(
+            f"Cursor exhausted: {total} documents returned. "
+            f"Operation: {operation_context}"
+        )
+
+    async def iter_security_events(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        batch_size: int = DatabaseConstants.DEFAULT_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        batches = self.iter_find_batches(
+            self.SECURITY_EVENTS_COLLECTION, query, batch_size, fields, deadline
+        )
+        try:
+            async for batch in batches:
+                for document in batch:
+                    yield document
+        finally:
+            await batches.aclose()
+
+    async def close(self):
+        if self._mux is not None:
+            mux, self._mux = self._mux, None
+            await mux.close()
+        await self._pool.close()
+        logger.debug("Async database connection pool closed")
+
+    async def coalesce(
+        self,
+        key: str,
+        operation: Callable[[], Awaitable[T]],
+        deadline: Optional[Deadline] = None
+    ) -> T:
+        deadline = deadline or Deadline()
+        try:
+            return await self._flights.do(key, operation, deadline.remaining())
+        except asyncio.TimeoutError:
+            raise self._timeout_error(deadline, f"waiting for shared request {key}")
+
+    def pool_stats(self) -> Dict[str, int]:
+        return self._pool.stats()
+
+    def coalescing_stats(self) -> Dict[str, int]:
+        return self._flights.stats()
@@ -0,0 +1,129 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window_size: int = 20,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if not 0 < failure_threshold <= 1:
+            raise ValueError(f"Invalid circuit failure threshold: {failure_threshold}")
+        if minimum_calls < 1 or window_size < minimum_calls:
+            raise ValueError(
+                f"Invalid circuit window: minimum_calls={minimum_calls}, window_size={window_size}"
+            )
+
+        self.failure_threshold = failure_threshold
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self._trial_started_at = 0.0
+        self._times_opened = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state_locked()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state_locked()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                now = self._clock()
+                # A trial that never reported back (e.g. cancelled) must not wedge the circuit.
+                if now - self._trial_started_at >= self.reset_timeout:
+                    self._trial_calls = 0
+                if self._trial_calls < self.half_open_max_calls:
+                    if self._trial_calls == 0:
+                        self._trial_started_at = now
+                    self._trial_calls += 1
+                    return True
+            self._rejected += 1
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._current_state_locked() != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._current_state_locked() == HALF_OPEN:
+                logger.info("Database circuit closed after successful trial request")
+                self._state = CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current_state_locked()
+            if state == HALF_OPEN:
+                self._open_locked("trial request failed")
+                return
+            if state == OPEN:
+                return
+
+            self._outcomes.append(False)
+            rate = self._failure_rate_locked()
+            if len(self._outcomes) >= self.minimum_calls and rate >= self.failure_threshold:
+                self._open_locked(f"failure rate {rate:.0%} over last {len(self._outcomes)} calls")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state_locked()
+            retry_after: Optional[float] = None
+            if state == OPEN:
+                retry_after = round(max(0.0, self._opened_at + self.reset_timeout - self._clock()), 3)
+            return {
+                "state": state,
+                "failure_rate": round(self._failure_rate_locked(), 3),
+                "window_calls": len(self._outcomes),
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+                "retry_after": retry_after
+            }
+
+    def _current_state_locked(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_calls = 0
+            self._trial_started_at = self._clock()
+        return self._state
+
+    def _failure_rate_locked(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open_locked(self, reason: str) -> None:
+        logger.warning(f"Database circuit opened for {self.reset_timeout}s: {reason}")
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+        self._outcomes.clear()
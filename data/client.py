@@ -1,24 +1,55 @@
 import json
+import random
 import socket
+import threading
 import time
 import logging
-from typing import Optional, Any, Dict, List
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import closing
+from typing import Optional, Any, Callable, Dict, FrozenSet, Iterator, List, Tuple, TypeVar
 from dataclasses import dataclass
 
 import sys
 import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-from core.message_framing import MessageFraming
+from core.message_framing import MessageFraming, FrameDecoder
+from data.exceptions import (
+    DatabaseError,
+    ConnectionError,
+    QueryError,
+    ResponseSizeError,
+    TimeoutError,
+    PoolExhaustedError,
+    CircuitOpenError,
+)
+from data.circuit_breaker import CLOSED, CircuitBreaker
+from data.deadline import Deadline
+from data.singleflight import SingleFlight
+from data.pool import ConnectionPool, PooledConnection
+from data.multiplex import MULTIPLEX_FEATURE, MultiplexedConnection, supports_multiplex
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+COMPRESSION_FEATURE = "compression"
+
 class DatabaseConstants:
     DEFAULT_RETRY_ATTEMPTS = 3
     DEFAULT_RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 30.0
     DEFAULT_TIMEOUT = 10.0
     RECV_BUFFER_SIZE = 4096
     DEFAULT_DATABASE = "siem"
+    DEFAULT_POOL_MIN_SIZE = 1
+    DEFAULT_POOL_MAX_SIZE = 10
+    DEFAULT_POOL_IDLE_TIMEOUT = 60.0
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 0.5
+    DEFAULT_CIRCUIT_MINIMUM_CALLS = 5
+    DEFAULT_CIRCUIT_RESET_TIMEOUT = 30.0
+    DEFAULT_COMPRESSION_THRESHOLD = MessageFraming.DEFAULT_COMPRESSION_THRESHOLD
     SECURITY_EVENTS_COLLECTION = "security_events"
 
 DEFAULT_RETRY_ATTEMPTS = DatabaseConstants.DEFAULT_RETRY_ATTEMPTS
@@ -33,34 +64,209 @@ class DatabaseConfig:
     timeout: float = DEFAULT_TIMEOUT
     retry_attempts: int = DEFAULT_RETRY_ATTEMPTS
     retry_delay: float = DEFAULT_RETRY_DELAY
+    pool_min_size: int = DatabaseConstants.DEFAULT_POOL_MIN_SIZE
+    pool_max_size: int = DatabaseConstants.DEFAULT_POOL_MAX_SIZE
+    pool_idle_timeout: float = DatabaseConstants.DEFAULT_POOL_IDLE_TIMEOUT
+    multiplex: bool = False
+    query_operators: Optional[List[str]] = None
+    compression: Optional[str] = None
+    compression_threshold: int = DatabaseConstants.DEFAULT_COMPRESSION_THRESHOLD
+    circuit_failure_threshold: float = DatabaseConstants.DEFAULT_CIRCUIT_FAILURE_THRESHOLD
+    circuit_minimum_calls: int = DatabaseConstants.DEFAULT_CIRCUIT_MINIMUM_CALLS
+    circuit_reset_timeout: float = DatabaseConstants.DEFAULT_CIRCUIT_RESET_TIMEOUT
 
 
-class DatabaseError(Exception):
-    pass
-
-
-class ConnectionError(DatabaseError):
-    pass
-
-
-class QueryError(DatabaseError):
-    pass
-
-
-class ResponseSizeError(DatabaseError):
+class _StaleConnectionError(QueryError):
     pass
 
 
-class TimeoutError(DatabaseError):
-    pass
-
-
-class DatabaseClient:
+class BaseDatabaseClient:
     SECURITY_EVENTS_COLLECTION = "security_events"
     
     def __init__(self, config: DatabaseConfig):
         self.config = config
-        self._socket: Optional[socket.socket] = None
+        self._breaker = CircuitBreaker(
+            failure_threshold=config.circuit_failure_threshold,
+            minimum_calls=config.circuit_minimum_calls,
+            window_size=max(20, config.circuit_minimum_calls),
+            reset_timeout=config.circuit_reset_timeout
+        )
+    
+    def _retry_delay(self, attempt: int) -> float:
+        delay = min(self.config.retry_delay * (2 ** attempt), DatabaseConstants.MAX_RETRY_DELAY)
+        # Jitter keeps clients that failed together from retrying in lockstep.
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def _retry_pause(self, attempt: int, deadline: Deadline) -> Optional[float]:
+        delay = self._retry_delay(attempt)
+        remaining = deadline.remaining()
+        if remaining is not None and remaining <= delay:
+            # Sleeping would use up the rest of the budget; give up now instead.
+            return None
+        return delay
+    
+    def _resolve_deadline(self, timeout: Optional[float], deadline: Optional[Deadline]) -> Deadline:
+        if deadline is None:
+            return Deadline(timeout)
+        if timeout is None:
+            return deadline
+        return Deadline(deadline.clamp(timeout))
+    
+    def _timeout_error(self, deadline: Deadline, operation_context: str) -> TimeoutError:
+        if deadline.bounded and deadline.expired:
+            return TimeoutError(
+                f"Database request exceeded its {deadline.timeout} second deadline. "
+                f"Operation: {operation_context}"
+            )
+        return TimeoutError(
+            f"Database query timed out after {self.config.timeout} seconds. "
+            f"Operation: {operation_context}"
+        )
+    
+    def _check_circuit(self, operation_context: str) -> None:
+        if not self._breaker.allow_request():
+            retry_after = self._breaker.retry_after()
+            raise CircuitOpenError(
+                f"Database unavailable, circuit open (retry in {retry_after:.1f}s). "
+                f"Operation: {operation_context}",
+                retry_after
+            )
+    
+    def _record_outcome(self, error: Optional[BaseException]) -> None:
+        if error is None or isinstance(error, ResponseSizeError):
+            # The server answered; oversized payloads say nothing about its health.
+            self._breaker.record_success()
+        elif isinstance(error, PoolExhaustedError):
+            pass
+        elif isinstance(error, (ConnectionError, QueryError, TimeoutError)):
+            self._breaker.record_failure()
+    
+    def circuit_stats(self) -> Dict[str, Any]:
+        return self._breaker.stats()
+    
+    def _serialize_request(self, request: Dict[str, Any], operation_context: str) -> str:
+        request_json = json.dumps(request)
+        
+        request_size = len(request_json.encode('utf-8'))
+        if request_size > MessageFraming.MAX_MESSAGE_SIZE:
+            raise ResponseSizeError(
+                f"Request size ({request_size} bytes) exceeds maximum allowed size "
+                f"({MessageFraming.MAX_MESSAGE_SIZE} bytes). Operation: {operation_context}"
+            )
+        
+        return request_json
+    
+    def _encode_request(self, request: Dict[str, Any], operation_context: str) -> bytes:
+        return MessageFraming.frame_message(self._serialize_request(request, operation_context))
+    
+    def _create_hello_request(self, features: List[str]) -> Dict[str, Any]:
+        request = {
+            "database": self.config.database,
+            "operation": "hello",
+            "features": features
+        }
+        if COMPRESSION_FEATURE in features:
+            request["compression"] = {
+                "codecs": [self.config.compression],
+                "threshold": self.config.compression_threshold
+            }
+        return request
+    
+    def _hello_features(self, *features: str) -> List[str]:
+        requested = list(features)
+        if self.config.compression:
+            requested.append(COMPRESSION_FEATURE)
+        return requested
+    
+    def _parse_compression(self, response: Dict[str, Any]) -> Optional[str]:
+        if response.get("status") != "ok" or COMPRESSION_FEATURE not in (response.get("features") or []):
+            return None
+        codec = response.get("compression")
+        return codec if codec in MessageFraming.COMPRESSION_CODECS else None
+    
+    def _parse_query_operators(self, response: Dict[str, Any]) -> FrozenSet[str]:
+        if response.get("status") != "ok":
+            return frozenset()
+        return frozenset(response.get("operators") or [])
+    
+    def _create_find_request(
+        self,
+        collection: str,
+        query: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        request = {
+            "database": self.config.database,
+            "operation": "find",
+            "collection": collection,
+            "query": query or {}
+        }
+        if fields is not None:
+            request["projection"] = {field_name: 1 for field_name in fields}
+        if batch_size is not None:
+            request["cursor"] = {"batch_size": batch_size}
+        return request
+    
+    def find_key(
+        self,
+        collection: str,
+        query: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        *variant: str
+    ) -> str:
+        request = self._create_find_request(collection, query, fields=fields)
+        key = {name: request.get(name) for name in ("database", "collection", "query", "projection")}
+        # sort_keys makes logically identical queries and projections share a key.
+        return json.dumps([key, *variant], sort_keys=True, default=str)
+    
+    def _find_context(
+        self,
+        collection: str,
+        query: Optional[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        fields: Optional[List[str]] = None
+    ) -> str:
+        context = f"find(collection={collection}, query={query}"
+        if batch_size is not None:
+            context += f", batch_size={batch_size}"
+        if fields is not None:
+            context += f", fields={fields}"
+        return context + ")"
+    
+    def _response_data(self, response: Dict[str, Any], operation_context: str) -> List[Dict[str, Any]]:
+        if response.get("status") == "error":
+            error_msg = response.get("message", "Unknown error")
+            raise QueryError(
+                f"Database returned error: {error_msg}. Operation: {operation_context}"
+            )
+        
+        return response.get("data", [])
+    
+    def _parse_find_response(self, response: Dict[str, Any], operation_context: str) -> List[Dict[str, Any]]:
+        data = self._response_data(response, operation_context)
+        logger.info(
+            f"Query successful: {len(data)} documents returned. "
+            f"Operation: {operation_context}"
+        )
+        return data
+
+
+class DatabaseClient(BaseDatabaseClient):
+    def __init__(self, config: DatabaseConfig):
+        super().__init__(config)
+        self._pool = ConnectionPool(
+            self._connect,
+            min_size=config.pool_min_size,
+            max_size=config.pool_max_size,
+            idle_timeout=config.pool_idle_timeout,
+            acquire_timeout=config.timeout
+        )
+        self._multiplex_enabled = config.multiplex
+        self._mux: Optional[MultiplexedConnection] = None
+        self._mux_lock = threading.Lock()
+        self._query_operators: Optional[FrozenSet[str]] = None
+        self._flights: SingleFlight = SingleFlight()
     
     def __enter__(self):
         return self
@@ -69,98 +275,99 @@ class DatabaseClient:
         self.close()
         return False
     
-    def _connect(self) -> socket.socket:
+    def _connect(self, timeout: Optional[float] = None) -> socket.socket:
+        deadline = Deadline(timeout)
         last_error: Optional[Exception] = None
+        attempts = 0
         
         for attempt in range(self.config.retry_attempts):
+            attempts += 1
+            sock = None
             try:
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(self.config.timeout)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                sock.settimeout(deadline.clamp(self.config.timeout))
                 sock.connect((self.config.host, self.config.port))
                 logger.debug(f"Connected to database at {self.config.host}:{self.config.port}")
                 return sock
             except socket.error as e:
+                if sock is not None:
+                    sock.close()
                 last_error = e
                 logger.warning(
                     f"Connection attempt {attempt + 1}/{self.config.retry_attempts} failed: {e}"
                 )
                 if attempt < self.config.retry_attempts - 1:
-                    time.sleep(self.config.retry_delay)
+                    pause = self._retry_pause(attempt, deadline)
+                    if pause is None:
+                        break
+                    time.sleep(pause)
         
         raise ConnectionError(
             f"Failed to connect to database at {self.config.host}:{self.config.port} "
-            f"after {self.config.retry_attempts} attempts: {last_error}"
+            f"after {attempts} attempts: {last_error}"
         )
     
-    def _send_request(self, request: Dict[str, Any], operation_context: str = "") -> Dict[str, Any]:
-        sock = None
+    def _send_request(
+        self,
+        request: Dict[str, Any],
+        operation_context: str = "",
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        deadline = deadline or Deadline()
+        
+        def attempt() -> Dict[str, Any]:
+            mux = self._get_multiplexed_connection(deadline)
+            if mux is not None:
+                request_json = self._serialize_request(request, operation_context)
+                return json.loads(
+                    mux.request(request_json, deadline.clamp(self.config.timeout), operation_context)
+                )
+            
+            framed_message = self._encode_request(request, operation_context)
+            conn, response = self._open_exchange(framed_message, operation_context, deadline)
+            self._pool.release(conn)
+            return response
+        
+        return self._with_retries(attempt, operation_context, deadline)
+    
+    def _with_retries(
+        self,
+        operation: Callable[[], T],
+        operation_context: str,
+        deadline: Optional[Deadline] = None
+    ) -> T:
+        deadline = deadline or Deadline()
+        if deadline.expired:
+            raise self._timeout_error(deadline, operation_context)
+        
+        self._check_circuit(operation_context)
+        try:
+            result = self._retry(operation, operation_context, deadline)
+        except BaseException as e:
+            self._record_outcome(e)
+            raise
+        self._record_outcome(None)
+        return result
+    
+    def _retry(self, operation: Callable[[], T], operation_context: str, deadline: Deadline) -> T:
         last_error: Optional[Exception] = None
         
         for attempt in range(self.config.retry_attempts):
+            if last_error is not None and self._breaker.state != CLOSED:
+                # Other requests already tripped the circuit; stop hammering the server.
+                raise last_error
             try:
-                sock = self._connect()
-                
-                request_json = json.dumps(request)
-                
-                request_size = len(request_json.encode('utf-8'))
-                if request_size > MessageFraming.MAX_MESSAGE_SIZE:
-                    raise ResponseSizeError(
-                        f"Request size ({request_size} bytes) exceeds maximum allowed size "
-                        f"({MessageFraming.MAX_MESSAGE_SIZE} bytes). Operation: {operation_context}"
-                    )
-                
-                framed_message = MessageFraming.frame_message(request_json)
-                sock.sendall(framed_message)
-                
-                response_data = b""
-                while not MessageFraming.has_complete_message(response_data):
-                    chunk = sock.recv(4096)
-                    if not chunk:
-                        raise QueryError(
-                            f"Connection closed by server before complete response. "
-                            f"Operation: {operation_context}"
-                        )
-                    response_data += chunk
-                    
-                    if len(response_data) > MessageFraming.MAX_MESSAGE_SIZE:
-                        raise ResponseSizeError(
-                            f"Response size exceeds maximum allowed size "
-                            f"({MessageFraming.MAX_MESSAGE_SIZE} bytes). "
-                            f"Operation: {operation_context}"
-                        )
-                
-                try:
-                    response_json, _ = MessageFraming.extract_message(response_data)
-                except ValueError as e:
-                    if "exceeds maximum allowed size" in str(e):
-                        raise ResponseSizeError(
-                            f"Response size validation failed: {e}. "
-                            f"Operation: {operation_context}"
-                        )
-                    raise QueryError(
-                        f"Message framing error: {e}. Operation: {operation_context}"
-                    )
-                
-                response = json.loads(response_json)
-                
-                logger.debug(
-                    f"Database operation successful. Operation: {operation_context}, "
-                    f"Response size: {len(response_data)} bytes"
-                )
-                
-                return response
+                return operation()
                 
             except socket.timeout:
-                last_error = TimeoutError(
-                    f"Database query timed out after {self.config.timeout} seconds. "
-                    f"Operation: {operation_context}"
-                )
+                last_error = self._timeout_error(deadline, operation_context)
                 logger.warning(
                     f"Timeout on attempt {attempt + 1}/{self.config.retry_attempts}: "
                     f"{operation_context}"
                 )
                 if attempt < self.config.retry_attempts - 1:
-                    time.sleep(self.config.retry_delay)
+                    self._pause_before_retry(attempt, deadline, last_error)
                 else:
                     raise last_error
                     
@@ -178,7 +385,7 @@ class DatabaseClient:
                     f"{operation_context}"
                 )
                 if attempt < self.config.retry_attempts - 1:
-                    time.sleep(self.config.retry_delay)
+                    self._pause_before_retry(attempt, deadline, last_error)
                 else:
                     raise last_error
                     
@@ -193,81 +400,311 @@ class DatabaseClient:
                     f"Error on attempt {attempt + 1}/{self.config.retry_attempts}: {e}"
                 )
                 if attempt < self.config.retry_attempts - 1:
-                    time.sleep(self.config.retry_delay)
+                    self._pause_before_retry(attempt, deadline, last_error)
                 else:
                     raise last_error
-            finally:
-                if sock:
-                    try:
-                        sock.close()
-                    except Exception:
-                        pass
         
         if last_error:
             raise last_error
         raise QueryError(f"Database query failed after retries. Operation: {operation_context}")
     
-    def _create_find_request(
+    def _pause_before_retry(self, attempt: int, deadline: Deadline, last_error: Exception) -> None:
+        pause = self._retry_pause(attempt, deadline)
+        if pause is None:
+            raise last_error
+        time.sleep(pause)
+    
+    def _get_multiplexed_connection(self, deadline: Optional[Deadline] = None) -> Optional[MultiplexedConnection]:
+        if not self._multiplex_enabled:
+            return None
+        
+        mux = self._mux
+        if mux is not None and mux.is_open:
+            return mux
+        
+        with self._mux_lock:
+            if not self._multiplex_enabled:
+                return None
+            if self._mux is not None and self._mux.is_open:
+                return self._mux
+            
+            deadline = deadline or Deadline()
+            sock = self._connect(deadline.remaining())
+            try:
+                hello = self._encode_request(
+                    self._create_hello_request(self._hello_features(MULTIPLEX_FEATURE)), "hello"
+                )
+                response = self._exchange(sock, hello, "hello", deadline)
+            except (QueryError, json.JSONDecodeError) as e:
+                response = {"status": "error", "message": str(e)}
+            except BaseException:
+                sock.close()
+                raise
+            
+            if not supports_multiplex(response):
+                sock.close()
+                self._multiplex_enabled = False
+                logger.info("Database server does not support multiplexing, using pooled connections")
+                return None
+            
+            logger.debug(
+                f"Multiplexed connection established to {self.config.host}:{self.config.port}, "
+                f"compression: {self._parse_compression(response) or 'none'}"
+            )
+            self._mux = MultiplexedConnection(sock)
+            return self._mux
+    
+    def _open_exchange(
         self,
-        collection: str,
-        query: Optional[Dict[str, Any]] = None
+        framed_message: bytes,
+        operation_context: str,
+        deadline: Deadline
+    ) -> Tuple[PooledConnection, Dict[str, Any]]:
+        conn: Optional[PooledConnection] = self._pool.acquire(deadline.remaining())
+        try:
+            try:
+                self._negotiate(conn, deadline)
+                response = self._exchange(conn.sock, framed_message, operation_context, deadline)
+            except _StaleConnectionError:
+                if not conn.reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a new one.
+                logger.debug(f"Pooled connection went stale, reconnecting. Operation: {operation_context}")
+                self._pool.discard(conn)
+                conn = None
+                conn = self._pool.acquire(deadline.remaining(), fresh=True)
+                self._negotiate(conn, deadline)
+                response = self._exchange(conn.sock, framed_message, operation_context, deadline)
+        except BaseException:
+            if conn is not None:
+                self._pool.discard(conn)
+            raise
+        
+        return conn, response
+    
+    def _negotiate(self, conn: PooledConnection, deadline: Deadline) -> None:
+        if conn.negotiated or not self.config.compression:
+            return
+        
+        hello = self._encode_request(self._create_hello_request(self._hello_features()), "hello")
+        response = self._exchange(conn.sock, hello, "hello", deadline)
+        conn.negotiated = True
+        logger.debug(f"Negotiated connection compression: {self._parse_compression(response) or 'none'}")
+    
+    def _exchange(
+        self,
+        sock: socket.socket,
+        framed_message: bytes,
+        operation_context: str,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
-        return {
-            "database": self.config.database,
-            "operation": "find",
-            "collection": collection,
-            "query": query or {}
-        }
+        deadline = deadline or Deadline()
+        sock.settimeout(deadline.clamp(self.config.timeout))
+        
+        try:
+            sock.sendall(framed_message)
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError) as e:
+            raise _StaleConnectionError(
+                f"Connection closed by server before request was sent: {e}. "
+                f"Operation: {operation_context}"
+            )
+        
+        return self._read_response(sock, operation_context, deadline)
+    
+    def _read_response(
+        self,
+        sock: socket.socket,
+        operation_context: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        decoder = FrameDecoder()
+        while not decoder.complete:
+            if deadline is not None and deadline.bounded:
+                # The socket timeout bounds one recv; the deadline bounds the whole response.
+                remaining = deadline.remaining()
+                if not remaining:
+                    raise socket.timeout("Deadline expired while reading response")
+                sock.settimeout(min(self.config.timeout, remaining))
+            try:
+                count = decoder.recv_from(sock)
+            except (ConnectionResetError, ConnectionAbortedError) as e:
+                if decoder.bytes_received:
+                    raise
+                raise _StaleConnectionError(
+                    f"Connection reset by server before response: {e}. "
+                    f"Operation: {operation_context}"
+                )
+            except ValueError as e:
+                raise _framing_error(e, operation_context)
+            if not count:
+                error_cls = _StaleConnectionError if not decoder.bytes_received else QueryError
+                raise error_cls(
+                    f"Connection closed by server before complete response. "
+                    f"Operation: {operation_context}"
+                )
+        
+        if decoder.flags & ~MessageFraming.FLAG_COMPRESSED:
+            raise QueryError(
+                f"Message framing error: unexpected frame flags {decoder.flags:#x}. "
+                f"Operation: {operation_context}"
+            )
+        
+        try:
+            payload = MessageFraming.decode_payload(decoder.flags, decoder.payload)
+        except ValueError as e:
+            raise _framing_error(e, operation_context)
+        response = json.loads(payload)
+        
+        logger.debug(
+            f"Database operation successful. Operation: {operation_context}, "
+            f"Response size: {decoder.bytes_received} bytes"
+        )
+        
+        return response
+    
+    def query_operators(self, deadline: Optional[Deadline] = None) -> FrozenSet[str]:
+        if self.config.query_operators is not None:
+            return frozenset(self.config.query_operators)
+        
+        if self._query_operators is None:
+            try:
+                response = self._send_request(
+                    self._create_hello_request(self._hello_features()), "hello", deadline
+                )
+            except QueryError as e:
+                logger.warning(f"Database did not answer capability request, filtering in-process: {e}")
+                response = {"status": "error"}
+            self._query_operators = self._parse_query_operators(response)
+            logger.info(f"Database query operators: {sorted(self._query_operators) or 'none'}")
+        
+        return self._query_operators
     
     def find(
         self,
         collection: str,
         query: Optional[Dict[str, Any]] = None,
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
     ) -> List[Dict[str, Any]]:
-        original_timeout = self.config.timeout
-        if timeout is not None:
-            self.config.timeout = timeout
+        deadline = self._resolve_deadline(timeout, deadline)
+        request = self._create_find_request(collection, query, fields=fields)
+        operation_context = self._find_context(collection, query, fields=fields)
         
-        try:
-            request = self._create_find_request(collection, query)
-            operation_context = f"find(collection={collection}, query={query})"
-            response = self._send_request(request, operation_context)
-            
-            if response.get("status") == "error":
-                error_msg = response.get("message", "Unknown error")
-                raise QueryError(
-                    f"Database returned error: {error_msg}. Operation: {operation_context}"
-                )
-            
-            data = response.get("data", [])
-            logger.info(
-                f"Query successful: {len(data)} documents returned. "
-                f"Operation: {operation_context}"
-            )
-            return data
-        finally:
-            self.config.timeout = original_timeout
+        def load() -> List[Dict[str, Any]]:
+            response = self._send_request(request, operation_context, deadline)
+            return self._parse_find_response(response, operation_context)
+        
+        # Concurrent identical finds share one request; each caller gets its own list.
+        return list(self.coalesce(self.find_key(collection, query, fields), load, deadline))
     
     def find_security_events(
         self,
         query: Optional[Dict[str, Any]] = None,
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
     ) -> List[Dict[str, Any]]:
-        return self.find(self.SECURITY_EVENTS_COLLECTION, query, timeout)
+        return self.find(self.SECURITY_EVENTS_COLLECTION, query, timeout, fields, deadline)
+    
+    def iter_find_batches(
+        self,
+        collection: str,
+        query: Optional[Dict[str, Any]] = None,
+        batch_size: int = DatabaseConstants.DEFAULT_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        deadline = deadline or Deadline()
+        request = self._create_find_request(collection, query, batch_size, fields)
+        operation_context = self._find_context(collection, query, batch_size, fields)
+        framed_message = self._encode_request(request, operation_context)
+        
+        # Only opening the cursor is retried; once batches were handed out a retry would duplicate them.
+        conn, response = self._with_retries(
+            lambda: self._open_exchange(framed_message, operation_context, deadline),
+            operation_context,
+            deadline
+        )
+        
+        exhausted = False
+        total = 0
+        try:
+            while True:
+                batch = self._response_data(response, operation_context)
+                total += len(batch)
+                has_more = bool(response.get("has_more"))
+                yield batch
+                
+                if not has_more:
+                    exhausted = True
+                    break
+                
+                try:
+                    response = self._read_response(conn.sock, operation_context, deadline)
+                except socket.timeout:
+                    raise self._timeout_error(deadline, operation_context)
+                except (OSError, json.JSONDecodeError) as e:
+                    raise QueryError(
+                        f"Database cursor failed: {e}. Operation: {operation_context}"
+                    )
+        finally:
+            # An abandoned cursor leaves unread batches on the socket, so it can't be reused.
+            if exhausted:
+                self._pool.release(conn)
+            else:
+                self._pool.discard(conn)
+        
+        logger.info(
+            f"Cursor exhausted: {total} documents returned. "
+            f"Operation: {operation_context}"
+        )
+    
+    def iter_security_events(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        batch_size: int = DatabaseConstants.DEFAULT_BATCH_SIZE,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Iterator[Dict[str, Any]]:
+        batches = self.iter_find_batches(
+            self.SECURITY_EVENTS_COLLECTION, query, batch_size, fields, deadline
+        )
+        with closing(batches):
+            for batch in batches:
+                yield from batch
     
     def close(self):
-        if self._socket:
-            try:
-                self._socket.shutdown(socket.SHUT_RDWR)
-            except Exception:
-                pass
-            try:
-                self._socket.close()
-            except Exception:
-                pass
-            self._socket = None
-            logger.debug("Database connection closed")
+        with self._mux_lock:
+            if self._mux is not None:
+                self._mux.close()
+                self._mux = None
+        self._pool.close()
+        logger.debug("Database connection pool closed")
+    
+    def coalesce(self, key: str, operation: Callable[[], T], deadline: Optional[Deadline] = None) -> T:
+        deadline = deadline or Deadline()
+        try:
+            return self._flights.do(key, operation, deadline.remaining())
+        except FutureTimeoutError:
+            raise self._timeout_error(deadline, f"waiting for shared request {key}")
+    
+    def pool_stats(self) -> Dict[str, int]:
+        return self._pool.stats()
+    
+    def coalescing_stats(self) -> Dict[str, int]:
+        return self._flights.stats()
+
+
+def _framing_error(error: ValueError, operation_context: str) -> Exception:
+    if "exceeds maximum allowed size" in str(error):
+        return ResponseSizeError(
+            f"Response size validation failed: {error}. "
+            f"Operation: {operation_context}"
+        )
+    return QueryError(
+        f"Message framing error: {error}. Operation: {operation_context}"
+    )
 
 
 def create_client_from_config(host: str, port: int, database: str = "siem") -> DatabaseClient:
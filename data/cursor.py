@@ -0,0 +1,67 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, Tuple
+
+# Results are newest first; equal times go by _id, the order they were
+# ingested in when the database hands out increasing ids.
+EventOrder = Tuple[int, int, Any]
+
+
+def id_rank(event_id: Any) -> Tuple[int, Any]:
+    # _id values of different types still get one total order.
+    if event_id is None:
+        return 0, 0
+    if isinstance(event_id, bool):
+        return 1, int(event_id)
+    if isinstance(event_id, (int, float)):
+        return 1, event_id
+    if isinstance(event_id, str):
+        return 2, event_id
+    return 3, repr(event_id)
+
+
+def event_order(seconds: int, event_id: Any) -> EventOrder:
+    kind, value = id_rank(event_id)
+    return -seconds, kind, value
+
+
+@dataclass(frozen=True)
+class EventCursor:
+    seconds: int
+    kind: int
+    value: Any
+
+    @classmethod
+    def of(cls, seconds: int, event_id: Any) -> "EventCursor":
+        kind, value = id_rank(event_id)
+        return cls(seconds, kind, value)
+
+    @property
+    def order(self) -> EventOrder:
+        return -self.seconds, self.kind, self.value
+
+    def encode(self) -> str:
+        text = json.dumps([self.seconds, self.kind, self.value], separators=(",", ":"))
+        return base64.urlsafe_b64encode(text.encode()).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, token: str) -> "EventCursor":
+        try:
+            text = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            seconds, kind, value = json.loads(text)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise ValueError(f"Invalid cursor: {token!r}")
+
+        if type(seconds) is not int or not _valid_rank(kind, value):
+            raise ValueError(f"Invalid cursor: {token!r}")
+        return cls(seconds, kind, value)
+
+
+def _valid_rank(kind: Any, value: Any) -> bool:
+    if kind == 0:
+        return type(value) is int and value == 0
+    if kind == 1:
+        return type(value) in (int, float)
+    return kind in (2, 3) and isinstance(value, str)
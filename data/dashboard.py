@@ -0,0 +1,543 @@
+import heapq
+import logging
+import re
+import threading
+from bisect import insort
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Optional, Any, Dict, Iterable, List, Tuple
+
+from data.rollups import EventRollups, TimelineQuery
+from data.sketches import DEFAULT_DISTINCT_ERROR, DEFAULT_TOP_ERROR, DashboardSketches
+from data.timestamps import event_seconds
+from data.watermark import Watermark
+
+logger = logging.getLogger(__name__)
+
+
+DASHBOARD_EVENT_LIMIT = 10000
+
+# Everything _aggregate_dashboard_data and the latest-N selection read.
+DASHBOARD_FIELDS = [
+    "timestamp", "hostname", "source", "event_type",
+    "severity", "user", "process", "agent_last_seen"
+]
+
+LOGIN_EVENT_TYPES = ("user_login", "authentication_failure", "ssh_connection")
+DASHBOARD_TOP_LIMIT = 10
+
+_MISSING = object()
+
+_HOUR_MINUTE = re.compile(r"[T ](\d{2}):(\d{2})")
+
+# Window order: newest first, equal times in arrival order.
+_Order = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class _WindowEvent:
+    # One per event in the window: no per-instance __dict__.
+    __slots__ = (
+        "order", "hostname", "event_type", "severity", "user",
+        "process", "agent_last_seen", "hour", "login"
+    )
+
+    order: _Order
+    hostname: Any
+    event_type: Any
+    severity: Any
+    user: Any
+    process: Any
+    agent_last_seen: Any
+    hour: Optional[int]
+    login: Optional[Dict[str, Any]]
+
+
+class _Tally:
+    def __init__(self):
+        # key -> [count, order of its newest event]; the order is where the key
+        # first appears when the window is read newest first.
+        self._entries: Dict[Any, List[Any]] = {}
+
+    def add(self, key: Any, order: _Order) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [1, order]
+            return
+        entry[0] += 1
+        if order < entry[1]:
+            entry[1] = order
+
+    def remove(self, key: Any) -> None:
+        # Only the oldest event in the window expires, so a key's newest event
+        # goes only with the key itself.
+        entry = self._entries[key]
+        entry[0] -= 1
+        if entry[0] == 0:
+            del self._entries[key]
+
+    def in_order(self) -> List[Tuple[Any, int]]:
+        return [(key, entry[0]) for key, entry in sorted(self._entries.items(), key=lambda item: item[1][1])]
+
+    def ranked(self, limit: Optional[int] = None) -> List[Tuple[Any, int]]:
+        # Count descending, ties where they first appear: what a stable sort of
+        # a dict filled newest first gives.
+        def rank(item: Tuple[Any, List[Any]]) -> Tuple[int, _Order]:
+            return -item[1][0], item[1][1]
+
+        if limit is None:
+            entries = sorted(self._entries.items(), key=rank)
+        else:
+            entries = heapq.nsmallest(limit, self._entries.items(), key=rank)
+        return [(key, entry[0]) for key, entry in entries]
+
+
+class _DashboardWindow:
+    def __init__(
+        self,
+        size: int,
+        rollups: Optional[EventRollups] = None,
+        sketches: Optional[DashboardSketches] = None
+    ):
+        self.size = size
+        # Rollups and sketches count every event added, not only the newest `size`.
+        self.rollups = rollups
+        self.sketches = sketches
+        self.events: List[Tuple[_Order, _WindowEvent]] = []
+        self.logins: List[Tuple[_Order, Dict[str, Any]]] = []
+        # Added but not yet counted; only the newest `size` of them can ever be.
+        self.pending: List[Tuple[_Order, Dict[str, Any]]] = []
+        self.sequence = 0
+
+        self.hosts = _Tally()
+        self.event_types = _Tally()
+        self.severities = _Tally()
+        self.users = _Tally()
+        self.processes = _Tally()
+        self.agents = _Tally()
+        self.agent_last_seen: Dict[Any, Counter] = {}
+        self.agent_latest: Dict[Any, Any] = {}
+        self.hourly_counts = [0] * 24
+
+        # Same watermark rules as the event cache, which may feed this window.
+        self.watermark = Watermark()
+
+    @property
+    def incremental(self) -> bool:
+        return self.watermark.incremental
+
+    def add(self, documents: Iterable[Dict[str, Any]]) -> None:
+        pending = self.pending
+        full = len(self.events) >= self.size
+        oldest = self.events[-1][0] if full else None
+        sequence = self.sequence
+        watermark = self.watermark
+        rollups = self.rollups
+        sketches = self.sketches
+
+        for document in documents:
+            if not watermark.add(document):
+                continue
+
+            seconds = event_seconds(document.get("timestamp", ""))
+            if rollups is not None:
+                rollups.add_event(seconds, document)
+            if sketches is not None:
+                sketches.add_event(seconds, document)
+            order = (-seconds, sequence)
+            sequence += 1
+            # A full window only takes events newer than its oldest.
+            if full and order > oldest:
+                continue
+
+            pending.append((order, document))
+            if len(pending) >= 2 * self.size:
+                pending[:] = heapq.nsmallest(self.size, pending)
+
+        self.sequence = sequence
+        if rollups is not None:
+            rollups.prune()
+        if sketches is not None:
+            sketches.commit()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+
+        entries: List[Tuple[_Order, _WindowEvent]] = []
+        for order, document in heapq.nsmallest(self.size, self.pending):
+            event = _window_event(document, order)
+            try:
+                hash((event.hostname, event.event_type, event.severity,
+                      event.user, event.process, event.agent_last_seen))
+            except TypeError:
+                logger.warning(
+                    f"Skipping event {document.get('_id')!r} in dashboard aggregation: unhashable field value"
+                )
+                continue
+            entries.append((order, event))
+        self.pending = []
+
+        # Both lists are newest first: whatever falls past `size` after merging expires.
+        merged = list(heapq.merge(self.events, entries))
+        if len(merged) > self.size:
+            boundary = merged[self.size - 1][0]
+            entries = [entry for entry in entries if entry[0] <= boundary]
+            expired = [entry for entry in self.events if entry[0] > boundary]
+        else:
+            expired = []
+
+        for _, event in entries:
+            self._count(event)
+        for _, event in expired:
+            self._uncount(event)
+        self.events = merged[:self.size]
+
+    def _count(self, event: _WindowEvent) -> None:
+        order = event.order
+        if event.hostname:
+            self.agents.add(event.hostname, order)
+            values = self.agent_last_seen.get(event.hostname)
+            if values is None:
+                values = self.agent_last_seen[event.hostname] = Counter()
+            values[event.agent_last_seen] += 1
+            latest = self.agent_latest.get(event.hostname, _MISSING)
+            if latest is not _MISSING:
+                try:
+                    if event.agent_last_seen > latest:
+                        self.agent_latest[event.hostname] = event.agent_last_seen
+                except TypeError:
+                    del self.agent_latest[event.hostname]
+
+        if event.login is not None:
+            insort(self.logins, (order, event.login))
+
+        self.hosts.add(event.hostname, order)
+        self.event_types.add(event.event_type, order)
+        self.severities.add(event.severity, order)
+        if event.user:
+            self.users.add(event.user, order)
+        if event.process:
+            self.processes.add(event.process, order)
+        if event.hour is not None:
+            self.hourly_counts[event.hour] += 1
+
+    def _uncount(self, event: _WindowEvent) -> None:
+        if event.hostname:
+            self.agents.remove(event.hostname)
+            values = self.agent_last_seen[event.hostname]
+            values[event.agent_last_seen] -= 1
+            if not values[event.agent_last_seen]:
+                del values[event.agent_last_seen]
+                if not values:
+                    del self.agent_last_seen[event.hostname]
+                    self.agent_latest.pop(event.hostname, None)
+                elif self.agent_latest.get(event.hostname, _MISSING) == event.agent_last_seen:
+                    del self.agent_latest[event.hostname]
+
+        if event.login is not None:
+            # Expiring events are older than everything kept, so their logins are the tail.
+            self.logins.pop()
+
+        self.hosts.remove(event.hostname)
+        self.event_types.remove(event.event_type)
+        self.severities.remove(event.severity)
+        if event.user:
+            self.users.remove(event.user)
+        if event.process:
+            self.processes.remove(event.process)
+        if event.hour is not None:
+            self.hourly_counts[event.hour] -= 1
+
+    def latest_seen(self, hostname: Any) -> Any:
+        latest = self.agent_latest.get(hostname, _MISSING)
+        if latest is _MISSING:
+            # Comparisons may raise TypeError here, as they did in the per-call aggregation.
+            latest = max(self.agent_last_seen[hostname])
+            self.agent_latest[hostname] = latest
+        return latest
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.flush()
+        agents = {hostname: self.latest_seen(hostname) for hostname, _ in self.agents.in_order()}
+
+        data = {
+            "active_agents": [
+                {"agent_id": agent_id, "last_activity": last_activity, "status": "active"}
+                for agent_id, last_activity in sorted(agents.items(), key=lambda x: x[1], reverse=True)
+            ],
+            "recent_logins": [dict(login) for _, login in self.logins[:DASHBOARD_TOP_LIMIT]],
+            "host_list": [
+                {"hostname": hostname, "event_count": count, "last_seen": agents.get(hostname, "")}
+                for hostname, count in self.hosts.ranked()
+            ],
+            "events_by_type": [
+                {"event_type": evt_type, "count": count}
+                for evt_type, count in self.event_types.ranked()
+            ],
+            "events_by_severity": [
+                {"severity": severity, "count": count}
+                for severity, count in self.severities.in_order()
+            ],
+            "top_users": [
+                {"user": user, "event_count": count}
+                for user, count in self.users.ranked(DASHBOARD_TOP_LIMIT)
+            ],
+            "top_processes": [
+                {"process": process, "event_count": count}
+                for process, count in self.processes.ranked(DASHBOARD_TOP_LIMIT)
+            ],
+            "event_timeline": [{"hour": h, "event_count": self.hourly_counts[h]} for h in range(24)],
+            "total_events": len(self.events)
+        }
+        if self.sketches is not None:
+            data.update(_sketch_panels(self.sketches, agents))
+        return data
+
+
+class DashboardAggregator:
+    def __init__(
+        self,
+        window: int = DASHBOARD_EVENT_LIMIT,
+        rollup_retention: Optional[Dict[str, Optional[float]]] = None,
+        sketch_range: Optional[float] = None,
+        sketch_top_error: float = DEFAULT_TOP_ERROR,
+        sketch_distinct_error: float = DEFAULT_DISTINCT_ERROR
+    ):
+        if window <= 0:
+            raise ValueError(f"Invalid dashboard window: {window}")
+        self.window = window
+        self.rollup_retention = rollup_retention
+        # With a sketch range the host, user and process panels cover that much
+        # time in bounded memory instead of the newest `window` events exactly.
+        self.sketch_range = sketch_range
+        self.sketch_top_error = sketch_top_error
+        self.sketch_distinct_error = sketch_distinct_error
+        self.rollups_enabled = EventRollups(rollup_retention).enabled
+        self._window = self.new_window()
+        self._lock = threading.RLock()
+
+    @property
+    def incremental(self) -> bool:
+        with self._lock:
+            return self._window.incremental
+
+    def delta_query(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._window.watermark.query()
+
+    def new_window(self) -> _DashboardWindow:
+        rollups = EventRollups(self.rollup_retention) if self.rollups_enabled else None
+        sketches = None
+        if self.sketch_range is not None:
+            sketches = DashboardSketches(self.sketch_range, self.sketch_top_error, self.sketch_distinct_error)
+        return _DashboardWindow(self.window, rollups, sketches)
+
+    def add(self, documents: Iterable[Dict[str, Any]], window: Optional[_DashboardWindow] = None) -> None:
+        # A full reload fills a separate window so readers keep the old one until it's done.
+        with self._lock:
+            (self._window if window is None else window).add(documents)
+
+    def complete_refresh(self, window: Optional[_DashboardWindow] = None) -> None:
+        with self._lock:
+            if window is not None:
+                self._window = window
+            self._window.watermark.commit()
+            self._window.flush()
+
+    def abort_refresh(self, window: Optional[_DashboardWindow] = None) -> None:
+        # A reload's window is dropped; a delta keeps what it added.
+        if window is None:
+            with self._lock:
+                self._window.watermark.abort()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._window.snapshot()
+
+    def timeline(self, query: TimelineQuery) -> Dict[str, Any]:
+        with self._lock:
+            if self._window.rollups is None:
+                raise ValueError("Timeline rollups are disabled")
+            return self._window.rollups.timeline(query)
+
+
+def _sketch_panels(sketches: DashboardSketches, agents: Dict[Any, Any]) -> Dict[str, Any]:
+    summary = sketches.summary()
+    return {
+        "host_list": [
+            {"hostname": hostname, "event_count": count, "last_seen": agents.get(hostname, "")}
+            for hostname, count, _ in summary.hosts.top()
+        ],
+        "top_users": [
+            {"user": user, "event_count": count}
+            for user, count, _ in summary.users.top(DASHBOARD_TOP_LIMIT)
+        ],
+        "top_processes": [
+            {"process": process, "event_count": count}
+            for process, count, _ in summary.processes.top(DASHBOARD_TOP_LIMIT)
+        ],
+        "distinct_hosts": summary.distinct_hosts.estimate(),
+        "distinct_users": summary.distinct_users.estimate(),
+        "sketch_events": summary.events
+    }
+
+
+def _window_event(document: Dict[str, Any], order: _Order) -> _WindowEvent:
+    hostname = document.get("hostname", "unknown")
+    evt_type = document.get("event_type", "unknown")
+    timestamp = document.get("timestamp", "")
+    user = document.get("user")
+
+    login = None
+    if evt_type in LOGIN_EVENT_TYPES:
+        login = {
+            "timestamp": timestamp,
+            "user": user or "unknown",
+            "hostname": hostname,
+            "success": evt_type != "authentication_failure",
+            "source": document.get("source", "unknown")
+        }
+
+    hour = None
+    try:
+        if timestamp:
+            hour = _extract_hour_from_timestamp(timestamp)
+    except Exception:
+        pass
+
+    return _WindowEvent(
+        order=order,
+        hostname=hostname,
+        event_type=evt_type,
+        severity=document.get("severity", "unknown"),
+        user=user,
+        process=document.get("process"),
+        agent_last_seen=document.get("agent_last_seen", timestamp),
+        hour=hour,
+        login=login
+    )
+
+
+def _aggregate_dashboard_data(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    agents: Dict[str, str] = {}
+    logins: List[Dict[str, Any]] = []
+    hosts: Dict[str, int] = defaultdict(int)
+    event_types: Dict[str, int] = defaultdict(int)
+    severities: Dict[str, int] = defaultdict(int)
+    users: Dict[str, int] = defaultdict(int)
+    processes: Dict[str, int] = defaultdict(int)
+    hourly_counts: Dict[int, int] = defaultdict(int)
+    
+    for event in events:
+        hostname = event.get("hostname", "unknown")
+        evt_type = event.get("event_type", "unknown")
+        severity = event.get("severity", "unknown")
+        user = event.get("user")
+        process = event.get("process")
+        timestamp = event.get("timestamp", "")
+        agent_last_seen = event.get("agent_last_seen", timestamp)
+        source = event.get("source", "unknown")
+        
+        if hostname:
+            if hostname not in agents or agent_last_seen > agents[hostname]:
+                agents[hostname] = agent_last_seen
+        
+        if evt_type in LOGIN_EVENT_TYPES:
+            logins.append({
+                "timestamp": timestamp,
+                "user": user or "unknown",
+                "hostname": hostname,
+                "success": evt_type != "authentication_failure",
+                "source": source
+            })
+        
+        hosts[hostname] += 1
+        
+        event_types[evt_type] += 1
+        
+        severities[severity] += 1
+        
+        if user:
+            users[user] += 1
+        
+        if process:
+            processes[process] += 1
+        
+        try:
+            if timestamp:
+                hour = _extract_hour_from_timestamp(timestamp)
+                if hour is not None:
+                    hourly_counts[hour] += 1
+        except Exception:
+            pass
+    
+    sorted_logins = heapq.nlargest(
+        DASHBOARD_TOP_LIMIT, logins, key=lambda x: event_seconds(x.get("timestamp"))
+    )
+    sorted_hosts = sorted(hosts.items(), key=lambda x: x[1], reverse=True)
+    sorted_users = sorted(users.items(), key=lambda x: x[1], reverse=True)[:DASHBOARD_TOP_LIMIT]
+    sorted_processes = sorted(processes.items(), key=lambda x: x[1], reverse=True)[:DASHBOARD_TOP_LIMIT]
+    
+    timeline = [{"hour": h, "event_count": hourly_counts.get(h, 0)} for h in range(24)]
+    
+    return {
+        "active_agents": [
+            {"agent_id": agent_id, "last_activity": last_activity, "status": "active"}
+            for agent_id, last_activity in sorted(agents.items(), key=lambda x: x[1], reverse=True)
+        ],
+        "recent_logins": sorted_logins,
+        "host_list": [
+            {"hostname": hostname, "event_count": count, "last_seen": agents.get(hostname, "")}
+            for hostname, count in sorted_hosts
+        ],
+        "events_by_type": [
+            {"event_type": evt_type, "count": count}
+            for evt_type, count in sorted(event_types.items(), key=lambda x: x[1], reverse=True)
+        ],
+        "events_by_severity": [
+            {"severity": severity, "count": count}
+            for severity, count in severities.items()
+        ],
+        "top_users": [
+            {"user": user, "event_count": count}
+            for user, count in sorted_users
+        ],
+        "top_processes": [
+            {"process": process, "event_count": count}
+            for process, count in sorted_processes
+        ],
+        "event_timeline": timeline,
+        "total_events": len(events)
+    }
+
+
+def _extract_hour_from_timestamp(timestamp: str) -> Optional[int]:
+    if not timestamp:
+        return None
+    
+    match = _HOUR_MINUTE.search(timestamp)
+    if match:
+        hour = int(match.group(1))
+        minute = int(match.group(2))
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return hour
+    
+    return None
+
+
+def _empty_dashboard_data(error: Optional[str] = None) -> Dict[str, Any]:
+    result = {
+        "active_agents": [],
+        "recent_logins": [],
+        "host_list": [],
+        "events_by_type": [],
+        "events_by_severity": [],
+        "top_users": [],
+        "top_processes": [],
+        "event_timeline": [{"hour": h, "event_count": 0} for h in range(24)],
+        "total_events": 0
+    }
+    if error:
+        result["error"] = error
+    return result
\ No newline at end of file
@@ -0,0 +1,38 @@
+import time
+from typing import Callable, Optional
+
+
+class Deadline:
+    def __init__(self, timeout: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if timeout is not None and timeout < 0:
+            raise ValueError(f"Invalid deadline timeout: {timeout}")
+        self.timeout = timeout
+        self._clock = clock
+        self._expires_at = None if timeout is None else clock() + timeout
+
+    @property
+    def bounded(self) -> bool:
+        return self._expires_at is not None
+
+    @property
+    def expired(self) -> bool:
+        return self._expires_at is not None and self._clock() >= self._expires_at
+
+    def remaining(self) -> Optional[float]:
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - self._clock())
+
+    def clamp(self, timeout: Optional[float]) -> Optional[float]:
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        if remaining is None:
+            return "Deadline(unbounded)"
+        return f"Deadline(timeout={self.timeout}, remaining={remaining:.3f})"
@@ -0,0 +1,786 @@
+import sys
+import time
+import logging
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from data.cursor import EventCursor, id_rank
+from data.deadline import Deadline
+from data.event_snapshot import (
+    EventSnapshot,
+    Sections,
+    decode_array,
+    decode_json,
+    encode_array,
+    encode_json,
+)
+from data.parallel_filter import MISSING, ParallelFilter
+from data.search_query import DateRange, Match, Not, SearchQuery, Term
+from data.search_results import CachedSearchResults
+from data.timestamps import MIN_SECONDS, format_seconds, timestamp_seconds
+from data.watermark import Watermark
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_EVENT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_EVENT_CACHE_REFRESH_INTERVAL = 5.0
+DEFAULT_EVENT_CACHE_MAX_STALENESS = 60.0
+
+# Low-cardinality fields are stored as codes into a per-column dictionary.
+DICTIONARY_FIELDS = ("hostname", "source", "event_type", "severity", "user", "process")
+OBJECT_FIELDS = ("command", "raw_log", "agent_last_seen")
+_KNOWN_FIELDS = frozenset(("_id", "timestamp") + DICTIONARY_FIELDS + OBJECT_FIELDS)
+
+# Evict a little past the cap so a busy collection doesn't evict on every batch.
+_EVICTION_HEADROOM = 0.1
+
+_MISSING = object()
+
+# A cursor page filters the time index in blocks, starting at this size and doubling.
+_CURSOR_BLOCK = 256
+
+# Fixed per-row cost: _id/text/extras pointers, epoch, format and dictionary codes, row size,
+# and the time index entry (position and epoch).
+_ROW_BYTES = 8 + 8 + 4 + 8 + 4 * len(DICTIONARY_FIELDS) + 8 * len(OBJECT_FIELDS) + 8 + 4 + 4 + 8
+_DICTIONARY_ENTRY_BYTES = 100
+
+
+class _DictionaryColumn:
+    def __init__(self):
+        self.codes = array("I")
+        self.values: List[Any] = [_MISSING]
+        self._index: Dict[Tuple[type, Any], int] = {}
+        self.nbytes = 0
+
+    def append(self, value: Any) -> None:
+        if value is _MISSING:
+            self.codes.append(0)
+            return
+
+        key = (value.__class__, value)
+        try:
+            code = self._index.get(key)
+            hashable = True
+        except TypeError:
+            code = None
+            hashable = False
+
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            if hashable:
+                self._index[key] = code
+            self.nbytes += _DICTIONARY_ENTRY_BYTES + sys.getsizeof(value)
+        self.codes.append(code)
+
+    def matching_codes(self, predicate: Callable[[str], bool]) -> frozenset:
+        return frozenset(
+            code for code, value in enumerate(self.values)
+            if predicate("" if value is _MISSING else str(value))
+        )
+
+    def copy(self) -> "_DictionaryColumn":
+        column = _DictionaryColumn()
+        column.codes = self.codes[:]
+        column.values = self.values[:]
+        column.nbytes = self.nbytes
+        return column
+
+    @classmethod
+    def restore(cls, values: List[Any], codes: array) -> "_DictionaryColumn":
+        column = cls()
+        column.codes = codes
+        for value in values:
+            try:
+                column._index.setdefault((value.__class__, value), len(column.values))
+            except TypeError:
+                pass
+            column.values.append(value)
+            column.nbytes += _DICTIONARY_ENTRY_BYTES + sys.getsizeof(value)
+        if codes and max(codes) >= len(column.values):
+            raise ValueError("dictionary code out of range")
+        return column
+
+
+class _EventColumns:
+    def __init__(self):
+        self.ids: List[Any] = []
+        self.epochs = array("q")
+        self.timestamp_formats = _DictionaryColumn()
+        self.timestamp_texts: List[Any] = []
+        self.dictionaries = {name: _DictionaryColumn() for name in DICTIONARY_FIELDS}
+        self.objects: Dict[str, List[Any]] = {name: [] for name in OBJECT_FIELDS}
+        self.extras: List[Optional[Dict[str, Any]]] = []
+        self.row_bytes = array("I")
+
+        # Positions ordered by epoch, equal epochs newest-ingested first, so reading it
+        # backwards gives newest-first with ties in arrival order. time_epochs mirrors
+        # it for bisect. Rows past `indexed` are added by index().
+        self.time_order = array("I")
+        self.time_epochs = array("q")
+        self.indexed = 0
+
+        self.variable_bytes = 0
+        self.evicted = 0
+        self.evicted_through: Optional[int] = None
+        self.watermark = Watermark()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def incremental(self) -> bool:
+        return self.watermark.incremental
+
+    @property
+    def nbytes(self) -> int:
+        dictionaries = sum(column.nbytes for column in self.dictionaries.values())
+        return len(self.ids) * _ROW_BYTES + self.variable_bytes + dictionaries
+
+    def append(self, document: Dict[str, Any]) -> None:
+        if not self.watermark.add(document):
+            return
+        row_bytes = 0
+
+        event_id = document.get("_id")
+        if event_id is not None:
+            row_bytes += sys.getsizeof(event_id)
+        self.ids.append(event_id)
+
+        timestamp = document.get("timestamp", _MISSING)
+        if timestamp is _MISSING:
+            self.epochs.append(MIN_SECONDS)
+            self.timestamp_formats.append(_MISSING)
+            self.timestamp_texts.append(None)
+        else:
+            seconds, fmt = timestamp_seconds(timestamp)
+            self.epochs.append(seconds)
+            self.timestamp_formats.append(fmt)
+            if fmt is None:
+                self.timestamp_texts.append(timestamp)
+                row_bytes += sys.getsizeof(timestamp)
+            else:
+                self.timestamp_texts.append(None)
+
+        for name, column in self.dictionaries.items():
+            column.append(document.get(name, _MISSING))
+
+        for name, values in self.objects.items():
+            value = document.get(name, _MISSING)
+            values.append(value)
+            if value is not _MISSING and value is not None:
+                row_bytes += sys.getsizeof(value)
+
+        extra_keys = document.keys() - _KNOWN_FIELDS
+        extras = {key: document[key] for key in document if key in extra_keys} if extra_keys else None
+        self.extras.append(extras)
+        if extras is not None:
+            row_bytes += sys.getsizeof(extras) + sum(
+                sys.getsizeof(key) + sys.getsizeof(value) for key, value in extras.items()
+            )
+
+        self.row_bytes.append(min(row_bytes, 0xFFFFFFFF))
+        self.variable_bytes += row_bytes
+
+    def copy(self) -> "_EventColumns":
+        # For writing a snapshot outside the cache lock.
+        columns = _EventColumns()
+        columns.ids = self.ids[:]
+        columns.epochs = self.epochs[:]
+        columns.timestamp_formats = self.timestamp_formats.copy()
+        columns.timestamp_texts = self.timestamp_texts[:]
+        columns.dictionaries = {name: column.copy() for name, column in self.dictionaries.items()}
+        columns.objects = {name: values[:] for name, values in self.objects.items()}
+        columns.extras = self.extras[:]
+        columns.row_bytes = self.row_bytes[:]
+        self.index()
+        columns.time_order = self.time_order[:]
+        columns.time_epochs = self.time_epochs[:]
+        columns.indexed = self.indexed
+        columns.variable_bytes = self.variable_bytes
+        columns.evicted = self.evicted
+        columns.evicted_through = self.evicted_through
+        columns.watermark = Watermark(self.watermark.value, self.watermark.incremental)
+        return columns
+
+    def evict(self, count: int) -> None:
+        count = min(count, len(self.ids))
+        if count <= 0:
+            return
+
+        newest = max(self.epochs[:count])
+        if self.evicted_through is None or newest > self.evicted_through:
+            self.evicted_through = newest
+
+        self.variable_bytes -= sum(self.row_bytes[:count])
+        del self.ids[:count]
+        del self.epochs[:count]
+        del self.timestamp_formats.codes[:count]
+        del self.timestamp_texts[:count]
+        for column in self.dictionaries.values():
+            del column.codes[:count]
+        for values in self.objects.values():
+            del values[:count]
+        del self.extras[:count]
+        del self.row_bytes[:count]
+        self.evicted += count
+
+        epochs = self.epochs
+        self.time_order = array("I", [p - count for p in self.time_order if p >= count])
+        self.time_epochs = array("q", [epochs[p] for p in self.time_order])
+        self.indexed = max(0, self.indexed - count)
+
+    def evict_to(self, max_bytes: int) -> None:
+        excess = self.nbytes - max_bytes
+        if excess <= 0:
+            return
+
+        excess += int(max_bytes * _EVICTION_HEADROOM)
+        count = 0
+        released = 0
+        for row_bytes in self.row_bytes:
+            if released >= excess:
+                break
+            released += _ROW_BYTES + row_bytes
+            count += 1
+        self.evict(count)
+
+    def index(self) -> None:
+        count = len(self.ids)
+        if self.indexed >= count:
+            return
+
+        epochs = self.epochs
+        added = sorted(reversed(range(self.indexed, count)), key=epochs.__getitem__)
+        # Only indexed rows at or after the oldest new epoch need merging; for
+        # events arriving in time order that is a short tail, or nothing.
+        start = bisect_left(self.time_epochs, epochs[added[0]])
+        if start < len(self.time_order):
+            added.extend(self.time_order[start:])
+            added.sort(key=epochs.__getitem__)
+            del self.time_order[start:]
+            del self.time_epochs[start:]
+
+        self.time_order.extend(added)
+        self.time_epochs.extend(epochs[p] for p in added)
+        self.indexed = count
+
+    def time_span(self, lower: Optional[int] = None, upper: Optional[int] = None) -> Tuple[int, int]:
+        self.index()
+        start = 0 if lower is None else bisect_left(self.time_epochs, lower)
+        end = len(self.time_epochs) if upper is None else bisect_right(self.time_epochs, upper)
+        return start, end
+
+    def newest_first(self, lower: Optional[int] = None, upper: Optional[int] = None) -> array:
+        start, end = self.time_span(lower, upper)
+        positions = self.time_order[start:end]
+        positions.reverse()
+        return positions
+
+    def timestamp(self, position: int) -> Any:
+        layout = self.timestamp_formats.values[self.timestamp_formats.codes[position]]
+        if layout is None:
+            return self.timestamp_texts[position]
+        return format_seconds(self.epochs[position], layout)
+
+    def rows(self, positions: Iterable[int], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+        # Built a column at a time: one tight loop per requested field instead of
+        # a per-row check of every field against the projection.
+        wanted = None if fields is None else frozenset(fields)
+        ids = self.ids
+        positions = list(positions)
+        # Same as a projected find: _id always comes back.
+        rows: List[Dict[str, Any]] = [
+            {} if ids[i] is None else {"_id": ids[i]} for i in positions
+        ]
+
+        if wanted is None or "timestamp" in wanted:
+            codes, layouts = self.timestamp_formats.codes, self.timestamp_formats.values
+            epochs, texts = self.epochs, self.timestamp_texts
+            for row, i in zip(rows, positions):
+                code = codes[i]
+                if code:
+                    layout = layouts[code]
+                    row["timestamp"] = texts[i] if layout is None else format_seconds(epochs[i], layout)
+
+        for name, column in self.dictionaries.items():
+            if wanted is None or name in wanted:
+                codes, values = column.codes, column.values
+                for row, i in zip(rows, positions):
+                    code = codes[i]
+                    if code:
+                        row[name] = values[code]
+
+        for name, values in self.objects.items():
+            if wanted is None or name in wanted:
+                for row, i in zip(rows, positions):
+                    value = values[i]
+                    if value is not _MISSING:
+                        row[name] = value
+
+        extras = self.extras
+        for row, i in zip(rows, positions):
+            extra = extras[i]
+            if extra is not None:
+                if wanted is None:
+                    row.update(extra)
+                else:
+                    row.update((key, value) for key, value in extra.items() if key in wanted)
+
+        return rows
+
+
+class EventCache:
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_EVENT_CACHE_MAX_BYTES,
+        refresh_interval: float = DEFAULT_EVENT_CACHE_REFRESH_INTERVAL,
+        max_staleness: float = DEFAULT_EVENT_CACHE_MAX_STALENESS,
+        clock: Callable[[], float] = time.monotonic,
+        parallel: Optional[ParallelFilter] = None,
+        snapshot: Optional[EventSnapshot] = None
+    ):
+        if max_bytes <= 0:
+            raise ValueError(f"Invalid event cache size: {max_bytes}")
+        if refresh_interval < 0 or max_staleness < refresh_interval:
+            raise ValueError(
+                f"Invalid event cache staleness: refresh_interval={refresh_interval}, "
+                f"max_staleness={max_staleness}"
+            )
+
+        self.max_bytes = max_bytes
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self._clock = clock
+        self.parallel = parallel
+        self.snapshot = snapshot
+
+        self._columns = _EventColumns()
+        if snapshot is not None:
+            # Still refreshed before first use, but only with events past the snapshot's watermark.
+            columns = snapshot.load(_decode_snapshot)
+            if columns is not None:
+                columns.evict_to(max_bytes)
+                self._columns = columns
+        self._refreshed_at: Optional[float] = None
+        self._refreshes = 0
+        # Bumped whenever readers would see different rows or positions.
+        self._version = 0
+        self._lock = threading.RLock()
+
+    @property
+    def incremental(self) -> bool:
+        with self._lock:
+            return self._columns.incremental
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._version
+
+    @property
+    def complete(self) -> bool:
+        # Nothing evicted: every event up to the watermark is here.
+        with self._lock:
+            return self._columns.evicted == 0
+
+    def age(self) -> Optional[float]:
+        if self._refreshed_at is None:
+            return None
+        return self._clock() - self._refreshed_at
+
+    def needs_refresh(self) -> bool:
+        age = self.age()
+        return age is None or age >= self.refresh_interval
+
+    def usable(self) -> bool:
+        age = self.age()
+        return age is not None and age <= self.max_staleness
+
+    def delta_query(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._columns.watermark.query()
+
+    def new_store(self) -> _EventColumns:
+        return _EventColumns()
+
+    def append(self, documents: Iterable[Dict[str, Any]], store: Optional[_EventColumns] = None) -> None:
+        # A full reload fills a separate store so readers keep the old one until it's done.
+        with self._lock:
+            columns = self._columns if store is None else store
+            rows, evicted = len(columns), columns.evicted
+            for document in documents:
+                columns.append(document)
+            columns.evict_to(self.max_bytes)
+            if store is None and (len(columns), columns.evicted) != (rows, evicted):
+                self._version += 1
+
+    def complete_refresh(self, store: Optional[_EventColumns] = None) -> None:
+        with self._lock:
+            if store is not None:
+                self._columns = store
+                self._version += 1
+            self._columns.watermark.commit()
+            self._columns.index()
+            self._refreshed_at = self._clock()
+            self._refreshes += 1
+            columns = self._columns
+        logger.debug(
+            f"Event cache refreshed: {len(columns)} events, {columns.nbytes} bytes, "
+            f"watermark {columns.watermark.value!r}"
+        )
+        self._save_snapshot()
+
+    def abort_refresh(self, store: Optional[_EventColumns] = None) -> None:
+        # A reload's store is dropped; a delta keeps what it appended.
+        if store is None:
+            with self._lock:
+                self._columns.watermark.abort()
+
+    def batches(self, size: int, fields: Optional[List[str]] = None) -> Iterator[List[Dict[str, Any]]]:
+        # Every cached event up to the watermark, in the order it arrived.
+        start = 0
+        while True:
+            with self._lock:
+                columns = self._columns
+                end = len(columns) - columns.watermark.pending
+                batch = columns.rows(range(start, min(start + size, end)), fields)
+            if not batch:
+                return
+            yield batch
+            start += len(batch)
+
+    def find(
+        self,
+        search: SearchQuery,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            positions = self._matching(search, deadline)
+            if positions is None:
+                return None
+            return self._columns.rows(positions, fields)
+
+    def find_page(
+        self,
+        search: SearchQuery,
+        offset: int,
+        limit: int,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        with self._lock:
+            positions = self._matching(search, deadline)
+            if positions is None:
+                return None
+            # Matches are already newest first: only the page is materialized.
+            return len(positions), self._columns.rows(positions[offset:offset + limit], fields)
+
+    def results(
+        self,
+        search: SearchQuery,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[CachedSearchResults]:
+        with self._lock:
+            positions = self._matching(search, deadline)
+            if positions is None:
+                return None
+            if not isinstance(positions, array):
+                positions = array("I", positions)
+            return CachedSearchResults(self, self._version, positions, fields)
+
+    def rows_at(
+        self,
+        version: int,
+        positions: Sequence[int],
+        fields: Optional[List[str]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if version != self._version:
+                return None
+            return self._columns.rows(positions, fields)
+
+    def find_after(
+        self,
+        search: SearchQuery,
+        after: Optional[EventCursor],
+        limit: int,
+        fields: Optional[List[str]] = None,
+        count: bool = False,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[Tuple[Optional[int], List[Dict[str, Any]], Optional[EventCursor]]]:
+        with self._lock:
+            if not self._answerable(search):
+                return None
+            columns = self._columns
+            epochs, ids = columns.epochs, columns.ids
+            lower, upper = _date_bounds(search)
+            if after is not None:
+                upper = after.seconds if upper is None else min(upper, after.seconds)
+            start, end = columns.time_span(lower, upper)
+            time_order = columns.time_order
+            terms = [term for term in search.terms if not isinstance(term, DateRange)]
+
+            # Only as much of the index is filtered as the page needs, plus the rest of
+            # the run of equal times the page ends in, since those are ordered by _id.
+            matched: List[int] = []
+            block = _CURSOR_BLOCK
+            while end > start:
+                chunk = time_order[max(start, end - block):end]
+                chunk.reverse()
+                end -= len(chunk)
+                block *= 2
+                positions: Sequence[int] = chunk
+                for term in terms:
+                    positions = _filter_term(columns, positions, term, self.parallel, deadline)
+                if after is not None:
+                    positions = [
+                        i for i in positions
+                        if epochs[i] < after.seconds or (after.kind, after.value) < id_rank(ids[i])
+                    ]
+                matched.extend(positions)
+                if len(matched) > limit and epochs[time_order[end]] < epochs[matched[limit - 1]]:
+                    break
+
+            matched.sort(key=lambda i: (-epochs[i], id_rank(ids[i])))
+            page = matched[:limit]
+            more = len(matched) > limit
+            next_cursor = EventCursor.of(epochs[page[-1]], ids[page[-1]]) if page and more else None
+            total = len(self._matching(search, deadline)) if count else None
+            return total, columns.rows(page, fields), next_cursor
+
+    def latest(self, limit: int, fields: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            columns = self._columns
+            columns.index()
+            positions = columns.time_order[-limit:] if limit > 0 else array("I")
+            positions.reverse()
+            if columns.evicted_through is not None and (
+                len(positions) < limit or columns.epochs[positions[-1]] <= columns.evicted_through
+            ):
+                return None
+
+            return columns.rows(positions, fields)
+
+    def _save_snapshot(self) -> None:
+        if self.snapshot is None or not self.snapshot.due():
+            return
+        with self._lock:
+            if not self._columns.incremental or not len(self._columns):
+                return
+            columns = self._columns.copy()
+        self.snapshot.save_in_background(lambda: _encode_snapshot(columns))
+
+    def _answerable(self, search: SearchQuery) -> bool:
+        # After eviction only a query bounded to newer events is answered in full.
+        evicted_through = self._columns.evicted_through
+        if evicted_through is None:
+            return True
+        lower = search.lower_bound
+        return lower is not None and lower > evicted_through
+
+    def _matching(self, search: SearchQuery, deadline: Optional[Deadline] = None) -> Optional[Sequence[int]]:
+        if not self._answerable(search):
+            return None
+
+        # Date ranges narrow the time index with bisect; other terms filter what's left.
+        columns = self._columns
+        positions: Sequence[int] = columns.newest_first(*_date_bounds(search))
+
+        for term in search.terms:
+            if not isinstance(term, DateRange):
+                positions = _filter_term(columns, positions, term, self.parallel, deadline)
+        return positions
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            columns = self._columns
+            age = self.age()
+            return {
+                "events": len(columns),
+                "bytes": columns.nbytes,
+                "max_bytes": self.max_bytes,
+                "evicted": columns.evicted,
+                "watermark": columns.watermark.value,
+                "refreshes": self._refreshes,
+                "age": None if age is None else round(age, 3),
+                "dictionary_sizes": {
+                    name: len(column.values) - 1 for name, column in columns.dictionaries.items()
+                },
+                "snapshot": None if self.snapshot is None else self.snapshot.stats(),
+            }
+
+
+def _date_bounds(search: SearchQuery) -> Tuple[Optional[int], Optional[int]]:
+    ranges = [term for term in search.terms if isinstance(term, DateRange)]
+    lowers = [term.lower for term in ranges if term.lower is not None]
+    uppers = [term.upper for term in ranges if term.upper is not None]
+    return max(lowers) if lowers else None, min(uppers) if uppers else None
+
+
+def _filter_term(
+    columns: _EventColumns,
+    positions: Sequence[int],
+    term: Term,
+    parallel: Optional[ParallelFilter] = None,
+    deadline: Optional[Deadline] = None
+) -> List[int]:
+    if isinstance(term, Match):
+        return _filter_match(columns, positions, term, parallel, deadline)
+
+    if isinstance(term, DateRange):
+        lower, upper = term.lower, term.upper
+        epochs = columns.epochs
+        if upper is None:
+            return [i for i in positions if epochs[i] >= lower]
+        if lower is None:
+            return [i for i in positions if epochs[i] <= upper]
+        return [i for i in positions if lower <= epochs[i] <= upper]
+
+    if isinstance(term, Not):
+        excluded = set(_filter_term(columns, positions, term.term, parallel, deadline))
+        return [i for i in positions if i not in excluded]
+
+    raise ValueError(f"Unsupported search term: {term!r}")
+
+
+def _filter_match(
+    columns: _EventColumns,
+    positions: Sequence[int],
+    term: Match,
+    parallel: Optional[ParallelFilter] = None,
+    deadline: Optional[Deadline] = None
+) -> List[int]:
+    test = term.text_test()
+    # The test runs once per distinct value of a dictionary column instead of once per event.
+    dictionary_matches = [
+        (columns.dictionaries[name].codes, columns.dictionaries[name].matching_codes(test))
+        for name in term.fields if name in columns.dictionaries
+    ]
+    row_values = [
+        columns.objects[name] if name in columns.objects else _ExtrasColumn(columns, name)
+        for name in term.fields if name not in columns.dictionaries
+    ]
+
+    if len(dictionary_matches) == 1 and not row_values:
+        codes, allowed = dictionary_matches[0]
+        return [i for i in positions if codes[i] in allowed]
+
+    # Any field may match: each column only looks at events no earlier column matched.
+    remaining = list(positions)
+    matched: set = set()
+    for codes, allowed in dictionary_matches:
+        if allowed:
+            hits = {i for i in remaining if codes[i] in allowed}
+            if hits:
+                matched |= hits
+                remaining = [i for i in remaining if i not in hits]
+
+    empty_matches = test("")
+    for values in row_values:
+        if parallel is not None and len(remaining) >= parallel.threshold:
+            # Long text is where the time goes; the values go to the workers as a plain list.
+            texts = [MISSING if (value := values[i]) is _MISSING else value for i in remaining]
+            # Bounded by the request's deadline: the cache lock is held until the workers answer.
+            hits = {remaining[j] for j in parallel.match_values(term, texts, deadline)}
+        else:
+            hits = {
+                i for i in remaining
+                if (empty_matches if (value := values[i]) is _MISSING else test(str(value)))
+            }
+        if hits:
+            matched |= hits
+            remaining = [i for i in remaining if i not in hits]
+
+    return [i for i in positions if i in matched]
+
+
+class _ExtrasColumn:
+    def __init__(self, columns: _EventColumns, name: str):
+        self._extras = columns.extras
+        self._name = name
+
+    def __getitem__(self, position: int) -> Any:
+        extras = self._extras[position]
+        return _MISSING if extras is None else extras.get(self._name, _MISSING)
+
+
+def _encode_snapshot(columns: _EventColumns) -> Tuple[Dict[str, Any], Sections]:
+    # Fixed-width columns go in as machine arrays; dictionary values and per-row
+    # objects as JSON, with a presence byte per row telling MISSING from null.
+    meta = {
+        "rows": len(columns),
+        "watermark": columns.watermark.value,
+        "evicted": columns.evicted,
+        "evicted_through": columns.evicted_through,
+    }
+    sections: Sections = {
+        "epochs": encode_array(columns.epochs),
+        "row_bytes": encode_array(columns.row_bytes),
+        "time_order": encode_array(columns.time_order),
+        "time_epochs": encode_array(columns.time_epochs),
+        "timestamp_codes": encode_array(columns.timestamp_formats.codes),
+        "timestamp_layouts": encode_json(columns.timestamp_formats.values[1:]),
+        "timestamp_texts": encode_json(columns.timestamp_texts),
+        "ids": encode_json(columns.ids),
+        "extras": encode_json(columns.extras),
+    }
+    for name, column in columns.dictionaries.items():
+        sections[f"codes.{name}"] = encode_array(column.codes)
+        sections[f"values.{name}"] = encode_json(column.values[1:])
+    for name, values in columns.objects.items():
+        sections[f"present.{name}"] = bytes(value is not _MISSING for value in values)
+        sections[f"objects.{name}"] = encode_json([None if value is _MISSING else value for value in values])
+    return meta, sections
+
+
+def _decode_snapshot(meta: Dict[str, Any], sections: Dict[str, memoryview]) -> _EventColumns:
+    columns = _EventColumns()
+    rows = meta["rows"]
+
+    columns.ids = decode_json(sections["ids"])
+    columns.epochs = decode_array("q", sections["epochs"])
+    columns.row_bytes = decode_array("I", sections["row_bytes"])
+    columns.time_order = decode_array("I", sections["time_order"])
+    columns.time_epochs = decode_array("q", sections["time_epochs"])
+    columns.timestamp_formats = _DictionaryColumn.restore(
+        decode_json(sections["timestamp_layouts"]), decode_array("I", sections["timestamp_codes"])
+    )
+    columns.timestamp_texts = decode_json(sections["timestamp_texts"])
+    columns.extras = decode_json(sections["extras"])
+    columns.dictionaries = {
+        name: _DictionaryColumn.restore(
+            decode_json(sections[f"values.{name}"]), decode_array("I", sections[f"codes.{name}"])
+        )
+        for name in DICTIONARY_FIELDS
+    }
+    for name in OBJECT_FIELDS:
+        values = decode_json(sections[f"objects.{name}"])
+        present = bytes(sections[f"present.{name}"])
+        if 0 in present:
+            values = [value if flag else _MISSING for value, flag in zip(values, present)]
+        columns.objects[name] = values
+
+    lengths = {
+        len(columns.ids), len(columns.epochs), len(columns.row_bytes), len(columns.time_order),
+        len(columns.time_epochs), len(columns.timestamp_formats.codes), len(columns.timestamp_texts),
+        len(columns.extras), rows,
+    }
+    lengths.update(len(column.codes) for column in columns.dictionaries.values())
+    lengths.update(len(values) for values in columns.objects.values())
+    if len(lengths) > 1:
+        raise ValueError(f"column lengths {sorted(lengths)} don't match")
+    if rows and max(columns.time_order) >= rows:
+        raise ValueError("time index out of range")
+
+    columns.indexed = rows
+    columns.variable_bytes = sum(columns.row_bytes)
+    columns.evicted = meta["evicted"]
+    columns.evicted_through = meta["evicted_through"]
+    columns.watermark = Watermark(meta["watermark"])
+    return columns
@@ -0,0 +1,225 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_EVENT_SNAPSHOT_INTERVAL = 300.0
+
+_MAGIC = b"SIEMSNAP"
+_FORMAT = 1
+_HEADER_LENGTH = struct.Struct("<Q")
+_PREFIX = len(_MAGIC) + _HEADER_LENGTH.size
+# Sections start on this boundary so a mapped array column is aligned.
+_ALIGNMENT = 8
+
+T = TypeVar("T")
+
+Sections = Dict[str, bytes]
+
+
+class EventSnapshot:
+    # The event cache saved to a local file, so a new worker warm starts from it
+    # and only asks the database for events past its watermark. Each worker
+    # decodes its own copy on load; whichever notices the file is out of date
+    # first writes the next one.
+    def __init__(
+        self,
+        path: str,
+        interval: float = DEFAULT_EVENT_SNAPSHOT_INTERVAL,
+        clock: Callable[[], float] = time.time
+    ):
+        if not path:
+            raise ValueError("Event snapshot path is required")
+        if interval <= 0:
+            raise ValueError(f"Invalid event snapshot interval: {interval}")
+
+        self.path = path
+        self.interval = interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._writing = False
+        self._written_at: Optional[float] = None
+        self.loads = 0
+        self.writes = 0
+        self.failures = 0
+        self.nbytes = 0
+
+    def load(self, decode: Callable[[Dict[str, Any], Dict[str, memoryview]], T]) -> Optional[T]:
+        try:
+            with read_snapshot(self.path) as (meta, sections):
+                loaded = decode(meta, sections)
+            nbytes = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable event snapshot {self.path}: {e}")
+            with self._lock:
+                self.failures += 1
+            return None
+
+        with self._lock:
+            self.loads += 1
+            self.nbytes = nbytes
+        logger.info(f"Event cache loaded from snapshot {self.path}, watermark {meta.get('watermark')!r}")
+        return loaded
+
+    def due(self) -> bool:
+        with self._lock:
+            if self._writing:
+                return False
+            written_at = self._written_at
+        try:
+            # Another worker may have written it since.
+            modified = os.stat(self.path).st_mtime
+            written_at = modified if written_at is None else max(written_at, modified)
+        except OSError:
+            pass
+        return written_at is None or self._clock() - written_at >= self.interval
+
+    def save_in_background(self, encode: Callable[[], Tuple[Dict[str, Any], Sections]]) -> None:
+        with self._lock:
+            if self._writing:
+                return
+            self._writing = True
+        threading.Thread(target=self._save, args=(encode,), name="event-snapshot-write", daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "bytes": self.nbytes,
+                "loads": self.loads,
+                "writes": self.writes,
+                "failures": self.failures,
+            }
+
+    def _save(self, encode: Callable[[], Tuple[Dict[str, Any], Sections]]) -> None:
+        try:
+            meta, sections = encode()
+            nbytes = write_snapshot(self.path, meta, sections)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Event snapshot write to {self.path} failed: {e}")
+            with self._lock:
+                self.failures += 1
+                self._writing = False
+            return
+
+        with self._lock:
+            self._written_at = self._clock()
+            self.writes += 1
+            self.nbytes = nbytes
+            self._writing = False
+        logger.debug(f"Event snapshot written to {self.path}: {nbytes} bytes")
+
+
+def encode_array(values: array) -> bytes:
+    return values.tobytes()
+
+
+def decode_array(typecode: str, section: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(section)
+    return values
+
+
+def encode_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def decode_json(section: memoryview) -> Any:
+    return json.loads(bytes(section))
+
+
+def write_snapshot(path: str, meta: Dict[str, Any], sections: Sections) -> int:
+    # Magic, header length, JSON header with the metadata and where each section
+    # lies past the header, then the sections. Written beside the old file and
+    # renamed over it, so a reader never sees half a snapshot.
+    layout: Dict[str, Tuple[int, int]] = {}
+    offset = 0
+    for name, data in sections.items():
+        layout[name] = (offset, len(data))
+        offset = _aligned(offset + len(data))
+    header = encode_json({**meta, **_format_meta(), "sections": layout})
+    base = _aligned(_PREFIX + len(header))
+
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        # Raw logs and commands are in there: readable by this user only, like the sidecar socket.
+        with os.fdopen(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            for name, data in sections.items():
+                f.seek(base + layout[name][0])
+                f.write(data)
+            f.truncate(base + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+    return base + offset
+
+
+@contextmanager
+def read_snapshot(path: str) -> Iterator[Tuple[Dict[str, Any], Dict[str, memoryview]]]:
+    # Sections are views into the mapping, valid until the block exits.
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            sections: Dict[str, memoryview] = {}
+            try:
+                meta, base = _read_header(view)
+                for name, (offset, length) in meta["sections"].items():
+                    offset += base
+                    if offset < 0 or length < 0 or offset + length > len(view):
+                        raise ValueError(f"section {name} is out of bounds")
+                    sections[name] = view[offset:offset + length]
+                yield meta, sections
+            finally:
+                for section in sections.values():
+                    section.release()
+                view.release()
+
+
+def _read_header(view: memoryview) -> Tuple[Dict[str, Any], int]:
+    if len(view) < _PREFIX or bytes(view[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError("not an event snapshot")
+    (length,) = _HEADER_LENGTH.unpack(view[len(_MAGIC):_PREFIX])
+    if _PREFIX + length > len(view):
+        raise ValueError("truncated header")
+    meta = decode_json(view[_PREFIX:_PREFIX + length])
+    # Columns are raw machine arrays: only this layout can read them.
+    expected = _format_meta()
+    found = {key: meta.get(key) for key in expected}
+    if found != expected:
+        raise ValueError(f"written as {found}, expected {expected}")
+    return meta, _aligned(_PREFIX + length)
+
+
+def _format_meta() -> Dict[str, Any]:
+    return {
+        "format": _FORMAT,
+        "byteorder": sys.byteorder,
+        "itemsizes": {typecode: array(typecode).itemsize for typecode in "BIq"},
+    }
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
@@ -0,0 +1,28 @@
+class DatabaseError(Exception):
+    pass
+
+
+class ConnectionError(DatabaseError):
+    pass
+
+
+class QueryError(DatabaseError):
+    pass
+
+
+class ResponseSizeError(DatabaseError):
+    pass
+
+
+class TimeoutError(DatabaseError):
+    pass
+
+
+class PoolExhaustedError(ConnectionError):
+    pass
+
+
+class CircuitOpenError(DatabaseError):
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,82 @@
+import heapq
+import json
+import tempfile
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, IO, Iterator, List
+
+DEFAULT_SORT_RUN_SIZE = 20000
+
+Item = Dict[str, Any]
+
+
+class ExternalSorter:
+    # Sorts more items than should be held at once: each full run is sorted and
+    # written to a temporary file, and the runs are merged back a line at a time.
+    # Keys must survive a JSON round trip (tuples come back as lists).
+    def __init__(self, key: Callable[[Item], Any], run_size: int = DEFAULT_SORT_RUN_SIZE):
+        if run_size < 1:
+            raise ValueError(f"Invalid sort run size: {run_size}")
+        self.key = key
+        self.run_size = run_size
+        self.count = 0
+        self._run: List[Item] = []
+        self._files: List[IO[str]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    @property
+    def full(self) -> bool:
+        return len(self._run) >= self.run_size
+
+    @property
+    def spilled(self) -> int:
+        return len(self._files)
+
+    def add(self, items: List[Item]) -> None:
+        self._run.extend(items)
+        self.count += len(items)
+
+    def spill(self) -> None:
+        key = self.key
+        dumps = json.dumps
+        f = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._files.append(f)
+        self._run.sort(key=key)
+        f.writelines(dumps([key(item), item], separators=(",", ":"), default=str) + "\n" for item in self._run)
+        f.seek(0)
+        self._run = []
+
+    def batches(self, batch_size: int) -> Iterator[List[Item]]:
+        if not self._files:
+            self._run.sort(key=self.key)
+            run, self._run = self._run, []
+            for start in range(0, len(run), batch_size):
+                yield run[start:start + batch_size]
+            return
+
+        if self._run:
+            self.spill()
+        merged = (item for _, item in heapq.merge(*map(_read_run, self._files), key=itemgetter(0)))
+        while True:
+            batch = list(islice(merged, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def close(self) -> None:
+        self._run = []
+        files, self._files = self._files, []
+        for f in files:
+            f.close()
+
+
+def _read_run(f: IO[str]) -> Iterator[List[Any]]:
+    loads = json.loads
+    for line in f:
+        yield loads(line)
@@ -0,0 +1,311 @@
+import json
+import re
+import socket
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Dict, Iterator, List, Tuple
+
+from core.message_framing import MessageFraming
+from data.client import COMPRESSION_FEATURE
+from data.multiplex import MULTIPLEX_FEATURE
+from data.query_translator import SUPPORTED_OPERATORS
+
+logger = logging.getLogger(__name__)
+
+
+class LocalDatabaseServer:
+    def __init__(
+        self,
+        collections: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        database: str = "siem",
+        features: Optional[List[str]] = None,
+        operators: Optional[List[str]] = None,
+        latency: float = 0.0
+    ):
+        self.collections: Dict[str, List[Dict[str, Any]]] = {
+            name: list(documents) for name, documents in (collections or {}).items()
+        }
+        self.host = host
+        self.port = port
+        self.database = database
+        self.features = (
+            list(features) if features is not None else [MULTIPLEX_FEATURE, COMPRESSION_FEATURE]
+        )
+        self.operators = list(operators) if operators is not None else sorted(SUPPORTED_OPERATORS)
+        self.latency = latency
+
+        self.connections_accepted = 0
+        self._listener: Optional[socket.socket] = None
+        self._accept_thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._data_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.host, self.port
+
+    def insert(self, collection: str, documents: List[Dict[str, Any]]) -> None:
+        with self._data_lock:
+            self.collections.setdefault(collection, []).extend(documents)
+
+    def start(self) -> Tuple[str, int]:
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((self.host, self.port))
+        self._listener.listen(128)
+        self.port = self._listener.getsockname()[1]
+
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="local-db")
+        self._stopped.clear()
+        self._accept_thread = threading.Thread(
+            target=self._accept_loop,
+            name="local-db-accept",
+            daemon=True
+        )
+        self._accept_thread.start()
+        logger.info(f"Local database server listening on {self.host}:{self.port}")
+        return self.address
+
+    def serve_forever(self) -> None:
+        if self._listener is None:
+            self.start()
+        self._stopped.wait()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except Exception:
+                pass
+            self._listener = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _accept_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                break
+            self.connections_accepted += 1
+            threading.Thread(
+                target=self._serve_connection,
+                args=(conn,),
+                name="local-db-conn",
+                daemon=True
+            ).start()
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        send_lock = threading.Lock()
+        multiplexed = False
+        compression: Optional[Tuple[str, int]] = None
+        try:
+            while not self._stopped.is_set():
+                header = _recv_exactly(conn, MessageFraming.HEADER_SIZE)
+                if header is None:
+                    break
+                flags, length = MessageFraming.parse_frame_header(header)
+                request_id = None
+                if flags & MessageFraming.FLAG_TAGGED:
+                    if not multiplexed:
+                        raise ValueError("Tagged frame before multiplexing was negotiated")
+                    tag = _recv_exactly(conn, MessageFraming.TAG_SIZE)
+                    if tag is None:
+                        break
+                    request_id = MessageFraming.parse_tag(tag)
+                payload = _recv_exactly(conn, length)
+                if payload is None:
+                    break
+                request = json.loads(MessageFraming.decode_payload(flags, payload))
+
+                if request_id is None:
+                    for response in self._responses(request):
+                        if request.get("operation") == "hello":
+                            # Negotiated options apply to the hello response onwards.
+                            multiplexed = MULTIPLEX_FEATURE in response.get("features", [])
+                            compression = _negotiated_compression(request, response)
+                        _send_frame(conn, send_lock, response, compression=compression)
+                else:
+                    # Requests run concurrently, so responses may come back out of order.
+                    self._executor.submit(
+                        self._respond_tagged, conn, send_lock, request, request_id, compression
+                    )
+        except Exception as e:
+            if not self._stopped.is_set():
+                logger.debug(f"Local database connection closed: {e}")
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _respond_tagged(
+        self,
+        conn: socket.socket,
+        send_lock: threading.Lock,
+        request: Dict[str, Any],
+        request_id: int,
+        compression: Optional[Tuple[str, int]]
+    ) -> None:
+        try:
+            _send_frame(conn, send_lock, self._dispatch(request), request_id, compression)
+        except OSError:
+            pass
+
+    def _responses(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        response = self._dispatch(request)
+        cursor = request.get("cursor")
+        if not cursor or request.get("operation") != "find" or response.get("status") != "ok":
+            yield response
+            return
+
+        data = response["data"]
+        batch_size = max(1, int(cursor.get("batch_size") or len(data) or 1))
+        for start in range(0, max(len(data), 1), batch_size):
+            yield {
+                "status": "ok",
+                "data": data[start:start + batch_size],
+                "has_more": start + batch_size < len(data)
+            }
+
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        operation = request.get("operation")
+
+        if operation == "hello":
+            requested = request.get("features") or []
+            response = {
+                "status": "ok",
+                "features": [f for f in requested if f in self.features],
+                "operators": self.operators
+            }
+            if COMPRESSION_FEATURE in response["features"]:
+                codecs = (request.get("compression") or {}).get("codecs") or []
+                codec = next((c for c in codecs if c in MessageFraming.COMPRESSION_CODECS), None)
+                if codec is None:
+                    response["features"].remove(COMPRESSION_FEATURE)
+                else:
+                    response["compression"] = codec
+            return response
+
+        if request.get("database") != self.database:
+            return {"status": "error", "message": f"Unknown database: {request.get('database')}"}
+
+        if operation == "find":
+            if self.latency:
+                time.sleep(self.latency)
+            with self._data_lock:
+                documents = list(self.collections.get(request.get("collection"), []))
+            query = request.get("query") or {}
+            try:
+                data = [doc for doc in documents if _matches(doc, query)]
+            except (ValueError, TypeError, re.error) as e:
+                return {"status": "error", "message": f"Invalid query: {e}"}
+            projection = request.get("projection")
+            if projection:
+                data = [_project(doc, projection) for doc in data]
+            return {"status": "ok", "data": data}
+
+        return {"status": "error", "message": f"Unsupported operation: {operation}"}
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for field_name, condition in query.items():
+        if field_name == "$or":
+            if not any(_matches(document, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not _matches_condition(document.get(field_name), condition):
+                return False
+        elif document.get(field_name) != condition:
+            return False
+    return True
+
+
+def _matches_condition(value: Any, condition: Dict[str, Any]) -> bool:
+    for operator, operand in condition.items():
+        if operator == "$options":
+            continue
+        if operator == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            if value is None or not re.search(operand, str(value), flags):
+                return False
+        elif operator == "$eq":
+            if value != operand:
+                return False
+        elif operator in _COMPARISONS:
+            if value is None or not _COMPARISONS[operator](value, operand):
+                return False
+        else:
+            raise ValueError(f"Unsupported query operator: {operator}")
+    return True
+
+
+def _project(document: Dict[str, Any], projection: Dict[str, Any]) -> Dict[str, Any]:
+    # Inclusion projection; _id is returned unless explicitly excluded.
+    include_id = projection.get("_id", 1)
+    return {
+        key: value for key, value in document.items()
+        if (key == "_id" and include_id) or (key != "_id" and projection.get(key))
+    }
+
+
+_COMPARISONS = {
+    "$gt": lambda value, operand: value > operand,
+    "$gte": lambda value, operand: value >= operand,
+    "$lt": lambda value, operand: value < operand,
+    "$lte": lambda value, operand: value <= operand,
+}
+
+
+def _negotiated_compression(
+    request: Dict[str, Any],
+    response: Dict[str, Any]
+) -> Optional[Tuple[str, int]]:
+    if COMPRESSION_FEATURE not in response.get("features", []):
+        return None
+    threshold = (request.get("compression") or {}).get("threshold")
+    if not isinstance(threshold, int) or threshold < 0:
+        threshold = MessageFraming.DEFAULT_COMPRESSION_THRESHOLD
+    return response["compression"], threshold
+
+
+def _send_frame(
+    conn: socket.socket,
+    send_lock: threading.Lock,
+    response: Dict[str, Any],
+    request_id: Optional[int] = None,
+    compression: Optional[Tuple[str, int]] = None
+) -> None:
+    message = json.dumps(response, default=str)
+    if compression is None:
+        frame = MessageFraming.frame_message(message, request_id)
+    else:
+        codec, threshold = compression
+        frame = MessageFraming.frame_message(message, request_id, codec, threshold)
+    with send_lock:
+        conn.sendall(frame)
+
+
+def _recv_exactly(conn: socket.socket, size: int) -> Optional[bytes]:
+    data = bytearray()
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
@@ -0,0 +1,228 @@
+import asyncio
+import itertools
+import socket
+import threading
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional, Union
+
+from core.message_framing import MessageFraming, FrameDecoder
+from data.exceptions import QueryError
+
+logger = logging.getLogger(__name__)
+
+MULTIPLEX_FEATURE = "multiplex"
+MAX_REQUEST_ID = 0xFFFFFFFF
+
+
+class MultiplexedConnection:
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._closed = False
+
+        # Per-request timeouts are enforced on the futures; the reader blocks until data arrives.
+        sock.settimeout(None)
+        self._reader = threading.Thread(
+            target=self._read_loop,
+            name="db-multiplex-reader",
+            daemon=True
+        )
+        self._reader.start()
+
+    @property
+    def is_open(self) -> bool:
+        return not self._closed
+
+    @property
+    def in_flight(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    def request(self, message: str, timeout: Optional[float], operation_context: str = "") -> Union[bytes, bytearray]:
+        future: Future = Future()
+
+        with self._pending_lock:
+            if self._closed:
+                raise QueryError(
+                    f"Multiplexed connection is closed. Operation: {operation_context}"
+                )
+            request_id = _next_request_id(self._ids, self._pending)
+            self._pending[request_id] = future
+
+        try:
+            frame = MessageFraming.frame_message(message, request_id)
+            with self._send_lock:
+                self._sock.sendall(frame)
+        except OSError as e:
+            self._fail(e)
+            raise QueryError(
+                f"Failed to send on multiplexed connection: {e}. Operation: {operation_context}"
+            )
+
+        try:
+            flags, payload = future.result(timeout)
+        except FutureTimeoutError:
+            # The connection stays usable; a late response is dropped by the reader.
+            raise socket.timeout(f"No response for request {request_id} within {timeout} seconds")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+
+        return MessageFraming.decode_payload(flags, payload)
+
+    def close(self) -> None:
+        self._fail(None)
+
+    def _read_loop(self) -> None:
+        decoder = FrameDecoder()
+        try:
+            while True:
+                payload = decoder.read_frame(self._sock)
+                request_id = decoder.request_id
+                if request_id is None:
+                    raise ValueError("Untagged frame received on multiplexed connection")
+
+                with self._pending_lock:
+                    future = self._pending.pop(request_id, None)
+                if future is None:
+                    logger.debug(f"Dropping response for abandoned request {request_id}")
+                    continue
+                # Decompressing and decoding happen in the caller's thread so one
+                # large response doesn't hold up the others.
+                future.set_result((decoder.flags, payload))
+        except Exception as e:
+            if not self._closed:
+                logger.warning(f"Multiplexed database connection lost: {e}")
+            self._fail(e)
+
+    def _fail(self, error: Optional[Exception]) -> None:
+        with self._pending_lock:
+            if self._closed:
+                return
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+        try:
+            self._sock.close()
+        except Exception:
+            pass
+
+        for future in pending:
+            if not future.done():
+                future.set_exception(QueryError(f"Multiplexed connection closed: {error}"))
+
+
+class AsyncMultiplexedConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    @property
+    def is_open(self) -> bool:
+        return not self._closed
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def request(self, message: str, operation_context: str = "") -> bytes:
+        if self._closed:
+            raise QueryError(
+                f"Multiplexed connection is closed. Operation: {operation_context}"
+            )
+
+        request_id = _next_request_id(self._ids, self._pending)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            try:
+                self._writer.write(MessageFraming.frame_message(message, request_id))
+                await self._writer.drain()
+            except OSError as e:
+                self._fail(e)
+                raise QueryError(
+                    f"Failed to send on multiplexed connection: {e}. Operation: {operation_context}"
+                )
+            flags, payload = await future
+        finally:
+            self._pending.pop(request_id, None)
+
+        return MessageFraming.decode_payload(flags, payload)
+
+    async def close(self) -> None:
+        self._fail(None)
+        self._reader_task.cancel()
+        try:
+            await self._writer.wait_closed()
+        except Exception:
+            pass
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                flags, length = MessageFraming.parse_frame_header(
+                    await self._reader.readexactly(MessageFraming.HEADER_SIZE)
+                )
+                if not flags & MessageFraming.FLAG_TAGGED:
+                    raise ValueError("Untagged frame received on multiplexed connection")
+                request_id = MessageFraming.parse_tag(
+                    await self._reader.readexactly(MessageFraming.TAG_SIZE)
+                )
+                payload = await self._reader.readexactly(length)
+
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    logger.debug(f"Dropping response for abandoned request {request_id}")
+                    continue
+                future.set_result((flags, payload))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not self._closed:
+                logger.warning(f"Multiplexed database connection lost: {e!r}")
+            self._fail(e)
+
+    def _fail(self, error: Optional[Exception]) -> None:
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            self._writer.close()
+        except Exception:
+            pass
+
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(QueryError(f"Multiplexed connection closed: {error!r}"))
+
+
+def supports_multiplex(hello_response: Dict) -> bool:
+    return (
+        hello_response.get("status") == "ok"
+        and MULTIPLEX_FEATURE in (hello_response.get("features") or [])
+    )
+
+
+def _next_request_id(ids: "itertools.count[int]", pending: Dict) -> int:
+    while True:
+        request_id = next(ids) % MAX_REQUEST_ID or 1
+        if request_id not in pending:
+            return request_id
+
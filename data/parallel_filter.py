@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from data.deadline import Deadline
+from data.exceptions import TimeoutError
+from data.search_query import Match, SearchQuery, Term
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PARALLEL_FILTER_THRESHOLD = 50000
+DEFAULT_PARALLEL_FILTER_CHUNK_SIZE = 10000
+
+# Chunks submitted ahead of the oldest unfinished one, per worker, before the
+# caller stops reading more events.
+_CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+class _MissingType:
+    # Pickled by name, so a worker's copy is its own module's marker.
+    def __reduce__(self) -> str:
+        return "MISSING"
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _MissingType()
+
+
+def default_workers() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ParallelFilter:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        threshold: int = DEFAULT_PARALLEL_FILTER_THRESHOLD,
+        chunk_size: int = DEFAULT_PARALLEL_FILTER_CHUNK_SIZE
+    ):
+        workers = default_workers() if workers is None else workers
+        if workers <= 0:
+            raise ValueError(f"Invalid parallel filter workers: {workers}")
+        if threshold < 0:
+            raise ValueError(f"Invalid parallel filter threshold: {threshold}")
+        if chunk_size <= 0:
+            raise ValueError(f"Invalid parallel filter chunk size: {chunk_size}")
+
+        self.workers = workers
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.serial_runs = 0
+        self.parallel_runs = 0
+        self.chunks = 0
+
+    def run(self, query: SearchQuery) -> "FilterRun":
+        return FilterRun(self, query)
+
+    def filter(
+        self,
+        query: SearchQuery,
+        events: List[Dict[str, Any]],
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        run = self.run(query)
+        run.add(events)
+        return run.result(deadline)
+
+    def match_values(self, term: Match, values: Sequence[Any], deadline: Optional[Deadline] = None) -> List[int]:
+        # Indexes of the values the term matches; MISSING stands for an absent field.
+        if len(values) < self.threshold:
+            self.serial_runs += 1
+            return list(_match_values(term, values))
+
+        self.parallel_runs += 1
+        chunks = [values[start:start + self.chunk_size] for start in range(0, len(values), self.chunk_size)]
+        futures = [self._submit(_match_values_chunk, term, list(chunk)) for chunk in chunks]
+        matched: List[int] = []
+        for start, chunk, future in zip(range(0, len(values), self.chunk_size), chunks, futures):
+            indexes = self._chunk_result(future, deadline, lambda: _match_values(term, chunk))
+            matched.extend(start + i for i in indexes)
+        return matched
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "threshold": self.threshold,
+            "serial_runs": self.serial_runs,
+            "parallel_runs": self.parallel_runs,
+            "chunks": self.chunks,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, function: Callable[..., bytes], *args: Any) -> "Future[bytes]":
+        with self._lock:
+            if self._executor is None:
+                # Not fork: the web server has threads (pools, refreshes) whose locks
+                # a forked child could inherit held.
+                self._executor = ProcessPoolExecutor(self.workers, multiprocessing.get_context("spawn"))
+            executor = self._executor
+        self.chunks += 1
+        return executor.submit(function, *args)
+
+    def _chunk_result(
+        self,
+        future: "Future[bytes]",
+        deadline: Optional[Deadline],
+        serial: Callable[[], Iterable[int]]
+    ) -> Iterable[int]:
+        try:
+            return array("I", future.result(deadline.remaining() if deadline is not None else None))
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError("Timed out waiting for the parallel filter")
+        except BrokenProcessPool as e:
+            # A worker died (killed, out of memory); a new pool starts on the next chunk.
+            logger.warning(f"Parallel filter worker pool failed, filtering in-process: {e}")
+            self.close()
+            return serial()
+
+
+class FilterRun:
+    # Events are buffered until there are enough to be worth the workers, then
+    # handed over in chunks as they arrive; matches come back in input order.
+    def __init__(self, parallel: ParallelFilter, query: SearchQuery):
+        self._parallel = parallel
+        self._query = query
+        self._fields = tuple(sorted(query.fields))
+        self._pending: List[Dict[str, Any]] = []
+        self._chunks: Deque[Tuple[List[Dict[str, Any]], "Future[bytes]"]] = deque()
+        self._matched: List[Dict[str, Any]] = []
+        self.parallel = False
+
+    @property
+    def backlogged(self) -> bool:
+        return len(self._chunks) > self._parallel.workers * _CHUNKS_IN_FLIGHT_PER_WORKER
+
+    def oldest(self) -> "Future[bytes]":
+        return self._chunks[0][1]
+
+    def add(self, events: List[Dict[str, Any]]) -> None:
+        if not self._query:
+            self._matched.extend(events)
+            return
+
+        self._pending.extend(events)
+        if not self.parallel and len(self._pending) < self._parallel.threshold:
+            return
+        self.parallel = True
+        chunk_size = self._parallel.chunk_size
+        while len(self._pending) >= chunk_size:
+            self._submit(self._pending[:chunk_size])
+            del self._pending[:chunk_size]
+
+    def wait_oldest(self, deadline: Optional[Deadline] = None) -> None:
+        _wait([self.oldest()], deadline)
+
+    async def wait_oldest_async(self, deadline: Optional[Deadline] = None) -> None:
+        await _wait_async([self.oldest()], deadline)
+
+    def result(self, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        _wait(self._finish(), deadline)
+        return self._collect(deadline)
+
+    async def result_async(self, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        await _wait_async(self._finish(), deadline)
+        return self._collect(deadline)
+
+    def _finish(self) -> List["Future[bytes]"]:
+        if self.parallel:
+            if self._pending:
+                self._submit(self._pending)
+                self._pending = []
+            self._parallel.parallel_runs += 1
+        elif self._query:
+            self._parallel.serial_runs += 1
+        return [future for _, future in self._chunks]
+
+    def _collect(self, deadline: Optional[Deadline]) -> List[Dict[str, Any]]:
+        while self._chunks:
+            chunk, future = self._chunks.popleft()
+            indexes = self._parallel._chunk_result(future, deadline, lambda: _match_events(self._query, chunk))
+            self._matched.extend(chunk[i] for i in indexes)
+        if self._pending:
+            self._matched.extend(self._query.filter(self._pending))
+            self._pending = []
+        return self._matched
+
+    def _submit(self, chunk: List[Dict[str, Any]]) -> None:
+        # Only the columns the query reads are sent, not pickled event dicts.
+        columns = [[event.get(name, MISSING) for event in chunk] for name in self._fields]
+        future = self._parallel._submit(_match_columns_chunk, self._query.terms, self._fields, columns)
+        self._chunks.append((chunk, future))
+
+
+def _wait(futures: List["Future[bytes]"], deadline: Optional[Deadline]) -> None:
+    if not futures:
+        return
+    done, _ = wait(futures, deadline.remaining() if deadline is not None else None)
+    if len(done) < len(futures):
+        for future in futures:
+            future.cancel()
+        raise TimeoutError("Timed out waiting for the parallel filter")
+
+
+async def _wait_async(futures: List["Future[bytes]"], deadline: Optional[Deadline]) -> None:
+    if not futures:
+        return
+    # Failures are left on the futures; collecting them decides what to do.
+    waiters = [asyncio.wrap_future(future) for future in futures]
+    done, _ = await asyncio.wait(waiters, timeout=deadline.remaining() if deadline is not None else None)
+    if len(done) < len(waiters):
+        for future in futures:
+            future.cancel()
+        raise TimeoutError("Timed out waiting for the parallel filter")
+
+
+@lru_cache(maxsize=64)
+def _query_predicate(terms: Tuple[Term, ...]) -> Callable[[Dict[str, Any]], bool]:
+    return SearchQuery(terms).predicate
+
+
+@lru_cache(maxsize=64)
+def _term_test(term: Match) -> Callable[[str], bool]:
+    return term.text_test()
+
+
+def _match_columns_chunk(terms: Tuple[Term, ...], fields: Tuple[str, ...], columns: List[List[Any]]) -> bytes:
+    predicate = _query_predicate(terms)
+    matched = array("I")
+    for i, values in enumerate(zip(*columns)):
+        event = {name: value for name, value in zip(fields, values) if value is not MISSING}
+        if predicate(event):
+            matched.append(i)
+    return matched.tobytes()
+
+
+def _match_values_chunk(term: Match, values: List[Any]) -> bytes:
+    return array("I", _match_values(term, values)).tobytes()
+
+
+def _match_events(query: SearchQuery, events: List[Dict[str, Any]]) -> Iterable[int]:
+    predicate = query.predicate
+    return [i for i, event in enumerate(events) if predicate(event)]
+
+
+def _match_values(term: Match, values: Sequence[Any]) -> Iterable[int]:
+    test = _term_test(term)
+    empty_matches = test("")
+    return [
+        i for i, value in enumerate(values)
+        if (empty_matches if value is MISSING else test(str(value)))
+    ]
@@ -0,0 +1,355 @@
+import asyncio
+import socket
+import threading
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from data.exceptions import ConnectionError, PoolExhaustedError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledConnection:
+    sock: socket.socket
+    created_at: float
+    last_used: float
+    reused: bool = False
+    negotiated: bool = False
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        connect: Callable[[Optional[float]], socket.socket],
+        min_size: int = 0,
+        max_size: int = 10,
+        idle_timeout: float = 60.0,
+        acquire_timeout: float = 10.0
+    ):
+        if min_size < 0:
+            raise ValueError(f"Invalid pool min size: {min_size}")
+        if max_size < 1 or max_size < min_size:
+            raise ValueError(f"Invalid pool max size: {max_size}")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None, fresh: bool = False) -> PooledConnection:
+        wait_limit = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + wait_limit
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise ConnectionError("Connection pool is closed")
+
+                self._evict_idle_locked(time.monotonic())
+
+                while self._idle and not fresh:
+                    conn = self._idle.pop()
+                    if _is_healthy(conn.sock):
+                        conn.reused = True
+                        return conn
+                    logger.debug("Discarding unhealthy pooled connection")
+                    self._close_locked(conn)
+
+                if fresh and self._idle and self._size >= self.max_size:
+                    self._close_locked(self._idle.popleft())
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"No database connection available after waiting {wait_limit} seconds "
+                        f"(pool max size: {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            # An explicit timeout is the caller's whole budget, so connecting gets what's left of it.
+            sock = self._connect(None if timeout is None else max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        now = time.monotonic()
+        conn = PooledConnection(sock=sock, created_at=now, last_used=now)
+        self._fill(None if timeout is None else deadline)
+        return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        with self._cond:
+            if self._closed:
+                self._close_locked(conn)
+                return
+            conn.last_used = time.monotonic()
+            self._idle.append(conn)
+            self._evict_idle_locked(conn.last_used)
+            self._cond.notify()
+
+    def discard(self, conn: PooledConnection) -> None:
+        with self._cond:
+            self._close_locked(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._close_locked(self._idle.popleft())
+            self._cond.notify_all()
+        logger.debug("Connection pool closed")
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def _fill(self, deadline: Optional[float]) -> None:
+        # Opened along with the first connection, and again whenever the pool had to
+        # connect because it had dropped below min_size, so later requests find them idle.
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                sock = self._connect(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                logger.debug(f"Could not open an idle pooled connection: {e}")
+                return
+            now = time.monotonic()
+            self.release(PooledConnection(sock=sock, created_at=now, last_used=now))
+
+    def _evict_idle_locked(self, now: float) -> None:
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0].last_used > self.idle_timeout
+        ):
+            self._close_locked(self._idle.popleft())
+
+    def _close_locked(self, conn: PooledConnection) -> None:
+        self._size -= 1
+        _close_socket(conn.sock)
+        self._cond.notify()
+
+
+@dataclass
+class AsyncPooledConnection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    created_at: float
+    last_used: float
+    reused: bool = False
+    negotiated: bool = False
+
+
+class AsyncConnectionPool:
+    def __init__(
+        self,
+        connect: Callable[[Optional[float]], Awaitable[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]],
+        min_size: int = 0,
+        max_size: int = 10,
+        idle_timeout: float = 60.0,
+        acquire_timeout: float = 10.0
+    ):
+        if min_size < 0:
+            raise ValueError(f"Invalid pool min size: {min_size}")
+        if max_size < 1 or max_size < min_size:
+            raise ValueError(f"Invalid pool max size: {max_size}")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: Deque[AsyncPooledConnection] = deque()
+        self._in_use = 0
+        self._closed = False
+        # Created on first use so the semaphore binds to the loop that serves requests.
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._filling = False
+
+    async def acquire(self, timeout: Optional[float] = None, fresh: bool = False) -> AsyncPooledConnection:
+        if self._closed:
+            raise ConnectionError("Connection pool is closed")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_size)
+
+        wait_limit = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + wait_limit
+        try:
+            await asyncio.wait_for(self._slots.acquire(), wait_limit)
+        except asyncio.TimeoutError:
+            raise PoolExhaustedError(
+                f"No database connection available after waiting {wait_limit} seconds "
+                f"(pool max size: {self.max_size})"
+            )
+        self._in_use += 1
+
+        try:
+            now = time.monotonic()
+            self._evict_idle(now)
+
+            while self._idle and not fresh:
+                conn = self._idle.pop()
+                if not conn.reader.at_eof() and not conn.writer.is_closing():
+                    conn.reused = True
+                    return conn
+                logger.debug("Discarding unhealthy pooled connection")
+                _close_writer(conn.writer)
+
+            if fresh and self._idle and len(self._idle) + self._in_use > self.max_size:
+                _close_writer(self._idle.popleft().writer)
+
+            # An explicit timeout is the caller's whole budget, so connecting gets what's left of it.
+            reader, writer = await self._connect(
+                None if timeout is None else max(0.0, deadline - time.monotonic())
+            )
+        except BaseException:
+            self._in_use -= 1
+            self._slots.release()
+            raise
+
+        now = time.monotonic()
+        conn = AsyncPooledConnection(reader=reader, writer=writer, created_at=now, last_used=now)
+        try:
+            await self._fill(None if timeout is None else deadline)
+        except BaseException:
+            self.discard(conn)
+            raise
+        return conn
+
+    def release(self, conn: AsyncPooledConnection) -> None:
+        self._in_use -= 1
+        if self._closed:
+            _close_writer(conn.writer)
+        else:
+            conn.last_used = time.monotonic()
+            self._idle.append(conn)
+            self._evict_idle(conn.last_used)
+        if self._slots is not None:
+            self._slots.release()
+
+    def discard(self, conn: AsyncPooledConnection) -> None:
+        self._in_use -= 1
+        _close_writer(conn.writer)
+        if self._slots is not None:
+            self._slots.release()
+
+    async def close(self) -> None:
+        self._closed = True
+        writers = [conn.writer for conn in self._idle]
+        self._idle.clear()
+        for writer in writers:
+            _close_writer(writer)
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+        logger.debug("Async connection pool closed")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._idle) + self._in_use,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "max_size": self.max_size,
+        }
+
+    async def _fill(self, deadline: Optional[float]) -> None:
+        # As ConnectionPool._fill; one caller at a time tops the pool up.
+        if self._filling:
+            return
+        self._filling = True
+        try:
+            while not self._closed and len(self._idle) + self._in_use < self.min_size:
+                try:
+                    reader, writer = await self._connect(
+                        None if deadline is None else max(0.0, deadline - time.monotonic())
+                    )
+                except Exception as e:
+                    logger.debug(f"Could not open an idle pooled connection: {e}")
+                    return
+                if self._closed:
+                    _close_writer(writer)
+                    return
+                now = time.monotonic()
+                self._idle.append(AsyncPooledConnection(reader=reader, writer=writer, created_at=now, last_used=now))
+        finally:
+            self._filling = False
+
+    def _evict_idle(self, now: float) -> None:
+        while (
+            self._idle
+            and len(self._idle) + self._in_use > self.min_size
+            and now - self._idle[0].last_used > self.idle_timeout
+        ):
+            _close_writer(self._idle.popleft().writer)
+
+
+def _is_healthy(sock: socket.socket) -> bool:
+    if sock.fileno() == -1:
+        return False
+
+    previous_timeout = sock.gettimeout()
+    try:
+        sock.settimeout(0.0)
+        # Idle connections must have nothing to read: EOF means the server hung up,
+        # and unsolicited bytes mean the stream is out of sync.
+        sock.recv(1, socket.MSG_PEEK)
+        return False
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    finally:
+        try:
+            sock.settimeout(previous_timeout)
+        except OSError:
+            pass
+
+
+def _close_socket(sock: socket.socket) -> None:
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except Exception:
+        pass
+    try:
+        sock.close()
+    except Exception:
+        pass
+
+
+def _close_writer(writer: asyncio.StreamWriter) -> None:
+    try:
+        writer.close()
+    except Exception:
+        pass
@@ -0,0 +1,100 @@
+from dataclasses import dataclass, field
+from typing import Optional, Any, Dict, FrozenSet, Iterable
+
+from data.search_query import DateRange, Match, SearchQuery, Term
+
+SUPPORTED_OPERATORS = frozenset({"$eq", "$gt", "$gte", "$lt", "$lte", "$regex", "$or"})
+
+
+@dataclass
+class QueryTranslation:
+    query: Dict[str, Any] = field(default_factory=dict)
+    residual: SearchQuery = field(default_factory=SearchQuery)
+
+    @property
+    def fully_pushed_down(self) -> bool:
+        return not self.residual
+
+
+def translate_filters(
+    operators: Iterable[str],
+    query: Optional[str] = None,
+    hostname: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    severity: Optional[str] = None,
+    event_type: Optional[str] = None
+) -> QueryTranslation:
+    return translate_search(
+        operators,
+        SearchQuery.from_filters(
+            query=query,
+            hostname=hostname,
+            start_date=start_date,
+            end_date=end_date,
+            severity=severity,
+            event_type=event_type
+        )
+    )
+
+
+def translate_search(operators: Iterable[str], search: SearchQuery) -> QueryTranslation:
+    operators = frozenset(operators)
+    translation = QueryTranslation()
+    residual = []
+
+    for term in search.terms:
+        remaining = _push_down(translation.query, operators, term)
+        if remaining is not None:
+            residual.append(remaining)
+
+    translation.residual = SearchQuery(residual)
+    return translation
+
+
+def _push_down(conditions: Dict[str, Any], operators: FrozenSet[str], term: Term) -> Optional[Term]:
+    if isinstance(term, Match):
+        return None if _push_match(conditions, operators, term) else term
+
+    if isinstance(term, DateRange):
+        return _push_date_range(conditions, operators, term)
+
+    # Negations have no equivalent in the operator set and are filtered in-process.
+    return term
+
+
+def _push_match(conditions: Dict[str, Any], operators: FrozenSet[str], term: Match) -> bool:
+    if "$regex" not in operators:
+        return False
+
+    condition = {"$regex": term.pattern}
+    if term.ignore_case:
+        condition["$options"] = "i"
+
+    # One condition per key: a second term on the same field stays in-process.
+    if len(term.fields) == 1:
+        field_name = term.fields[0]
+        if field_name in conditions:
+            return False
+        conditions[field_name] = condition
+        return True
+
+    if "$or" not in operators or "$or" in conditions:
+        return False
+    conditions["$or"] = [{field_name: dict(condition)} for field_name in term.fields]
+    return True
+
+
+def _push_date_range(
+    conditions: Dict[str, Any],
+    operators: FrozenSet[str],
+    term: DateRange
+) -> DateRange:
+    # Missing and unparseable timestamps count as the earliest possible time:
+    # an end date keeps them and a start date drops them, neither of which a
+    # string comparison can say. A start date still goes to the server, since
+    # every parseable timestamp at or after it compares greater than or equal
+    # as a string; the range itself is always checked in-process.
+    if term.start is not None and "$gte" in operators and "timestamp" not in conditions:
+        conditions["timestamp"] = {"$gte": term.start.strftime("%Y-%m-%d")}
+    return term
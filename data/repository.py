@@ -1,43 +1,220 @@
-import re
+import asyncio
+import heapq
 import logging
-from typing import Optional, Any, Dict, List
-from datetime import datetime
-from collections import defaultdict
+from contextlib import closing
+from itertools import islice
+from typing import Optional, Any, AsyncIterator, Callable, Dict, FrozenSet, Iterable, Iterator, List, Tuple, TypeVar
 
-from data.client import DatabaseClient
+from data.client import BaseDatabaseClient, DatabaseClient
+from data.cursor import EventCursor, EventOrder, event_order
+from data.dashboard import (
+    DASHBOARD_EVENT_LIMIT,
+    DASHBOARD_FIELDS,
+    DashboardAggregator,
+    _aggregate_dashboard_data,
+)
+from data.deadline import Deadline
+from data.async_client import AsyncDatabaseClient
+from data.event_cache import EventCache
+from data.exceptions import DatabaseError
+from data.external_sort import ExternalSorter
+from data.parallel_filter import ParallelFilter
+from data.query_translator import QueryTranslation, translate_search
+from data.rollups import RESOLUTIONS, ROLLUP_FIELDS, EventRollups, TimelineQuery
+from data.search_query import SearchQuery, parse_search
+from data.search_results import EventListResults, SearchResults
+from data.timestamps import event_seconds
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-class EventRepository:
-    def __init__(self, db_client: DatabaseClient):
+
+# Cached events handed to the dashboard aggregator at a time, after a snapshot load.
+_SEED_BATCH_SIZE = 10000
+
+# Events per batch from iter_filtered.
+DEFAULT_STREAM_BATCH_SIZE = 1000
+
+
+class _BaseEventRepository:
+    # Everything the sync and async repositories share: they differ only in how they wait on the database.
+    def __init__(
+        self,
+        db_client: BaseDatabaseClient,
+        cache: Optional[EventCache] = None,
+        aggregator: Optional[DashboardAggregator] = None,
+        parallel: Optional[ParallelFilter] = None
+    ):
         self.db_client = db_client
+        self.cache = cache
+        self.aggregator = aggregator
+        self.parallel = parallel
+    
+    def search_key(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> str:
+        return _search_query(query, hostname, start_date, end_date, severity, event_type, search).key()
+    
+    def _dashboard_deltas(self, operators: FrozenSet[str]) -> bool:
+        return self.aggregator.incremental and "$gt" in operators
+    
+    def _rollups_enabled(self) -> bool:
+        return self.aggregator is not None and self.aggregator.rollups_enabled
+    
+    def _cache_refresh_failed(self, error: DatabaseError) -> bool:
+        # True if the cache can still answer with what it has.
+        if not self.cache.usable():
+            logger.warning(f"Event cache unavailable, querying database: {error}")
+            return False
+        logger.warning(f"Event cache refresh failed, serving cached events: {error}")
+        return True
+    
+    def _uncached_batches(
+        self,
+        translation: QueryTranslation,
+        projection: Optional[List[str]],
+        deadline: Optional[Deadline]
+    ) -> Any:
+        return self.db_client.iter_find_batches(
+            self.db_client.SECURITY_EVENTS_COLLECTION,
+            translation.query,
+            fields=projection,
+            deadline=deadline
+        )
+    
+    def _start_cache_refresh(
+        self,
+        operators: FrozenSet[str],
+        deadline: Optional[Deadline]
+    ) -> Tuple[Optional[Any], Optional[Any], Any]:
+        incremental = self.cache.incremental and "$gt" in operators
+        seed = incremental and _aggregator_behind(self.cache, self.aggregator)
+        if seed and not self.cache.complete:
+            # Rollups count every event, evicted ones too: reload both.
+            incremental = seed = False
+        store = None if incremental else self.cache.new_store()
+        window = None
+        if self.aggregator is not None and (seed or not incremental):
+            window = self.aggregator.new_window()
+            if seed:
+                for batch in self.cache.batches(_SEED_BATCH_SIZE, DASHBOARD_FIELDS):
+                    self.aggregator.add(batch, window)
+        batches = self.db_client.iter_find_batches(
+            self.db_client.SECURITY_EVENTS_COLLECTION,
+            self.cache.delta_query() if incremental else {},
+            deadline=deadline
+        )
+        return store, window, batches
+    
+    def _add_refreshed(self, batch: List[Dict[str, Any]], store: Optional[Any], window: Optional[Any]) -> None:
+        self.cache.append(batch, store)
+        if self.aggregator is not None:
+            self.aggregator.add(batch, window)
+    
+    def _abort_cache_refresh(self, store: Optional[Any], window: Optional[Any]) -> None:
+        self.cache.abort_refresh(store)
+        if self.aggregator is not None:
+            self.aggregator.abort_refresh(window)
+    
+    def _complete_cache_refresh(self, store: Optional[Any], window: Optional[Any]) -> None:
+        self.cache.complete_refresh(store)
+        if self.aggregator is not None:
+            self.aggregator.complete_refresh(window)
+    
+    def _dashboard_batches(self, deadline: Optional[Deadline]) -> Any:
+        return self.db_client.iter_find_batches(
+            self.db_client.SECURITY_EVENTS_COLLECTION,
+            self.aggregator.delta_query(),
+            fields=DASHBOARD_FIELDS,
+            deadline=deadline
+        )
+
+
+class EventRepository(_BaseEventRepository):
+    db_client: DatabaseClient
+    
+    def iter_events(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Iterator[Dict[str, Any]]:
+        return self.db_client.iter_security_events(query or {}, fields=fields, deadline=deadline)
     
     def find_all(
         self, 
         query: Optional[Dict[str, Any]] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
     ) -> List[Dict[str, Any]]:
-        events = self.db_client.find_security_events(query or {})
+        with closing(self.iter_events(query, fields, deadline)) as events:
+            return _limit_events(events, limit)
+    
+    def find_for_dashboard(self, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        if self._cache_ready(deadline):
+            events = self.cache.latest(DASHBOARD_EVENT_LIMIT, DASHBOARD_FIELDS)
+            if events is not None:
+                return events
         
-        if limit is not None and limit > 0:
-            return events[:limit]
+        return self._find_latest(deadline)
+    
+    def _find_latest(self, deadline: Optional[Deadline]) -> List[Dict[str, Any]]:
+        def load() -> List[Dict[str, Any]]:
+            with closing(self.iter_events(fields=DASHBOARD_FIELDS, deadline=deadline)) as events:
+                return _latest_events(events, DASHBOARD_EVENT_LIMIT)
         
-        return events
+        # Every dashboard panel asks for the same scan; concurrent ones share it.
+        return list(self.db_client.coalesce(_dashboard_key(self.db_client), load, deadline))
     
-    def find_for_dashboard(self) -> List[Dict[str, Any]]:
-        events = self.db_client.find_security_events({})
+    def dashboard_data(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        if self.aggregator is None:
+            return _aggregate_dashboard_data(self.find_for_dashboard(deadline))
         
-        try:
-            sorted_events = sorted(
-                events,
-                key=lambda e: e.get("timestamp", ""),
-                reverse=True
-            )
-            return sorted_events[:10000]
-        except Exception as e:
-            logger.warning(f"Failed to sort events by timestamp: {e}")
-            return events[:10000]
+        if self.cache is not None:
+            # Cache refreshes feed the aggregator the same deltas they load.
+            if self._cache_ready(deadline):
+                return self.aggregator.snapshot()
+            return _aggregate_dashboard_data(self._find_latest(deadline))
+        
+        if not self._dashboard_deltas(self.db_client.query_operators(deadline)):
+            # Without deltas every refresh is a full scan, and the per-call aggregation is cheaper.
+            return _aggregate_dashboard_data(self._find_latest(deadline))
+        
+        self.db_client.coalesce(
+            _dashboard_refresh_key(self.db_client), lambda: self._refresh_dashboard(deadline), deadline
+        )
+        return self.aggregator.snapshot()
+    
+    def timeline(self, query: TimelineQuery, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        if self._rollups_ready(deadline):
+            return self.aggregator.timeline(query)
+        
+        # Nothing keeps rollups up to date here: build them from one scan for this call.
+        rollups = _unbounded_rollups()
+        with closing(self.iter_events(fields=ROLLUP_FIELDS, deadline=deadline)) as events:
+            rollups.add(events)
+        return rollups.timeline(query)
+    
+    def _rollups_ready(self, deadline: Optional[Deadline]) -> bool:
+        if not self._rollups_enabled():
+            return False
+        if self.cache is not None:
+            return self._cache_ready(deadline)
+        if not self._dashboard_deltas(self.db_client.query_operators(deadline)):
+            return False
+        self.db_client.coalesce(
+            _dashboard_refresh_key(self.db_client), lambda: self._refresh_dashboard(deadline), deadline
+        )
+        return True
     
     def find_filtered(
         self,
@@ -46,232 +223,680 @@ class EventRepository:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         severity: Optional[str] = None,
-        event_type: Optional[str] = None
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        if self._cache_ready(deadline):
+            events = self.cache.find(search_query, fields, deadline)
+            if events is not None:
+                return events
+        
+        return _newest_first(self._find_uncached(search_query, fields, deadline))
+    
+    def iter_filtered(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        # find_filtered in newest-first batches, without ever holding all of them:
+        # keyset pages from the cache, or a spilling sort of the database's answer.
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        after = None
+        if self._cache_ready(deadline):
+            while True:
+                page = self.cache.find_after(search_query, after, batch_size, fields, deadline=deadline)
+                if page is None:
+                    # No longer answerable from the cache; the database carries on from the cursor.
+                    break
+                _, events, after = page
+                if events:
+                    yield events
+                if after is None:
+                    return
+        
+        yield from self._iter_uncached(search_query, fields, deadline, after, batch_size)
+    
+    def _iter_uncached(
+        self,
+        search_query: SearchQuery,
+        fields: Optional[List[str]],
+        deadline: Optional[Deadline],
+        after: Optional[EventCursor],
+        batch_size: int
+    ) -> Iterator[List[Dict[str, Any]]]:
+        translation = translate_search(self.db_client.query_operators(deadline), search_query)
+        batches = self._uncached_batches(translation, _projection_fields(fields, translation.residual), deadline)
+        with ExternalSorter(_event_order) as sorter:
+            with closing(batches):
+                for batch in batches:
+                    sorter.add(_events_after(translation.residual.filter(batch), after))
+                    if sorter.full:
+                        sorter.spill()
+            yield from sorter.batches(batch_size)
+    
+    def find_page(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        if self._cache_ready(deadline):
+            page = self.cache.find_page(search_query, offset, limit, fields, deadline)
+            if page is not None:
+                return page
+        
+        events = self._find_uncached(search_query, fields, deadline)
+        return len(events), _newest_page(events, offset, limit)
+    
+    def results_version(self, deadline: Optional[Deadline] = None) -> Any:
+        # Search results taken at another version are out of date; None means only their age tells.
+        if self._cache_ready(deadline):
+            return self.cache.version
+        return None
+    
+    def search_results(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None
+    ) -> SearchResults:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        version = self.results_version(deadline)
+        if version is not None:
+            results = self.cache.results(search_query, fields, deadline)
+            if results is not None:
+                return results
+        
+        events = self._find_uncached(search_query, fields, deadline)
+        return EventListResults(_newest_first(events), version)
+    
+    def find_after(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None,
+        after: Optional[EventCursor] = None,
+        limit: int = 50,
+        count: bool = False
+    ) -> Tuple[Optional[int], List[Dict[str, Any]], Optional[EventCursor]]:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        if self._cache_ready(deadline):
+            page = self.cache.find_after(search_query, after, limit, fields, count, deadline)
+            if page is not None:
+                return page
+        
+        events = self._find_uncached(search_query, fields, deadline)
+        return (len(events) if count else None, *_page_after(events, after, limit))
+    
+    def _find_uncached(
+        self,
+        search_query: SearchQuery,
+        fields: Optional[List[str]],
+        deadline: Optional[Deadline]
     ) -> List[Dict[str, Any]]:
-        events = self.find_all()
-        return _apply_filters(
-            events,
-            query=query,
-            hostname=hostname,
-            start_date=start_date,
-            end_date=end_date,
-            severity=severity,
-            event_type=event_type
+        translation = translate_search(self.db_client.query_operators(deadline), search_query)
+        
+        projection = _projection_fields(fields, translation.residual)
+        
+        def load() -> List[Dict[str, Any]]:
+            batches = self._uncached_batches(translation, projection, deadline)
+            if self.parallel is not None and translation.residual:
+                run = self.parallel.run(translation.residual)
+                with closing(batches):
+                    for batch in batches:
+                        run.add(batch)
+                        if run.backlogged:
+                            run.wait_oldest(deadline)
+                return run.result(deadline)
+            filtered: List[Dict[str, Any]] = []
+            with closing(batches):
+                for batch in batches:
+                    filtered.extend(translation.residual.filter(batch))
+            return filtered
+        
+        # Shared by coalesced callers: ordering builds a new list rather than sorting this one.
+        return self.db_client.coalesce(
+            _filtered_key(self.db_client, translation, projection), load, deadline
         )
-
-def _apply_filters(
-    events: List[Dict[str, Any]],
-    query: Optional[str] = None,
-    hostname: Optional[str] = None,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    severity: Optional[str] = None,
-    event_type: Optional[str] = None
-) -> List[Dict[str, Any]]:
-    filtered = events
-    
-    if query:
-        try:
-            pattern = re.compile(query)
-            filtered = [
-                e for e in filtered
-                if any(
-                    pattern.search(str(e.get(field, "")))
-                    for field in ["hostname", "source", "event_type", "severity", 
-                                  "user", "process", "command", "raw_log"]
-                )
-            ]
-        except re.error:
-            filtered = [
-                e for e in filtered
-                if any(
-                    query in str(e.get(field, ""))
-                    for field in ["hostname", "source", "event_type", "severity",
-                                  "user", "process", "command", "raw_log"]
+    
+    def _cache_ready(self, deadline: Optional[Deadline]) -> bool:
+        if self.cache is None:
+            return False
+        if self.cache.needs_refresh():
+            try:
+                self.db_client.coalesce(
+                    _cache_refresh_key(self.db_client), lambda: self._refresh_cache(deadline), deadline
                 )
-            ]
+            except DatabaseError as e:
+                return self._cache_refresh_failed(e)
+        return True
     
-    if hostname:
-        hostname_lower = hostname.lower()
-        filtered = [
-            e for e in filtered
-            if hostname_lower in str(e.get("hostname", "")).lower()
-        ]
+    def _refresh_cache(self, deadline: Optional[Deadline]) -> None:
+        store, window, batches = self._start_cache_refresh(self.db_client.query_operators(deadline), deadline)
+        try:
+            with closing(batches):
+                for batch in batches:
+                    self._add_refreshed(batch, store, window)
+        except BaseException:
+            self._abort_cache_refresh(store, window)
+            raise
+        self._complete_cache_refresh(store, window)
     
-    if start_date:
+    def _refresh_dashboard(self, deadline: Optional[Deadline]) -> None:
+        batches = self._dashboard_batches(deadline)
         try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            filtered = [
-                e for e in filtered
-                if _parse_event_date(e.get("timestamp", "")) >= start_dt
-            ]
-        except ValueError:
-            pass
-    
-    if end_date:
+            with closing(batches):
+                for batch in batches:
+                    self.aggregator.add(batch)
+        except BaseException:
+            self.aggregator.abort_refresh()
+            raise
+        self.aggregator.complete_refresh()
+
+
+class AsyncEventRepository(_BaseEventRepository):
+    db_client: AsyncDatabaseClient
+    
+    def iter_events(
+        self,
+        query: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        return self.db_client.iter_security_events(query or {}, fields=fields, deadline=deadline)
+    
+    async def find_all(
+        self, 
+        query: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> List[Dict[str, Any]]:
+        events = self.iter_events(query, fields, deadline)
         try:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-            end_dt = end_dt.replace(hour=23, minute=59, second=59)
-            filtered = [
-                e for e in filtered
-                if _parse_event_date(e.get("timestamp", "")) <= end_dt
-            ]
-        except ValueError:
-            pass
-    
-    if severity:
-        severity_lower = severity.lower()
-        filtered = [
-            e for e in filtered
-            if str(e.get("severity", "")).lower() == severity_lower
-        ]
-    
-    if event_type:
-        event_type_lower = event_type.lower()
-        filtered = [
-            e for e in filtered
-            if event_type_lower in str(e.get("event_type", "")).lower()
-        ]
-    
-    return filtered
-
-
-def _parse_event_date(timestamp: str) -> datetime:
-    if not timestamp:
-        return datetime.min
-    
-    for fmt in ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+            result: List[Dict[str, Any]] = []
+            async for event in events:
+                result.append(event)
+                if limit is not None and 0 < limit <= len(result):
+                    break
+            return result
+        finally:
+            await events.aclose()
+    
+    async def find_for_dashboard(self, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        if await self._cache_ready(deadline):
+            events = await asyncio.to_thread(self.cache.latest, DASHBOARD_EVENT_LIMIT, DASHBOARD_FIELDS)
+            if events is not None:
+                return events
+        
+        return await self._find_latest(deadline)
+    
+    async def _find_latest(self, deadline: Optional[Deadline]) -> List[Dict[str, Any]]:
+        # Every dashboard panel asks for the same scan; concurrent ones share it.
+        return list(await self.db_client.coalesce(
+            _dashboard_key(self.db_client), lambda: self._load_dashboard(deadline), deadline
+        ))
+    
+    async def dashboard_data(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        if self.aggregator is None:
+            return _aggregate_dashboard_data(await self.find_for_dashboard(deadline))
+        
+        if self.cache is not None:
+            # Cache refreshes feed the aggregator the same deltas they load.
+            if await self._cache_ready(deadline):
+                return self.aggregator.snapshot()
+            return _aggregate_dashboard_data(await self._find_latest(deadline))
+        
+        if not self._dashboard_deltas(await self.db_client.query_operators(deadline)):
+            # Without deltas every refresh is a full scan, and the per-call aggregation is cheaper.
+            return _aggregate_dashboard_data(await self._find_latest(deadline))
+        
+        await self.db_client.coalesce(
+            _dashboard_refresh_key(self.db_client), lambda: self._refresh_dashboard(deadline), deadline
+        )
+        return self.aggregator.snapshot()
+    
+    async def timeline(self, query: TimelineQuery, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        if await self._rollups_ready(deadline):
+            return self.aggregator.timeline(query)
+        
+        # Nothing keeps rollups up to date here: build them from one scan for this call.
+        rollups = _unbounded_rollups()
+        events = self.iter_events(fields=ROLLUP_FIELDS, deadline=deadline)
+        try:
+            async for event in events:
+                rollups.add_event(event_seconds(event.get("timestamp", "")), event)
+        finally:
+            await events.aclose()
+        return rollups.timeline(query)
+    
+    async def _rollups_ready(self, deadline: Optional[Deadline]) -> bool:
+        if not self._rollups_enabled():
+            return False
+        if self.cache is not None:
+            return await self._cache_ready(deadline)
+        if not self._dashboard_deltas(await self.db_client.query_operators(deadline)):
+            return False
+        await self.db_client.coalesce(
+            _dashboard_refresh_key(self.db_client), lambda: self._refresh_dashboard(deadline), deadline
+        )
+        return True
+    
+    async def _load_dashboard(self, deadline: Optional[Deadline]) -> List[Dict[str, Any]]:
+        latest: List[Tuple[int, int, Dict[str, Any]]] = []
+        events = self.iter_events(fields=DASHBOARD_FIELDS, deadline=deadline)
         try:
-            return datetime.strptime(timestamp.split(".")[0].replace("Z", ""), fmt.replace("Z", ""))
-        except ValueError:
-            continue
-    
-    return datetime.min
-
-def _aggregate_dashboard_data(events: List[Dict[str, Any]]) -> Dict[str, Any]:
-    agents: Dict[str, str] = {}
-    logins: List[Dict[str, Any]] = []
-    hosts: Dict[str, int] = defaultdict(int)
-    event_types: Dict[str, int] = defaultdict(int)
-    severities: Dict[str, int] = defaultdict(int)
-    users: Dict[str, int] = defaultdict(int)
-    processes: Dict[str, int] = defaultdict(int)
-    hourly_counts: Dict[int, int] = defaultdict(int)
-    
-    for event in events:
-        hostname = event.get("hostname", "unknown")
-        evt_type = event.get("event_type", "unknown")
-        severity = event.get("severity", "unknown")
-        user = event.get("user")
-        process = event.get("process")
-        timestamp = event.get("timestamp", "")
-        agent_last_seen = event.get("agent_last_seen", timestamp)
-        source = event.get("source", "unknown")
-        
-        if hostname:
-            if hostname not in agents or agent_last_seen > agents[hostname]:
-                agents[hostname] = agent_last_seen
-        
-        if evt_type in ("user_login", "authentication_failure", "ssh_connection"):
-            logins.append({
-                "timestamp": timestamp,
-                "user": user or "unknown",
-                "hostname": hostname,
-                "success": evt_type != "authentication_failure",
-                "source": source
-            })
-        
-        hosts[hostname] += 1
-        
-        event_types[evt_type] += 1
-        
-        severities[severity] += 1
-        
-        if user:
-            users[user] += 1
-        
-        if process:
-            processes[process] += 1
+            position = 0
+            async for event in events:
+                # Same ordering as heapq.nlargest: newest first, ties in arrival order.
+                item = (_event_time(event), -position, event)
+                position += 1
+                if len(latest) < DASHBOARD_EVENT_LIMIT:
+                    heapq.heappush(latest, item)
+                elif item[:2] > latest[0][:2]:
+                    heapq.heapreplace(latest, item)
+        finally:
+            await events.aclose()
+        latest.sort(key=lambda item: item[:2], reverse=True)
+        return [event for _, _, event in latest]
+    
+    async def find_filtered(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        if await self._cache_ready(deadline):
+            # Cache scans hold its lock and take as long as the match: not on the event loop.
+            events = await asyncio.to_thread(self.cache.find, search_query, fields, deadline)
+            if events is not None:
+                return events
+        
+        return _newest_first(await self._find_uncached(search_query, fields, deadline))
+    
+    async def iter_filtered(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
         
+        after = None
+        if await self._cache_ready(deadline):
+            while True:
+                page = await asyncio.to_thread(
+                    self.cache.find_after, search_query, after, batch_size, fields, deadline=deadline
+                )
+                if page is None:
+                    break
+                _, events, after = page
+                if events:
+                    yield events
+                if after is None:
+                    return
+        
+        uncached = self._iter_uncached(search_query, fields, deadline, after, batch_size)
         try:
-            if timestamp:
-                hour = _extract_hour_from_timestamp(timestamp)
-                if hour is not None:
-                    hourly_counts[hour] += 1
-        except Exception:
-            pass
-    
-    sorted_logins = sorted(logins, key=lambda x: x.get("timestamp", ""), reverse=True)[:10]
-    sorted_hosts = sorted(hosts.items(), key=lambda x: x[1], reverse=True)
-    sorted_users = sorted(users.items(), key=lambda x: x[1], reverse=True)[:10]
-    sorted_processes = sorted(processes.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    timeline = [{"hour": h, "event_count": hourly_counts.get(h, 0)} for h in range(24)]
-    
-    return {
-        "active_agents": [
-            {"agent_id": agent_id, "last_activity": last_activity, "status": "active"}
-            for agent_id, last_activity in sorted(agents.items(), key=lambda x: x[1], reverse=True)
-        ],
-        "recent_logins": sorted_logins,
-        "host_list": [
-            {"hostname": hostname, "event_count": count, "last_seen": agents.get(hostname, "")}
-            for hostname, count in sorted_hosts
-        ],
-        "events_by_type": [
-            {"event_type": evt_type, "count": count}
-            for evt_type, count in sorted(event_types.items(), key=lambda x: x[1], reverse=True)
-        ],
-        "events_by_severity": [
-            {"severity": severity, "count": count}
-            for severity, count in severities.items()
-        ],
-        "top_users": [
-            {"user": user, "event_count": count}
-            for user, count in sorted_users
-        ],
-        "top_processes": [
-            {"process": process, "event_count": count}
-            for process, count in sorted_processes
-        ],
-        "event_timeline": timeline,
-        "total_events": len(events)
-    }
-
-
-def _extract_hour_from_timestamp(timestamp: str) -> Optional[int]:
-    if not timestamp:
+            async for events in uncached:
+                yield events
+        finally:
+            await uncached.aclose()
+    
+    async def _iter_uncached(
+        self,
+        search_query: SearchQuery,
+        fields: Optional[List[str]],
+        deadline: Optional[Deadline],
+        after: Optional[EventCursor],
+        batch_size: int
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        translation = translate_search(await self.db_client.query_operators(deadline), search_query)
+        batches = self._uncached_batches(translation, _projection_fields(fields, translation.residual), deadline)
+        with ExternalSorter(_event_order) as sorter:
+            try:
+                async for batch in batches:
+                    sorter.add(_events_after(translation.residual.filter(batch), after))
+                    if sorter.full:
+                        # Sorting a run and writing it out, like the merge below, takes seconds.
+                        await _in_thread(sorter.spill)
+            finally:
+                await batches.aclose()
+            sorted_batches = sorter.batches(batch_size)
+            while True:
+                events = await _in_thread(next, sorted_batches, None)
+                if events is None:
+                    return
+                yield events
+    
+    async def find_page(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        if await self._cache_ready(deadline):
+            page = await asyncio.to_thread(self.cache.find_page, search_query, offset, limit, fields, deadline)
+            if page is not None:
+                return page
+        
+        events = await self._find_uncached(search_query, fields, deadline)
+        return len(events), _newest_page(events, offset, limit)
+    
+    async def results_version(self, deadline: Optional[Deadline] = None) -> Any:
+        # Search results taken at another version are out of date; None means only their age tells.
+        if await self._cache_ready(deadline):
+            # Takes the cache lock, which a scan in a worker thread holds for as long as it runs.
+            return await asyncio.to_thread(lambda: self.cache.version)
         return None
     
-    import re as regex_module
+    async def search_results(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None
+    ) -> SearchResults:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        version = await self.results_version(deadline)
+        if version is not None:
+            results = await asyncio.to_thread(self.cache.results, search_query, fields, deadline)
+            if results is not None:
+                return results
+        
+        events = await self._find_uncached(search_query, fields, deadline)
+        return EventListResults(_newest_first(events), version)
     
-    match = regex_module.search(r'[T ](\d{2}):(\d{2})', timestamp)
-    if match:
+    async def find_after(
+        self,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        search: Optional[str] = None,
+        after: Optional[EventCursor] = None,
+        limit: int = 50,
+        count: bool = False
+    ) -> Tuple[Optional[int], List[Dict[str, Any]], Optional[EventCursor]]:
+        search_query = _search_query(query, hostname, start_date, end_date, severity, event_type, search)
+        
+        if await self._cache_ready(deadline):
+            page = await asyncio.to_thread(
+                self.cache.find_after, search_query, after, limit, fields, count, deadline
+            )
+            if page is not None:
+                return page
+        
+        events = await self._find_uncached(search_query, fields, deadline)
+        return (len(events) if count else None, *_page_after(events, after, limit))
+    
+    async def _find_uncached(
+        self,
+        search_query: SearchQuery,
+        fields: Optional[List[str]],
+        deadline: Optional[Deadline]
+    ) -> List[Dict[str, Any]]:
+        translation = translate_search(await self.db_client.query_operators(deadline), search_query)
+        
+        projection = _projection_fields(fields, translation.residual)
+        
+        async def load() -> List[Dict[str, Any]]:
+            batches = self._uncached_batches(translation, projection, deadline)
+            if self.parallel is not None and translation.residual:
+                run = self.parallel.run(translation.residual)
+                try:
+                    async for batch in batches:
+                        run.add(batch)
+                        if run.backlogged:
+                            await run.wait_oldest_async(deadline)
+                finally:
+                    await batches.aclose()
+                return await run.result_async(deadline)
+            filtered: List[Dict[str, Any]] = []
+            try:
+                async for batch in batches:
+                    filtered.extend(translation.residual.filter(batch))
+            finally:
+                await batches.aclose()
+            return filtered
+        
+        # Shared by coalesced callers: ordering builds a new list rather than sorting this one.
+        return await self.db_client.coalesce(
+            _filtered_key(self.db_client, translation, projection), load, deadline
+        )
+    
+    async def _cache_ready(self, deadline: Optional[Deadline]) -> bool:
+        if self.cache is None:
+            return False
+        if self.cache.needs_refresh():
+            try:
+                await self.db_client.coalesce(
+                    _cache_refresh_key(self.db_client), lambda: self._refresh_cache(deadline), deadline
+                )
+            except DatabaseError as e:
+                return self._cache_refresh_failed(e)
+        return True
+    
+    async def _refresh_cache(self, deadline: Optional[Deadline]) -> None:
+        operators = await self.db_client.query_operators(deadline)
+        # Every step below takes the cache lock, and a seed replays the whole cache: none on the event loop.
+        store, window, batches = await asyncio.to_thread(self._start_cache_refresh, operators, deadline)
         try:
-            hour = int(match.group(1))
-            minute = int(match.group(2))
-            if 0 <= hour <= 23 and 0 <= minute <= 59:
-                if minute >= 30:
-                    hour = (hour + 1) % 24
-                return hour
-        except ValueError:
-            pass
-    
-    return None
-
-
-def _empty_dashboard_data(error: Optional[str] = None) -> Dict[str, Any]:
-    result = {
-        "active_agents": [],
-        "recent_logins": [],
-        "host_list": [],
-        "events_by_type": [],
-        "events_by_severity": [],
-        "top_users": [],
-        "top_processes": [],
-        "event_timeline": [{"hour": h, "event_count": 0} for h in range(24)],
-        "total_events": 0
-    }
-    if error:
-        result["error"] = error
-    return result
\ No newline at end of file
+            async for batch in batches:
+                await _in_thread(self._add_refreshed, batch, store, window)
+        except BaseException:
+            await asyncio.to_thread(self._abort_cache_refresh, store, window)
+            raise
+        finally:
+            await batches.aclose()
+        await asyncio.to_thread(self._complete_cache_refresh, store, window)
+    
+    async def _refresh_dashboard(self, deadline: Optional[Deadline]) -> None:
+        batches = self._dashboard_batches(deadline)
+        try:
+            async for batch in batches:
+                self.aggregator.add(batch)
+        except BaseException:
+            self.aggregator.abort_refresh()
+            raise
+        finally:
+            await batches.aclose()
+        self.aggregator.complete_refresh()
+
+
+async def _in_thread(function: Callable[..., T], *args: Any) -> T:
+    # Cancelling a to_thread wait leaves the thread running: the caller's cleanup waits for it.
+    work = asyncio.ensure_future(asyncio.to_thread(function, *args))
+    try:
+        return await asyncio.shield(work)
+    except asyncio.CancelledError:
+        await asyncio.wait([work])
+        raise
+
+
+def _aggregator_behind(cache: EventCache, aggregator: Optional[DashboardAggregator]) -> bool:
+    # A cache loaded from a snapshot holds events the aggregator has never seen.
+    return aggregator is not None and aggregator.delta_query() != cache.delta_query()
+
+
+def _dashboard_key(db_client: BaseDatabaseClient) -> str:
+    return db_client.find_key(
+        db_client.SECURITY_EVENTS_COLLECTION, {}, DASHBOARD_FIELDS, f"latest:{DASHBOARD_EVENT_LIMIT}"
+    )
+
+
+def _cache_refresh_key(db_client: BaseDatabaseClient) -> str:
+    return db_client.find_key(db_client.SECURITY_EVENTS_COLLECTION, {}, None, "event-cache-refresh")
+
+
+def _dashboard_refresh_key(db_client: BaseDatabaseClient) -> str:
+    return db_client.find_key(
+        db_client.SECURITY_EVENTS_COLLECTION, {}, DASHBOARD_FIELDS, "dashboard-aggregator-refresh"
+    )
+
+
+def _unbounded_rollups() -> EventRollups:
+    return EventRollups({name: None for name in RESOLUTIONS})
+
+
+def _filtered_key(
+    db_client: BaseDatabaseClient,
+    translation: QueryTranslation,
+    projection: Optional[List[str]]
+) -> str:
+    return db_client.find_key(
+        db_client.SECURITY_EVENTS_COLLECTION, translation.query, projection,
+        f"residual:{translation.residual.key()}"
+    )
+
+
+def _search_query(
+    query: Optional[str],
+    hostname: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    severity: Optional[str],
+    event_type: Optional[str],
+    search: Optional[str]
+) -> SearchQuery:
+    filters = SearchQuery.from_filters(
+        query=query,
+        hostname=hostname,
+        start_date=start_date,
+        end_date=end_date,
+        severity=severity,
+        event_type=event_type
+    )
+    return filters & parse_search(search) if search else filters
+
+
+def _projection_fields(fields: Optional[List[str]], residual: SearchQuery) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    
+    # Filters evaluated in-process need their columns even if the caller doesn't.
+    projected = list(fields)
+    projected.extend(sorted(f for f in residual.fields if f not in projected))
+    return projected
+
+
+def _limit_events(events: Iterable[Dict[str, Any]], limit: Optional[int]) -> List[Dict[str, Any]]:
+    if limit is not None and limit > 0:
+        return list(islice(events, limit))
+    
+    return list(events)
+
+
+def _event_time(event: Dict[str, Any]) -> int:
+    # Parsed time, not the raw string: formats with and without "T" or "Z" order correctly.
+    return event_seconds(event.get("timestamp"))
+
+
+def _latest_events(events: Iterable[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    return heapq.nlargest(limit, events, key=_event_time)
+
+
+def _newest_first(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return sorted(events, key=_event_time, reverse=True)
+
+
+def _newest_page(events: List[Dict[str, Any]], offset: int, limit: int) -> List[Dict[str, Any]]:
+    # A page needs only the newest offset + limit events, not the whole result sorted.
+    return heapq.nlargest(offset + limit, events, key=_event_time)[offset:]
+
+
+def _event_order(event: Dict[str, Any]) -> EventOrder:
+    return event_order(_event_time(event), event.get("_id"))
+
+
+def _events_after(events: List[Dict[str, Any]], after: Optional[EventCursor]) -> List[Dict[str, Any]]:
+    if after is None:
+        return events
+    return [event for event in events if _event_order(event) > after.order]
+
+
+def _page_after(
+    events: List[Dict[str, Any]],
+    after: Optional[EventCursor],
+    limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[EventCursor]]:
+    candidates: Iterable[Dict[str, Any]] = events
+    if after is not None:
+        candidates = (event for event in events if _event_order(event) > after.order)
+    page = heapq.nsmallest(limit + 1, candidates, key=_event_order)
+    if len(page) <= limit:
+        return page, None
+    last = page[limit - 1]
+    return page[:limit], EventCursor.of(_event_time(last), last.get("_id"))
@@ -0,0 +1,210 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional, Any, Dict, Iterable, List, Tuple
+
+from data.timestamps import MIN_SECONDS, event_seconds, from_seconds
+
+
+MINUTE = "minute"
+HOUR = "hour"
+DAY = "day"
+
+# Finest first: the automatic resolution takes the first one that fits.
+RESOLUTIONS = {MINUTE: 60, HOUR: 3600, DAY: 86400}
+
+DEFAULT_ROLLUP_RETENTION: Dict[str, Optional[float]] = {
+    MINUTE: 86400.0,
+    HOUR: 30 * 86400.0,
+    DAY: 365 * 86400.0,
+}
+
+ROLLUP_FIELDS = ["timestamp", "severity", "event_type", "hostname"]
+
+MAX_TIMELINE_POINTS = 2000
+DEFAULT_TIMELINE_RANGE = 86400
+
+# (severity, event_type, hostname)
+_RollupKey = Tuple[Any, Any, Any]
+
+
+@dataclass(frozen=True)
+class TimelineQuery:
+    start: Optional[int] = None
+    end: Optional[int] = None
+    resolution: Optional[str] = None
+    severity: Optional[str] = None
+    event_type: Optional[str] = None
+    hostname: Optional[str] = None
+
+    def __post_init__(self):
+        if self.resolution is not None and self.resolution not in RESOLUTIONS:
+            raise ValueError(
+                f"Invalid timeline resolution: {self.resolution}. Supported: {', '.join(RESOLUTIONS)}"
+            )
+        if self.start is not None and self.end is not None and self.start > self.end:
+            raise ValueError("Invalid timeline range: start is after end")
+
+    @property
+    def filtered(self) -> bool:
+        return self.severity is not None or self.event_type is not None or self.hostname is not None
+
+    def matches(self, key: _RollupKey) -> bool:
+        severity, event_type, hostname = key
+        return (
+            (self.severity is None or severity == self.severity)
+            and (self.event_type is None or event_type == self.event_type)
+            and (self.hostname is None or hostname == self.hostname)
+        )
+
+
+class _Rollup:
+    def __init__(self, width: int, retention: Optional[float]):
+        self.width = width
+        self.retention = retention
+        self.starts: List[int] = []
+        self.buckets: Dict[int, Counter] = {}
+        self.totals: Dict[int, int] = {}
+        self.horizon: Optional[int] = None
+
+    def add(self, seconds: int, key: _RollupKey) -> None:
+        start = seconds - seconds % self.width
+        if self.horizon is not None and start < self.horizon:
+            return
+        counts = self.buckets.get(start)
+        if counts is None:
+            counts = self.buckets[start] = Counter()
+            self.totals[start] = 0
+            insort(self.starts, start)
+        counts[key] += 1
+        self.totals[start] += 1
+
+    def prune(self, newest: int) -> None:
+        if self.retention is None:
+            return
+        horizon = int(newest - self.retention)
+        self.horizon = horizon - horizon % self.width
+        cut = bisect_left(self.starts, self.horizon)
+        for start in self.starts[:cut]:
+            del self.buckets[start]
+            del self.totals[start]
+        del self.starts[:cut]
+
+    def points(self, start: int, end: int) -> int:
+        return (end - end % self.width - (start - start % self.width)) // self.width + 1
+
+    def covers(self, start: int) -> bool:
+        return self.horizon is None or start >= self.horizon
+
+    def counts(self, first: int, last: int, query: TimelineQuery) -> Dict[int, int]:
+        starts = self.starts[bisect_left(self.starts, first):bisect_right(self.starts, last)]
+        if not query.filtered:
+            return {start: self.totals[start] for start in starts}
+        matches = query.matches
+        return {
+            start: sum(count for key, count in self.buckets[start].items() if matches(key))
+            for start in starts
+        }
+
+
+class EventRollups:
+    def __init__(self, retention: Optional[Dict[str, Optional[float]]] = None):
+        # A retention of None keeps every bucket; 0 turns the resolution off.
+        retention = DEFAULT_ROLLUP_RETENTION if retention is None else retention
+        for name, seconds in retention.items():
+            if name not in RESOLUTIONS:
+                raise ValueError(f"Invalid rollup resolution: {name}")
+            if seconds is not None and seconds < 0:
+                raise ValueError(f"Invalid rollup retention for {name}: {seconds}")
+
+        self._rollups = {
+            name: _Rollup(width, retention[name])
+            for name, width in RESOLUTIONS.items()
+            if name in retention and retention[name] != 0
+        }
+        self.newest: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._rollups)
+
+    def add(self, documents: Iterable[Dict[str, Any]]) -> None:
+        for document in documents:
+            self.add_event(event_seconds(document.get("timestamp", "")), document)
+        self.prune()
+
+    def add_event(self, seconds: int, document: Dict[str, Any]) -> None:
+        if seconds == MIN_SECONDS or not self._rollups:
+            return
+        key = (
+            document.get("severity", "unknown"),
+            document.get("event_type", "unknown"),
+            document.get("hostname", "unknown"),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return
+        if self.newest is None or seconds > self.newest:
+            self.newest = seconds
+        for rollup in self._rollups.values():
+            rollup.add(seconds, key)
+
+    def prune(self) -> None:
+        if self.newest is None:
+            return
+        for rollup in self._rollups.values():
+            rollup.prune(self.newest)
+
+    def timeline(self, query: TimelineQuery) -> Dict[str, Any]:
+        if not self._rollups:
+            raise ValueError("Timeline rollups are disabled")
+
+        end = query.end if query.end is not None else self.newest
+        if end is None:
+            end = query.start if query.start is not None else 0
+        start = query.start if query.start is not None else end - DEFAULT_TIMELINE_RANGE + 1
+        if start > end:
+            raise ValueError("Invalid timeline range: start is after end")
+
+        name = self._resolution(start, end, query.resolution)
+        rollup = self._rollups[name]
+        first = start - start % rollup.width
+        last = end - end % rollup.width
+        counts = rollup.counts(first, last, query)
+
+        return {
+            "resolution": name,
+            "start": _format_time(first),
+            "end": _format_time(last + rollup.width - 1),
+            "retained_from": _format_time(rollup.horizon) if rollup.horizon is not None else None,
+            "timeline": [
+                {"time": _format_time(bucket), "event_count": counts.get(bucket, 0)}
+                for bucket in range(first, last + 1, rollup.width)
+            ],
+        }
+
+    def _resolution(self, start: int, end: int, requested: Optional[str]) -> str:
+        if requested is not None:
+            rollup = self._rollups.get(requested)
+            if rollup is None:
+                raise ValueError(f"Timeline resolution {requested} is disabled")
+            if rollup.points(start, end) > MAX_TIMELINE_POINTS:
+                raise ValueError(
+                    f"Timeline range too long for {requested} resolution: "
+                    f"{rollup.points(start, end)} points, at most {MAX_TIMELINE_POINTS}"
+                )
+            return requested
+
+        # The finest resolution that still holds the whole range, else the coarsest that fits.
+        fitting = [name for name, rollup in self._rollups.items() if rollup.points(start, end) <= MAX_TIMELINE_POINTS]
+        if not fitting:
+            raise ValueError(f"Timeline range too long: more than {MAX_TIMELINE_POINTS} points at every resolution")
+        for name in fitting:
+            if self._rollups[name].covers(start):
+                return name
+        return fitting[-1]
+
+
+def _format_time(seconds: int) -> str:
+    return from_seconds(seconds).isoformat()
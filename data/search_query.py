@@ -0,0 +1,352 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
+from data.timestamps import event_seconds, parse_day, to_seconds
+
+TEXT_SEARCH_FIELDS = [
+    "hostname", "source", "event_type", "severity",
+    "user", "process", "command", "raw_log"
+]
+
+FIELD_ALIASES = {
+    "host": "hostname",
+    "hostname": "hostname",
+    "source": "source",
+    "type": "event_type",
+    "event_type": "event_type",
+    "severity": "severity",
+    "user": "user",
+    "process": "process",
+    "command": "command",
+    "log": "raw_log",
+    "raw_log": "raw_log",
+}
+
+EQUALS = "equals"
+PREFIX = "prefix"
+CONTAINS = "contains"
+REGEX = "regex"
+
+_KIND_COST = {EQUALS: 1, PREFIX: 2, CONTAINS: 3, REGEX: 10}
+
+# Few distinct values per field: a check's result is memoized per value.
+_LOW_CARDINALITY_FIELDS = frozenset({"hostname", "source", "event_type", "severity", "user", "process"})
+_LONG_TEXT_COST = 4
+_DATE_RANGE_COST = 5
+_MEMO_LIMIT = 4096
+
+_REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+_TOKEN = re.compile(
+    r'\s*(-?)(?:([A-Za-z_]+):)?("(?:[^"\\]|\\.)*"|/(?:[^/\\]|\\.)+/|[^\s"]+)'
+)
+
+
+@dataclass(frozen=True)
+class Match:
+    fields: Tuple[str, ...]
+    kind: str
+    value: str
+    ignore_case: bool = True
+
+    @property
+    def cost(self) -> int:
+        weight = sum(1 if name in _LOW_CARDINALITY_FIELDS else _LONG_TEXT_COST for name in self.fields)
+        return _KIND_COST[self.kind] * weight
+
+    @property
+    def pattern(self) -> str:
+        if self.kind == EQUALS:
+            return f"^{re.escape(self.value)}$"
+        if self.kind == PREFIX:
+            return f"^{re.escape(self.value)}"
+        if self.kind == CONTAINS:
+            return re.escape(self.value)
+        return self.value
+
+    def text_test(self) -> Callable[[str], bool]:
+        value = self.value.lower() if self.ignore_case and self.kind != REGEX else self.value
+
+        if self.kind == REGEX and not (_is_literal(value) and not self.ignore_case):
+            search = re.compile(value, re.IGNORECASE if self.ignore_case else 0).search
+            return lambda text: search(text) is not None
+        if not self.ignore_case:
+            if self.kind == EQUALS:
+                return lambda text: text == value
+            if self.kind == PREFIX:
+                return lambda text: text.startswith(value)
+            return lambda text: value in text
+        if self.kind == EQUALS:
+            return lambda text: text.lower() == value
+        if self.kind == PREFIX:
+            return lambda text: text.lower().startswith(value)
+        return lambda text: value in text.lower()
+
+    def expression(self, namespace: Dict[str, Any], memoize: bool) -> str:
+        test = self.text_test()
+        parts = []
+        for name in sorted(self.fields, key=lambda name: name not in _LOW_CARDINALITY_FIELDS):
+            if memoize and name in _LOW_CARDINALITY_FIELDS:
+                parts.append(f"{_bind(namespace, _Memo(test))}[e.get({name!r}, '')]")
+            else:
+                parts.append(f"{_bind(namespace, test)}(str(e.get({name!r}, '')))")
+        return parts[0] if len(parts) == 1 else f"({' or '.join(parts)})"
+
+    def describe(self) -> str:
+        case = "i" if self.ignore_case else ""
+        return f"{','.join(self.fields)}:{self.kind}{case}:{self.value!r}"
+
+
+@dataclass(frozen=True)
+class DateRange:
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    cost = _DATE_RANGE_COST
+    fields = ("timestamp",)
+
+    @property
+    def lower(self) -> Optional[int]:
+        return None if self.start is None else to_seconds(self.start)
+
+    @property
+    def upper(self) -> Optional[int]:
+        # An end date covers the whole day.
+        return None if self.end is None else to_seconds(self.end.replace(hour=23, minute=59, second=59))
+
+    def expression(self, namespace: Dict[str, Any], memoize: bool) -> str:
+        seconds = f"{_bind(namespace, event_seconds)}(e.get('timestamp', ''))"
+        lower, upper = self.lower, self.upper
+        if upper is None:
+            return f"{seconds} >= {lower}"
+        if lower is None:
+            return f"{seconds} <= {upper}"
+        return f"{lower} <= {seconds} <= {upper}"
+
+    def describe(self) -> str:
+        start = "" if self.start is None else self.start.strftime("%Y-%m-%d")
+        end = "" if self.end is None else self.end.strftime("%Y-%m-%d")
+        return f"timestamp:{start}..{end}"
+
+
+@dataclass(frozen=True)
+class Not:
+    term: Union[Match, DateRange, "Not"]
+
+    @property
+    def cost(self) -> int:
+        return self.term.cost
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return self.term.fields
+
+    def expression(self, namespace: Dict[str, Any], memoize: bool) -> str:
+        return f"not ({self.term.expression(namespace, memoize)})"
+
+    def describe(self) -> str:
+        return f"-{self.term.describe()}"
+
+
+Term = Union[Match, DateRange, Not]
+
+
+class SearchQuery:
+    def __init__(self, terms: Iterable[Term] = ()):
+        # Cheapest checks first so most events are rejected before any regex runs.
+        self.terms: Tuple[Term, ...] = tuple(sorted(terms, key=lambda term: term.cost))
+        self._predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+
+    @classmethod
+    def from_filters(
+        cls,
+        query: Optional[str] = None,
+        hostname: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        severity: Optional[str] = None,
+        event_type: Optional[str] = None
+    ) -> "SearchQuery":
+        terms: List[Term] = []
+
+        if query:
+            kind = REGEX if _is_valid_regex(query) else CONTAINS
+            terms.append(Match(tuple(TEXT_SEARCH_FIELDS), kind, query, ignore_case=False))
+
+        if hostname:
+            terms.append(Match(("hostname",), CONTAINS, hostname))
+
+        # An unparseable date is ignored, as the filter form always did.
+        start = parse_day(start_date) if start_date else None
+        end = parse_day(end_date) if end_date else None
+        if start is not None or end is not None:
+            terms.append(DateRange(start, end))
+
+        if severity:
+            terms.append(Match(("severity",), EQUALS, severity))
+
+        if event_type:
+            terms.append(Match(("event_type",), CONTAINS, event_type))
+
+        return cls(terms)
+
+    def __and__(self, other: "SearchQuery") -> "SearchQuery":
+        return SearchQuery(self.terms + other.terms)
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def __repr__(self) -> str:
+        return f"SearchQuery({self.key()})"
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        return frozenset(name for term in self.terms for name in term.fields)
+
+    @property
+    def lower_bound(self) -> Optional[int]:
+        bounds = [term.lower for term in self.terms if isinstance(term, DateRange) and term.start]
+        return max(bounds) if bounds else None
+
+    def key(self) -> str:
+        return " ".join(sorted(term.describe() for term in self.terms))
+
+    @property
+    def predicate(self) -> Callable[[Dict[str, Any]], bool]:
+        if self._predicate is None:
+            self._predicate = _compile(self.terms)
+        return self._predicate
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        return bool(self.predicate(event))
+
+    def filter(self, events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not self.terms:
+            return list(events)
+        predicate = self.predicate
+        return [event for event in events if predicate(event)]
+
+
+def parse_search(text: Optional[str]) -> SearchQuery:
+    terms: List[Term] = []
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    position = 0
+    text = text or ""
+
+    while position < len(text):
+        if text[position:].isspace():
+            break
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f"Invalid search query: unterminated quote at position {position}")
+        position = match.end()
+        negated, field_name, value = match.groups()
+
+        if field_name is not None and field_name.lower() in ("from", "to"):
+            day = parse_day(_unquote(value))
+            if day is None:
+                raise ValueError(f"Invalid search query: {field_name}: expects a YYYY-MM-DD date, got {value!r}")
+            if negated:
+                terms.append(Not(DateRange(day, None) if field_name.lower() == "from" else DateRange(None, day)))
+            elif field_name.lower() == "from":
+                start = day if start is None else max(start, day)
+            else:
+                end = day if end is None else min(end, day)
+            continue
+
+        if field_name is not None and field_name.lower() not in FIELD_ALIASES:
+            # Not a field we know, e.g. a URL: search for the whole token as text.
+            value = f"{field_name}:{value}"
+            field_name = None
+
+        fields = tuple(TEXT_SEARCH_FIELDS) if field_name is None else (FIELD_ALIASES[field_name.lower()],)
+        term: Term = _value_term(fields, value, field_name is None)
+        terms.append(Not(term) if negated else term)
+
+    if start is not None or end is not None:
+        terms.append(DateRange(start, end))
+
+    return SearchQuery(terms)
+
+
+def _value_term(fields: Tuple[str, ...], value: str, free_text: bool) -> Match:
+    if len(value) > 1 and value.startswith("/") and value.endswith("/"):
+        pattern = value[1:-1].replace("\\/", "/")
+        if not _is_valid_regex(pattern):
+            raise ValueError(f"Invalid search query: bad regular expression {pattern!r}")
+        return Match(fields, REGEX, pattern, ignore_case=False)
+
+    if value.startswith('"'):
+        literal = _unquote(value)
+        return Match(fields, CONTAINS if free_text else EQUALS, literal)
+
+    if free_text or "*" not in value:
+        return Match(fields, CONTAINS if free_text else EQUALS, value)
+
+    # Wildcards: "web*" and "*web*" get cheap checks, anything else becomes an anchored regex.
+    parts = value.split("*")
+    if len(parts) == 2 and parts[0] and not parts[1]:
+        return Match(fields, PREFIX, parts[0])
+    if len(parts) == 3 and not parts[0] and parts[1] and not parts[2]:
+        return Match(fields, CONTAINS, parts[1])
+    return Match(fields, REGEX, "^" + ".*".join(re.escape(part) for part in parts) + "$")
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+
+class _Memo(dict):
+    def __init__(self, test: Callable[[str], bool]):
+        super().__init__()
+        self._test = test
+
+    def __missing__(self, value: Any) -> bool:
+        result = self._test(str(value))
+        # Only str and None keys: 1, 1.0 and True are equal keys but render differently.
+        if (value is None or value.__class__ is str) and len(self) < _MEMO_LIMIT:
+            self[value] = result
+        return result
+
+
+def _bind(namespace: Dict[str, Any], value: Any) -> str:
+    name = f"_{len(namespace)}"
+    namespace[name] = value
+    return name
+
+
+def _compile(terms: Sequence[Term]) -> Callable[[Dict[str, Any]], bool]:
+    if not terms:
+        return lambda event: True
+
+    # The whole query becomes one function, so each event costs a single call.
+    # Unhashable field values can't index the memo tables and take the plain path.
+    namespace: Dict[str, Any] = {}
+    memoized = " and ".join(term.expression(namespace, True) for term in terms)
+    plain = " and ".join(term.expression(namespace, False) for term in terms)
+    source = (
+        "def predicate(e):\n"
+        "    try:\n"
+        f"        return {memoized}\n"
+        "    except TypeError:\n"
+        f"        return {plain}\n"
+    )
+    exec(compile(source, "<search query>", "exec"), namespace)
+    return namespace["predicate"]
+
+
+def _is_literal(pattern: str) -> bool:
+    return not any(char in _REGEX_METACHARACTERS for char in pattern)
+
+
+def _is_valid_regex(pattern: str) -> bool:
+    try:
+        re.compile(pattern)
+        return True
+    except re.error:
+        return False
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import socket
+from typing import Any, Dict, Optional, Tuple
+
+from core.message_framing import FrameDecoder, MessageFraming
+from data import exceptions
+from data.deadline import Deadline
+from data.exceptions import ConnectionError, TimeoutError
+from data.pool import AsyncConnectionPool, AsyncPooledConnection, ConnectionPool, PooledConnection
+
+
+DEFAULT_SIDECAR_POOL_SIZE = 10
+# Upper bound on one call when the caller has no deadline.
+DEFAULT_SIDECAR_TIMEOUT = 30.0
+
+# Errors the sidecar sends back by name. Anything else is a failure inside the
+# sidecar itself, and the caller goes to the database as if it were down.
+_REMOTE_ERRORS = {
+    "ValueError": ValueError,
+    **{
+        name: getattr(exceptions, name)
+        for name in (
+            "DatabaseError", "ConnectionError", "QueryError", "ResponseSizeError",
+            "TimeoutError", "PoolExhaustedError", "CircuitOpenError",
+        )
+    },
+}
+
+
+class SidecarUnavailableError(ConnectionError):
+    pass
+
+
+class SidecarClient:
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = DEFAULT_SIDECAR_POOL_SIZE,
+        timeout: float = DEFAULT_SIDECAR_TIMEOUT
+    ):
+        self.path = path
+        self.timeout = timeout
+        self._pool = ConnectionPool(self._connect, max_size=pool_size, acquire_timeout=timeout)
+        self.calls = 0
+        self.failures = 0
+
+    def search(
+        self,
+        filters: Optional[Dict[str, Any]],
+        page: int,
+        page_size: int,
+        deadline: Optional[Deadline] = None,
+        after: Optional[str] = None,
+        include_total: bool = False
+    ) -> Dict[str, Any]:
+        params = {
+            "filters": filters, "page": page, "page_size": page_size,
+            "after": after, "include_total": include_total,
+        }
+        return self.call("search", params, deadline)
+
+    def dashboard(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        return self.call("dashboard", {}, deadline)
+
+    def timeline(
+        self,
+        filters: Optional[Dict[str, Any]],
+        resolution: Optional[str],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        return self.call("timeline", {"filters": filters, "resolution": resolution}, deadline)
+
+    def call(self, method: str, params: Dict[str, Any], deadline: Optional[Deadline] = None) -> Any:
+        deadline = deadline or Deadline(self.timeout)
+        if deadline.expired:
+            raise TimeoutError(f"Deadline expired before calling the aggregation sidecar ({method})")
+        frame = _request_frame(method, params, deadline)
+        self.calls += 1
+        try:
+            conn = self._pool.acquire(deadline.clamp(self.timeout))
+        except ConnectionError as e:
+            self.failures += 1
+            raise SidecarUnavailableError(f"Aggregation sidecar at {self.path} is unavailable: {e}")
+
+        try:
+            conn.sock.settimeout(deadline.clamp(self.timeout))
+            conn.sock.sendall(frame)
+            response = _read_response(conn)
+        except socket.timeout:
+            self._pool.discard(conn)
+            raise TimeoutError(f"Timed out waiting for the aggregation sidecar ({method})")
+        except (OSError, ValueError) as e:
+            self._pool.discard(conn)
+            self.failures += 1
+            raise SidecarUnavailableError(f"Aggregation sidecar at {self.path} failed during {method}: {e}")
+        self._pool.release(conn)
+        return _result(response)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "calls": self.calls, "failures": self.failures, **self._pool.stats()}
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _connect(self, timeout: Optional[float] = None) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout if timeout is not None else self.timeout)
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise ConnectionError(f"Failed to connect to {self.path}: {e}")
+        return sock
+
+
+class AsyncSidecarClient:
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = DEFAULT_SIDECAR_POOL_SIZE,
+        timeout: float = DEFAULT_SIDECAR_TIMEOUT
+    ):
+        self.path = path
+        self.timeout = timeout
+        self._pool = AsyncConnectionPool(self._connect, max_size=pool_size, acquire_timeout=timeout)
+        self.calls = 0
+        self.failures = 0
+
+    async def search(
+        self,
+        filters: Optional[Dict[str, Any]],
+        page: int,
+        page_size: int,
+        deadline: Optional[Deadline] = None,
+        after: Optional[str] = None,
+        include_total: bool = False
+    ) -> Dict[str, Any]:
+        params = {
+            "filters": filters, "page": page, "page_size": page_size,
+            "after": after, "include_total": include_total,
+        }
+        return await self.call("search", params, deadline)
+
+    async def dashboard(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        return await self.call("dashboard", {}, deadline)
+
+    async def timeline(
+        self,
+        filters: Optional[Dict[str, Any]],
+        resolution: Optional[str],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        return await self.call("timeline", {"filters": filters, "resolution": resolution}, deadline)
+
+    async def call(self, method: str, params: Dict[str, Any], deadline: Optional[Deadline] = None) -> Any:
+        deadline = deadline or Deadline(self.timeout)
+        if deadline.expired:
+            raise TimeoutError(f"Deadline expired before calling the aggregation sidecar ({method})")
+        frame = _request_frame(method, params, deadline)
+        self.calls += 1
+        try:
+            conn = await self._pool.acquire(deadline.clamp(self.timeout))
+        except ConnectionError as e:
+            self.failures += 1
+            raise SidecarUnavailableError(f"Aggregation sidecar at {self.path} is unavailable: {e}")
+
+        try:
+            response = await asyncio.wait_for(self._exchange(conn, frame), deadline.clamp(self.timeout))
+        except asyncio.TimeoutError:
+            self._pool.discard(conn)
+            raise TimeoutError(f"Timed out waiting for the aggregation sidecar ({method})")
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            self._pool.discard(conn)
+            self.failures += 1
+            raise SidecarUnavailableError(f"Aggregation sidecar at {self.path} failed during {method}: {e}")
+        except BaseException:
+            self._pool.discard(conn)
+            raise
+        self._pool.release(conn)
+        return _result(response)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "calls": self.calls, "failures": self.failures, **self._pool.stats()}
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    async def _connect(self, timeout: Optional[float] = None) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_unix_connection(self.path, limit=MessageFraming.MAX_MESSAGE_SIZE),
+                timeout if timeout is not None else self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ConnectionError(f"Failed to connect to {self.path}: {e}")
+
+    async def _exchange(self, conn: AsyncPooledConnection, frame: bytes) -> Dict[str, Any]:
+        conn.writer.write(frame)
+        await conn.writer.drain()
+        header = await conn.reader.readexactly(MessageFraming.HEADER_SIZE)
+        flags, length = MessageFraming.parse_frame_header(header)
+        payload = await conn.reader.readexactly(length)
+        return json.loads(MessageFraming.decode_payload(flags, payload))
+
+
+def _request_frame(method: str, params: Dict[str, Any], deadline: Deadline) -> bytes:
+    request = {"method": method, "params": params, "timeout": deadline.remaining()}
+    return MessageFraming.frame_message(json.dumps(request, default=str))
+
+
+def _read_response(conn: PooledConnection) -> Dict[str, Any]:
+    decoder = FrameDecoder()
+    decoder.read_frame(conn.sock)
+    return decoder.decode_json()
+
+
+def _result(response: Dict[str, Any]) -> Any:
+    error = response.get("error")
+    if error is None:
+        return response.get("result")
+    message = response.get("message") or error
+    if error == "CircuitOpenError":
+        raise exceptions.CircuitOpenError(message, response.get("retry_after") or 0.0)
+    if error not in _REMOTE_ERRORS:
+        raise SidecarUnavailableError(f"Aggregation sidecar failed: {error}: {message}")
+    raise _REMOTE_ERRORS[error](message)
@@ -0,0 +1,244 @@
+import heapq
+import math
+from collections import Counter
+from hashlib import blake2b
+from typing import Optional, Any, Dict, Iterable, List, Mapping, Tuple
+
+from data.timestamps import MIN_SECONDS
+
+
+DEFAULT_SKETCH_RANGE = 86400.0
+DEFAULT_TOP_ERROR = 0.01
+DEFAULT_DISTINCT_ERROR = 0.01
+SKETCH_PARTITIONS = 24
+
+_MIN_PRECISION = 4
+_MAX_PRECISION = 16
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Invalid space-saving capacity: {capacity}")
+        self.capacity = capacity
+        # key -> [estimate, error]; the true count lies in [estimate - error, estimate].
+        self._counters: Dict[Any, List[int]] = {}
+        self.total = 0
+
+    @classmethod
+    def from_error(cls, error: float) -> "SpaceSaving":
+        # Estimates overshoot by at most error * total.
+        if not 0 < error < 1:
+            raise ValueError(f"Invalid space-saving error: {error}")
+        return cls(math.ceil(1 / error))
+
+    @property
+    def floor(self) -> int:
+        # A key that isn't kept was seen at most this many times.
+        if len(self._counters) < self.capacity:
+            return 0
+        return min(counter[0] for counter in self._counters.values())
+
+    def update(self, counts: Mapping[Any, int]) -> None:
+        self._combine({key: (count, 0) for key, count in counts.items()}, 0, sum(counts.values()))
+
+    def merge(self, other: "SpaceSaving") -> None:
+        self._combine(other._counters, other.floor, other.total)
+
+    def _combine(self, counters: Mapping[Any, Any], other_floor: int, other_total: int) -> None:
+        # Mergeable space-saving: a key missing on one side may have been seen
+        # up to that side's floor times there.
+        floor = self.floor
+        merged: Dict[Any, List[int]] = {}
+        for key, (estimate, error) in self._counters.items():
+            other = counters.get(key)
+            if other is None:
+                merged[key] = [estimate + other_floor, error + other_floor]
+            else:
+                merged[key] = [estimate + other[0], error + other[1]]
+        for key, (estimate, error) in counters.items():
+            if key not in merged:
+                merged[key] = [estimate + floor, error + floor]
+
+        if len(merged) > self.capacity:
+            merged = dict(heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1][0]))
+        self._counters = merged
+        self.total += other_total
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[Any, int, int]]:
+        def rank(item: Tuple[Any, List[int]]) -> Tuple[int, int]:
+            return item[1][0], -item[1][1]
+
+        if limit is None:
+            entries = sorted(self._counters.items(), key=rank, reverse=True)
+        else:
+            entries = heapq.nlargest(limit, self._counters.items(), key=rank)
+        return [(key, estimate, error) for key, (estimate, error) in entries]
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = 14):
+        if not _MIN_PRECISION <= precision <= _MAX_PRECISION:
+            raise ValueError(f"Invalid HyperLogLog precision: {precision}")
+        self.precision = precision
+        self._registers = bytearray(1 << precision)
+
+    @classmethod
+    def from_error(cls, error: float) -> "HyperLogLog":
+        # Standard error is 1.04 / sqrt(registers).
+        if not 0 < error < 1:
+            raise ValueError(f"Invalid HyperLogLog error: {error}")
+        precision = math.ceil(math.log2((1.04 / error) ** 2))
+        return cls(min(max(precision, _MIN_PRECISION), _MAX_PRECISION))
+
+    def add(self, value: Any) -> None:
+        self.update((value,))
+
+    def update(self, values: Iterable[Any]) -> None:
+        registers = self._registers
+        bits = 64 - self.precision
+        mask = (1 << bits) - 1
+        for value in values:
+            # Not hash(): it is salted per process, and sketches from different
+            # workers must agree to be mergeable.
+            digest = int.from_bytes(blake2b(repr(value).encode(), digest_size=8).digest(), "big")
+            index = digest >> bits
+            rank = bits - (digest & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge HyperLogLog sketches of precision {self.precision} and {other.precision}"
+            )
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def estimate(self) -> int:
+        size = len(self._registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(size, 0.7213 / (1 + 1.079 / size))
+        raw = alpha * size * size / sum(2.0 ** -register for register in self._registers)
+        zeros = self._registers.count(0)
+        if raw <= 2.5 * size and zeros:
+            return round(size * math.log(size / zeros))
+        return round(raw)
+
+
+class _SketchPartition:
+    def __init__(self, top_error: float, distinct_error: float):
+        self.hosts = SpaceSaving.from_error(top_error)
+        self.users = SpaceSaving.from_error(top_error)
+        self.processes = SpaceSaving.from_error(top_error)
+        self.distinct_hosts = HyperLogLog.from_error(distinct_error)
+        self.distinct_users = HyperLogLog.from_error(distinct_error)
+        self.events = 0
+
+    def merge(self, other: "_SketchPartition") -> None:
+        self.hosts.merge(other.hosts)
+        self.users.merge(other.users)
+        self.processes.merge(other.processes)
+        self.distinct_hosts.merge(other.distinct_hosts)
+        self.distinct_users.merge(other.distinct_users)
+        self.events += other.events
+
+
+class _PendingCounts:
+    def __init__(self):
+        self.hosts: Counter = Counter()
+        self.users: Counter = Counter()
+        self.processes: Counter = Counter()
+        self.events = 0
+
+
+class DashboardSketches:
+    def __init__(
+        self,
+        range_seconds: float = DEFAULT_SKETCH_RANGE,
+        top_error: float = DEFAULT_TOP_ERROR,
+        distinct_error: float = DEFAULT_DISTINCT_ERROR
+    ):
+        if range_seconds <= 0:
+            raise ValueError(f"Invalid sketch range: {range_seconds}")
+        # Fails early on bad error bounds rather than on the first event.
+        _SketchPartition(top_error, distinct_error)
+
+        self.range_seconds = range_seconds
+        self.top_error = top_error
+        self.distinct_error = distinct_error
+        # Time partitions expire whole, so memory stays bounded by their count.
+        self.width = max(1, math.ceil(range_seconds / SKETCH_PARTITIONS))
+        self._partitions: Dict[int, _SketchPartition] = {}
+        self._pending: Dict[int, _PendingCounts] = {}
+        self.horizon: Optional[int] = None
+        self.newest: Optional[int] = None
+
+    def add_event(self, seconds: int, document: Dict[str, Any]) -> None:
+        if seconds == MIN_SECONDS:
+            return
+        start = seconds - seconds % self.width
+        if self.horizon is not None and start < self.horizon:
+            return
+
+        hostname = document.get("hostname", "unknown")
+        user = document.get("user")
+        process = document.get("process")
+        try:
+            hash((hostname, user, process))
+        except TypeError:
+            return
+
+        if self.newest is None or seconds > self.newest:
+            self.newest = seconds
+        pending = self._pending.get(start)
+        if pending is None:
+            pending = self._pending[start] = _PendingCounts()
+        pending.events += 1
+        pending.hosts[hostname] += 1
+        if user:
+            pending.users[user] += 1
+        if process:
+            pending.processes[process] += 1
+
+    def commit(self) -> None:
+        # Batches are counted exactly, then folded into the sketches once.
+        for start, pending in self._pending.items():
+            partition = self._partitions.get(start)
+            if partition is None:
+                partition = self._partitions[start] = _SketchPartition(self.top_error, self.distinct_error)
+            partition.hosts.update(pending.hosts)
+            partition.users.update(pending.users)
+            partition.processes.update(pending.processes)
+            partition.distinct_hosts.update(pending.hosts)
+            partition.distinct_users.update(pending.users)
+            partition.events += pending.events
+        self._pending = {}
+        self._prune()
+
+    def merge(self, other: "DashboardSketches") -> None:
+        if (other.width, other.top_error, other.distinct_error) != (self.width, self.top_error, self.distinct_error):
+            raise ValueError("Cannot merge dashboard sketches with different settings")
+        self.commit()
+        other.commit()
+        for start, partition in other._partitions.items():
+            mine = self._partitions.get(start)
+            if mine is None:
+                mine = self._partitions[start] = _SketchPartition(self.top_error, self.distinct_error)
+            mine.merge(partition)
+        if other.newest is not None and (self.newest is None or other.newest > self.newest):
+            self.newest = other.newest
+        self._prune()
+
+    def summary(self) -> _SketchPartition:
+        self.commit()
+        summary = _SketchPartition(self.top_error, self.distinct_error)
+        for partition in self._partitions.values():
+            summary.merge(partition)
+        return summary
+
+    def _prune(self) -> None:
+        if self.newest is None:
+            return
+        horizon = int(self.newest - self.range_seconds) + 1
+        self.horizon = horizon - horizon % self.width
+        for start in [start for start in self._partitions if start < self.horizon]:
+            del self._partitions[start]
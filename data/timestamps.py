@@ -0,0 +1,89 @@
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+_ISO_TIMESTAMP = re.compile(
+    r"(\d{4}-\d{2}-\d{2})([T ])(\d{2}):(\d{2}):(\d{2})(\.\d+)?(Z?)", re.ASCII
+)
+
+# Events cluster on few days, so the calendar math is done once per day.
+_DAY_SECONDS: Dict[str, Optional[int]] = {}
+_DAY_SECONDS_LIMIT = 65536
+
+
+def to_seconds(value: datetime) -> int:
+    return (value - EPOCH) // _SECOND
+
+
+def from_seconds(seconds: int) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+MIN_SECONDS = to_seconds(datetime.min)
+
+
+def parse_event_date(timestamp: str) -> datetime:
+    if not timestamp:
+        return datetime.min
+
+    for fmt in ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+        try:
+            return datetime.strptime(timestamp.split(".")[0].replace("Z", ""), fmt.replace("Z", ""))
+        except ValueError:
+            continue
+
+    return datetime.min
+
+
+def parse_day(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def timestamp_seconds(timestamp: Any) -> Tuple[int, Optional[str]]:
+    # Same result as parse_event_date, without strptime for the usual ISO shapes.
+    # The layout comes back when format_seconds can rebuild the exact text.
+    if not isinstance(timestamp, str):
+        return MIN_SECONDS, None
+
+    match = _ISO_TIMESTAMP.fullmatch(timestamp)
+    if match is None:
+        return to_seconds(parse_event_date(timestamp)), None
+
+    day, separator, hour, minute, second, fraction, zone = match.groups()
+    try:
+        day_start = _DAY_SECONDS[day]
+    except KeyError:
+        day_start = _day_seconds(day)
+    hour, minute, second = int(hour), int(minute), int(second)
+    if day_start is None or hour > 23 or minute > 59 or second > 59:
+        return MIN_SECONDS, None
+
+    seconds = day_start + hour * 3600 + minute * 60 + second
+    if fraction:
+        return seconds, None
+    return seconds, separator + zone
+
+
+def _day_seconds(day: str) -> Optional[int]:
+    try:
+        seconds: Optional[int] = to_seconds(datetime(int(day[:4]), int(day[5:7]), int(day[8:10])))
+    except ValueError:
+        seconds = None
+    if len(_DAY_SECONDS) >= _DAY_SECONDS_LIMIT:
+        _DAY_SECONDS.clear()
+    _DAY_SECONDS[day] = seconds
+    return seconds
+
+
+def format_seconds(seconds: int, layout: str) -> str:
+    return from_seconds(seconds).isoformat(layout[0]) + layout[1:]
+
+
+def event_seconds(timestamp: Any) -> int:
+    return timestamp_seconds(timestamp)[0]
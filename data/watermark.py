@@ -0,0 +1,51 @@
+from typing import Any, Dict, List, Set
+
+_MISSING = object()
+
+
+class Watermark:
+    # The highest _id loaded, so a refresh asks only for newer events. It moves
+    # only when a refresh completes: deltas come back in no particular _id
+    # order, so one cut short may have skipped ids below the highest it got.
+    # What it did load is kept, and skipped when the next refresh sends it again.
+    def __init__(self, value: Any = None, incremental: bool = True):
+        self.value = value
+        self.incremental = incremental
+        # Events added since the last completed refresh.
+        self.pending = 0
+        self._highest = value
+        self._loaded: List[Any] = []
+        self._resumed: Set[Any] = set()
+
+    def query(self) -> Dict[str, Any]:
+        if self.value is None:
+            return {}
+        return {"_id": {"$gt": self.value}}
+
+    def add(self, document: Dict[str, Any]) -> bool:
+        # False for an event an interrupted refresh already loaded.
+        event_id = document.get("_id", _MISSING)
+        if event_id is _MISSING:
+            # Without an _id there is no watermark to resume from.
+            self.incremental = False
+        elif event_id is not None:
+            try:
+                if event_id in self._resumed:
+                    return False
+                if self._highest is None or event_id > self._highest:
+                    self._highest = event_id
+                self._loaded.append(event_id)
+            except TypeError:
+                self.incremental = False
+        self.pending += 1
+        return True
+
+    def commit(self) -> None:
+        self.value = self._highest
+        self.pending = 0
+        self._loaded = []
+        self._resumed = set()
+
+    def abort(self) -> None:
+        self._resumed.update(self._loaded)
+        self._loaded = []
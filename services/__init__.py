@@ -1,7 +1,15 @@
 from .auth_service import AuthService
-from .event_service import EventService
+from .event_service import EventService, AsyncEventService
+from .dashboard_snapshot import DashboardSnapshotCache, AsyncDashboardSnapshotCache
+from .search_cache import SearchResultCache
+from .sidecar import SidecarServer
 
 __all__ = [
     "AuthService",
     "EventService",
+    "AsyncEventService",
+    "DashboardSnapshotCache",
+    "AsyncDashboardSnapshotCache",
+    "SearchResultCache",
+    "SidecarServer",
 ]
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from data.deadline import Deadline
+from data.singleflight import AsyncSingleFlight, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_DASHBOARD_CACHE_TTL = 5.0
+DEFAULT_DASHBOARD_CACHE_MAX_STALENESS = 60.0
+DEFAULT_DASHBOARD_REFRESH_TIMEOUT = 30.0
+
+_SNAPSHOT_KEY = "dashboard-snapshot"
+
+DashboardData = Dict[str, Any]
+
+
+class _SnapshotState:
+    def __init__(self, ttl: float, max_staleness: float, refresh_timeout: float, clock: Callable[[], float]):
+        if ttl < 0 or max_staleness < ttl:
+            raise ValueError(f"Invalid dashboard cache staleness: ttl={ttl}, max_staleness={max_staleness}")
+        if refresh_timeout <= 0:
+            raise ValueError(f"Invalid dashboard refresh timeout: {refresh_timeout}")
+
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self.refresh_timeout = refresh_timeout
+        self._clock = clock
+
+        self._snapshot: Optional[DashboardData] = None
+        self._taken_at: Optional[float] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.loads = 0
+
+    def age(self) -> Optional[float]:
+        if self._taken_at is None:
+            return None
+        return self._clock() - self._taken_at
+
+    def lookup(self) -> Tuple[Optional[DashboardData], bool]:
+        # Returns the snapshot still worth serving, and whether it is due for a refresh.
+        age = self.age()
+        if age is None or age > self.max_staleness:
+            return None, True
+        if age < self.ttl:
+            self.hits += 1
+            return self._snapshot, False
+        self.stale_hits += 1
+        return self._snapshot, True
+
+    def store(self, data: DashboardData) -> DashboardData:
+        self.loads += 1
+        # An error result is served once but never cached; the last good snapshot stays.
+        if "error" not in data:
+            self._snapshot = data
+            self._taken_at = self._clock()
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "age": self.age(),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "loads": self.loads,
+        }
+
+
+class DashboardSnapshotCache:
+    def __init__(
+        self,
+        ttl: float = DEFAULT_DASHBOARD_CACHE_TTL,
+        max_staleness: float = DEFAULT_DASHBOARD_CACHE_MAX_STALENESS,
+        refresh_timeout: float = DEFAULT_DASHBOARD_REFRESH_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._state = _SnapshotState(ttl, max_staleness, refresh_timeout, clock)
+        self._flight: SingleFlight[DashboardData] = SingleFlight()
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(
+        self,
+        load: Callable[[Optional[Deadline]], DashboardData],
+        deadline: Optional[Deadline] = None
+    ) -> DashboardData:
+        with self._lock:
+            snapshot, due = self._state.lookup()
+            revalidate = snapshot is not None and due and not self._refreshing
+            if revalidate:
+                self._refreshing = True
+
+        if snapshot is None:
+            return self._load(load, deadline)
+        if revalidate:
+            threading.Thread(
+                target=self._revalidate, args=(load,), name="dashboard-snapshot-refresh", daemon=True
+            ).start()
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._state.stats(), **self._flight.stats()}
+
+    def _load(self, load: Callable[[Optional[Deadline]], DashboardData], deadline: Optional[Deadline]) -> DashboardData:
+        def refresh() -> DashboardData:
+            data = load(deadline)
+            with self._lock:
+                return self._state.store(data)
+
+        timeout = deadline.remaining() if deadline is not None else None
+        return self._flight.do(_SNAPSHOT_KEY, refresh, timeout)
+
+    def _revalidate(self, load: Callable[[Optional[Deadline]], DashboardData]) -> None:
+        try:
+            # Runs after the request that started it has returned, so it gets its own deadline.
+            self._load(load, Deadline(self._state.refresh_timeout))
+        except Exception as e:
+            logger.warning(f"Dashboard snapshot refresh failed, serving the previous snapshot: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+class AsyncDashboardSnapshotCache:
+    def __init__(
+        self,
+        ttl: float = DEFAULT_DASHBOARD_CACHE_TTL,
+        max_staleness: float = DEFAULT_DASHBOARD_CACHE_MAX_STALENESS,
+        refresh_timeout: float = DEFAULT_DASHBOARD_REFRESH_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._state = _SnapshotState(ttl, max_staleness, refresh_timeout, clock)
+        self._flight: AsyncSingleFlight[DashboardData] = AsyncSingleFlight()
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def get(
+        self,
+        load: Callable[[Optional[Deadline]], Awaitable[DashboardData]],
+        deadline: Optional[Deadline] = None
+    ) -> DashboardData:
+        snapshot, due = self._state.lookup()
+        if snapshot is None:
+            return await self._load(load, deadline)
+        if due and self._refresh is None:
+            self._refresh = asyncio.get_running_loop().create_task(self._revalidate(load))
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._state.stats(), **self._flight.stats()}
+
+    async def _load(
+        self,
+        load: Callable[[Optional[Deadline]], Awaitable[DashboardData]],
+        deadline: Optional[Deadline]
+    ) -> DashboardData:
+        async def refresh() -> DashboardData:
+            return self._state.store(await load(deadline))
+
+        timeout = deadline.remaining() if deadline is not None else None
+        return await self._flight.do(_SNAPSHOT_KEY, refresh, timeout)
+
+    async def _revalidate(self, load: Callable[[Optional[Deadline]], Awaitable[DashboardData]]) -> None:
+        try:
+            # Runs after the request that started it has returned, so it gets its own deadline.
+            await self._load(load, Deadline(self._state.refresh_timeout))
+        except Exception as e:
+            logger.warning(f"Dashboard snapshot refresh failed, serving the previous snapshot: {e}")
+        finally:
+            self._refresh = None
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import logging
+import zlib
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("json", "csv", "ndjson")
+
+EXPORT_MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+SECURITY_EVENT_FIELDS = [
+    "_id", "timestamp", "hostname", "source", "event_type",
+    "severity", "user", "process", "command", "raw_log"
+]
+
+# gzip header and trailer around the deflate stream.
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+class ExportEncoder:
+    # Turns batches of events into the export file piece by piece: the output of
+    # every encode call, then finish, concatenated is the whole file.
+    def __init__(self, format: str, compress: bool = False):
+        format = format.lower()
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid export format: {format}. Supported formats: {', '.join(EXPORT_FORMATS)}")
+        self.format = format
+        self.events = 0
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, _GZIP_WBITS) if compress else None
+        self._csv_buffer = io.StringIO()
+        self._csv_writer = csv.writer(self._csv_buffer)
+        self._csv_header = format == "csv"
+
+    def encode(self, events: List[Dict[str, Any]]) -> bytes:
+        started = self.events > 0
+        self.events += len(events)
+        if self.format == "csv":
+            text = self._csv(events)
+        elif not events:
+            text = ""
+        elif self.format == "ndjson":
+            text = "\n".join(json.dumps(event, default=str) for event in events) + "\n"
+        else:
+            # The same text json.dumps(all_events, indent=2) gives, one batch at a time.
+            text = ("[\n" if not started else ",\n") + json.dumps(events, indent=2, default=str)[2:-2]
+        return self._bytes(text)
+
+    def finish(self) -> bytes:
+        if self.format == "csv":
+            text = self._csv([])
+        elif self.format == "json":
+            text = "\n]" if self.events else "[]"
+        else:
+            text = ""
+        data = self._bytes(text)
+        if self._compressor is not None:
+            data += self._compressor.flush()
+        return data
+
+    def _csv(self, events: List[Dict[str, Any]]) -> str:
+        if self._csv_header:
+            self._csv_writer.writerow(SECURITY_EVENT_FIELDS)
+            self._csv_header = False
+        self._csv_writer.writerows(_csv_row(event) for event in events)
+        text = self._csv_buffer.getvalue()
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+        return text
+
+    def _bytes(self, text: str) -> bytes:
+        data = text.encode("utf-8")
+        if self._compressor is not None and data:
+            return self._compressor.compress(data)
+        return data
+
+
+def export_chunks(batches: Iterable[List[Dict[str, Any]]], format: str, compress: bool = False) -> Iterator[bytes]:
+    encoder = ExportEncoder(format, compress)
+    try:
+        for events in batches:
+            chunk = encoder.encode(events)
+            if chunk:
+                yield chunk
+    except Exception as e:
+        logger.error(f"Export stopped after {encoder.events} events: {type(e).__name__}: {e}")
+        raise
+    yield encoder.finish()
+
+
+async def async_export_chunks(
+    batches: AsyncIterable[List[Dict[str, Any]]],
+    format: str,
+    compress: bool = False
+) -> AsyncIterator[bytes]:
+    encoder = ExportEncoder(format, compress)
+    try:
+        async for events in batches:
+            chunk = encoder.encode(events)
+            if chunk:
+                yield chunk
+    except Exception as e:
+        logger.error(f"Export stopped after {encoder.events} events: {type(e).__name__}: {e}")
+        raise
+    yield encoder.finish()
+
+
+def _csv_row(event: Dict[str, Any]) -> List[Any]:
+    row = []
+    for field in SECURITY_EVENT_FIELDS:
+        value = event.get(field)
+        row.append("" if value is None else value)
+    return row
@@ -1,68 +1,101 @@
-import json
-import csv
-import io
+import asyncio
 import logging
-from typing import Optional, Any, Dict, List
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional, Any, AsyncIterator, Dict, Iterator, List, Tuple
 
-from data.repository import EventRepository, _aggregate_dashboard_data, _empty_dashboard_data
+from data.deadline import Deadline
+from data.cursor import EventCursor
+from data.dashboard import _empty_dashboard_data
+from data.repository import EventRepository, AsyncEventRepository
+from data.rollups import TimelineQuery
+from data.search_results import SearchResults
+from data.sidecar_client import AsyncSidecarClient, SidecarClient, SidecarUnavailableError
+from data.timestamps import MIN_SECONDS, event_seconds
+from services.dashboard_snapshot import DashboardSnapshotCache, AsyncDashboardSnapshotCache
+from services.event_export import EXPORT_FORMATS, async_export_chunks, export_chunks
+from services.search_cache import SearchResultCache
 
 logger = logging.getLogger(__name__)
 
-SECURITY_EVENT_FIELDS = [
-    "_id", "timestamp", "hostname", "source", "event_type",
-    "severity", "user", "process", "command", "raw_log"
-]
-
 class EventService:
-    def __init__(self, repository: EventRepository):
+    def __init__(
+        self,
+        repository: EventRepository,
+        snapshots: Optional[DashboardSnapshotCache] = None,
+        results: Optional[SearchResultCache] = None,
+        sidecar: Optional[SidecarClient] = None
+    ):
         self.repository = repository
+        self.snapshots = snapshots
+        self.results = results
+        # Searches, dashboards and timelines come from the sidecar while it's reachable.
+        self.sidecar = sidecar
     
     def search(
         self,
         filters: Optional[Dict[str, Any]] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        deadline: Optional[Deadline] = None,
+        after: Optional[str] = None,
+        include_total: bool = False
     ) -> Dict[str, Any]:
-        page = max(1, page)
-        page_size = min(max(1, page_size), 100)
+        page, page_size = _page_bounds(page, page_size)
+        if self.sidecar is not None:
+            try:
+                return self.sidecar.search(filters, page, page_size, deadline, after, include_total)
+            except SidecarUnavailableError as e:
+                logger.warning(f"{e}; querying database")
         
-        filters = filters or {}
+        if after is not None:
+            # Keyset paging: "" asks for the first page, otherwise a next_cursor from the last one.
+            total, events, next_cursor = self.repository.find_after(
+                **_filter_kwargs(filters),
+                deadline=deadline,
+                after=EventCursor.decode(after) if after else None,
+                limit=page_size,
+                count=include_total
+            )
+            return _cursor_page(events, total, page_size, next_cursor)
         
-        filtered_events = self.repository.find_filtered(
-            query=filters.get("query"),
-            hostname=filters.get("hostname"),
-            start_date=filters.get("start_date"),
-            end_date=filters.get("end_date"),
-            severity=filters.get("severity"),
-            event_type=filters.get("event_type")
-        )
+        if self.results is not None:
+            results = self._search_results(filters, deadline)
+            events = results.page((page - 1) * page_size, page_size)
+            # None if the event cache moved on since the results were taken.
+            if events is not None:
+                return _paginate_events(events, results.total, page, page_size)
         
-        filtered_events.sort(
-            key=lambda e: e.get("timestamp", ""),
-            reverse=True
+        total, events = self.repository.find_page(
+            **_filter_kwargs(filters), deadline=deadline, offset=(page - 1) * page_size, limit=page_size
         )
-        
-        total = len(filtered_events)
-        total_pages = (total + page_size - 1) // page_size if page_size > 0 else 0
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        
-        paginated_events = filtered_events[start_idx:end_idx]
-        
-        logger.debug(f"Search returned {total} events, showing page {page}/{total_pages}")
-        
-        return {
-            "events": paginated_events,
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": total_pages
-        }
+        return _paginate_events(events, total, page, page_size)
+    
+    def _search_results(self, filters: Optional[Dict[str, Any]], deadline: Optional[Deadline]) -> SearchResults:
+        kwargs = _filter_kwargs(filters)
+        key = self.repository.search_key(**kwargs)
+        results = self.results.get(key, self.repository.results_version(deadline))
+        if results is None:
+            results = self.repository.search_results(**kwargs, deadline=deadline)
+            self.results.put(key, results)
+        return results
     
-    def get_dashboard_data(self) -> Dict[str, Any]:
+    def get_dashboard_data(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        if self.snapshots is None:
+            return self._load_dashboard_data(deadline)
         try:
-            events = self.repository.find_for_dashboard()
-            return _aggregate_dashboard_data(events)
+            return self.snapshots.get(self._load_dashboard_data, deadline)
+        except FutureTimeoutError:
+            logger.warning("Timed out waiting for the dashboard snapshot refresh")
+            return _empty_dashboard_data(error="Dashboard data refresh timed out")
+    
+    def _load_dashboard_data(self, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        try:
+            if self.sidecar is not None:
+                try:
+                    return self.sidecar.dashboard(deadline)
+                except SidecarUnavailableError as e:
+                    logger.warning(f"{e}; querying database")
+            return self.repository.dashboard_data(deadline)
         except Exception as e:
             logger.error(
                 f"Failed to retrieve dashboard data: {type(e).__name__}: {e}",
@@ -70,54 +103,266 @@ class EventService:
             )
             return _empty_dashboard_data(error=str(e))
     
+    def get_timeline(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        resolution: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        query = _timeline_query(filters, resolution)
+        if self.sidecar is not None:
+            try:
+                return self.sidecar.timeline(filters, resolution, deadline)
+            except SidecarUnavailableError as e:
+                logger.warning(f"{e}; querying database")
+        return self.repository.timeline(query, deadline)
+    
     def export(
         self,
         filters: Optional[Dict[str, Any]] = None,
-        format: str = "json"
-    ) -> str:
-        if format.lower() not in ("json", "csv"):
-            raise ValueError(f"Invalid export format: {format}. Supported formats: json, csv")
+        format: str = "json",
+        deadline: Optional[Deadline] = None,
+        compress: bool = False
+    ) -> Iterator[bytes]:
+        format = _validate_export_format(format)
+        batches = self.repository.iter_filtered(**_filter_kwargs(filters), deadline=deadline)
+        # The first batch is read before anything is sent, so a bad query or an
+        # unreachable database still fails the request instead of cutting off the file.
+        try:
+            first = next(batches, [])
+        except BaseException:
+            batches.close()
+            raise
+        return export_chunks(_resumed(first, batches), format, compress)
+
+
+class AsyncEventService:
+    def __init__(
+        self,
+        repository: AsyncEventRepository,
+        snapshots: Optional[AsyncDashboardSnapshotCache] = None,
+        results: Optional[SearchResultCache] = None,
+        sidecar: Optional[AsyncSidecarClient] = None
+    ):
+        self.repository = repository
+        self.snapshots = snapshots
+        self.results = results
+        self.sidecar = sidecar
+    
+    async def search(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        page: int = 1,
+        page_size: int = 50,
+        deadline: Optional[Deadline] = None,
+        after: Optional[str] = None,
+        include_total: bool = False
+    ) -> Dict[str, Any]:
+        page, page_size = _page_bounds(page, page_size)
+        if self.sidecar is not None:
+            try:
+                return await self.sidecar.search(filters, page, page_size, deadline, after, include_total)
+            except SidecarUnavailableError as e:
+                logger.warning(f"{e}; querying database")
         
-        filters = filters or {}
+        if after is not None:
+            # Keyset paging: "" asks for the first page, otherwise a next_cursor from the last one.
+            total, events, next_cursor = await self.repository.find_after(
+                **_filter_kwargs(filters),
+                deadline=deadline,
+                after=EventCursor.decode(after) if after else None,
+                limit=page_size,
+                count=include_total
+            )
+            return _cursor_page(events, total, page_size, next_cursor)
         
-        filtered_events = self.repository.find_filtered(
-            query=filters.get("query"),
-            hostname=filters.get("hostname"),
-            start_date=filters.get("start_date"),
-            end_date=filters.get("end_date"),
-            severity=filters.get("severity"),
-            event_type=filters.get("event_type")
-        )
+        if self.results is not None:
+            results = await self._search_results(filters, deadline)
+            events = results.page((page - 1) * page_size, page_size)
+            # None if the event cache moved on since the results were taken.
+            if events is not None:
+                return _paginate_events(events, results.total, page, page_size)
         
-        filtered_events.sort(
-            key=lambda e: e.get("timestamp", ""),
-            reverse=True
+        total, events = await self.repository.find_page(
+            **_filter_kwargs(filters), deadline=deadline, offset=(page - 1) * page_size, limit=page_size
         )
-        
-        logger.debug(f"Exporting {len(filtered_events)} events in {format} format")
-        
-        if format.lower() == "csv":
-            return format_events_as_csv(filtered_events)
-        else:
-            return format_events_as_json(filtered_events)
+        return _paginate_events(events, total, page, page_size)
+    
+    async def _search_results(
+        self,
+        filters: Optional[Dict[str, Any]],
+        deadline: Optional[Deadline]
+    ) -> SearchResults:
+        kwargs = _filter_kwargs(filters)
+        key = self.repository.search_key(**kwargs)
+        results = self.results.get(key, await self.repository.results_version(deadline))
+        if results is None:
+            results = await self.repository.search_results(**kwargs, deadline=deadline)
+            self.results.put(key, results)
+        return results
+    
+    async def get_dashboard_data(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        if self.snapshots is None:
+            return await self._load_dashboard_data(deadline)
+        try:
+            return await self.snapshots.get(self._load_dashboard_data, deadline)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out waiting for the dashboard snapshot refresh")
+            return _empty_dashboard_data(error="Dashboard data refresh timed out")
+    
+    async def _load_dashboard_data(self, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        try:
+            if self.sidecar is not None:
+                try:
+                    return await self.sidecar.dashboard(deadline)
+                except SidecarUnavailableError as e:
+                    logger.warning(f"{e}; querying database")
+            return await self.repository.dashboard_data(deadline)
+        except Exception as e:
+            logger.error(
+                f"Failed to retrieve dashboard data: {type(e).__name__}: {e}",
+                exc_info=True
+            )
+            return _empty_dashboard_data(error=str(e))
+    
+    async def get_timeline(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        resolution: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        query = _timeline_query(filters, resolution)
+        if self.sidecar is not None:
+            try:
+                return await self.sidecar.timeline(filters, resolution, deadline)
+            except SidecarUnavailableError as e:
+                logger.warning(f"{e}; querying database")
+        return await self.repository.timeline(query, deadline)
+    
+    async def export(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        format: str = "json",
+        deadline: Optional[Deadline] = None,
+        compress: bool = False
+    ) -> AsyncIterator[bytes]:
+        format = _validate_export_format(format)
+        batches = self.repository.iter_filtered(**_filter_kwargs(filters), deadline=deadline)
+        try:
+            first = await batches.__anext__()
+        except StopAsyncIteration:
+            first = []
+        except BaseException:
+            await batches.aclose()
+            raise
+        return async_export_chunks(_async_resumed(first, batches), format, compress)
 
 
-def format_events_as_json(events: List[Dict[str, Any]]) -> str:
-    return json.dumps(events, indent=2, default=str)
+def _filter_kwargs(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    filters = filters or {}
+    return {
+        "query": filters.get("query"),
+        "hostname": filters.get("hostname"),
+        "start_date": filters.get("start_date"),
+        "end_date": filters.get("end_date"),
+        "severity": filters.get("severity"),
+        "event_type": filters.get("event_type"),
+        "search": filters.get("q"),
+    }
 
 
-def format_events_as_csv(events: List[Dict[str, Any]]) -> str:
-    output = io.StringIO()
-    writer = csv.DictWriter(
-        output,
-        fieldnames=SECURITY_EVENT_FIELDS,
-        extrasaction='ignore'
+def _timeline_query(filters: Optional[Dict[str, Any]], resolution: Optional[str]) -> TimelineQuery:
+    filters = filters or {}
+    return TimelineQuery(
+        start=_timeline_bound(filters.get("start"), "start"),
+        end=_timeline_bound(filters.get("end"), "end"),
+        resolution=resolution or None,
+        severity=filters.get("severity") or None,
+        event_type=filters.get("event_type") or None,
+        hostname=filters.get("hostname") or None,
     )
-    writer.writeheader()
+
+
+def _timeline_bound(value: Optional[str], name: str) -> Optional[int]:
+    if not value:
+        return None
+    seconds = event_seconds(value)
+    if seconds == MIN_SECONDS:
+        raise ValueError(f"Invalid timeline {name}: {value!r}")
+    # A bare end date covers the whole day, as in the search filters.
+    if name == "end" and len(value) == len("YYYY-MM-DD"):
+        seconds += 86399
+    return seconds
+
+
+def _page_bounds(page: int, page_size: int) -> Tuple[int, int]:
+    return max(1, page), min(max(1, page_size), 100)
+
+
+def _paginate_events(
+    paginated_events: List[Dict[str, Any]],
+    total: int,
+    page: int,
+    page_size: int
+) -> Dict[str, Any]:
+    total_pages = (total + page_size - 1) // page_size if page_size > 0 else 0
     
-    for event in events:
-        row = {field: event.get(field, "") for field in SECURITY_EVENT_FIELDS}
-        row = {k: (v if v is not None else "") for k, v in row.items()}
-        writer.writerow(row)
+    logger.debug(f"Search returned {total} events, showing page {page}/{total_pages}")
     
-    return output.getvalue()
\ No newline at end of file
+    return {
+        "events": paginated_events,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages
+    }
+
+
+def _cursor_page(
+    events: List[Dict[str, Any]],
+    total: Optional[int],
+    page_size: int,
+    next_cursor: Optional[EventCursor]
+) -> Dict[str, Any]:
+    logger.debug(f"Search returned a page of {len(events)} events, more: {next_cursor is not None}")
+    
+    return {
+        "events": events,
+        "total": total,
+        "page_size": page_size,
+        "next_cursor": next_cursor.encode() if next_cursor is not None else None
+    }
+
+
+def _validate_export_format(format: str) -> str:
+    if format.lower() not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format: {format}. Supported formats: {', '.join(EXPORT_FORMATS)}")
+    return format.lower()
+
+
+def _resumed(first: List[Dict[str, Any]], batches: Iterator[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+    try:
+        yield first
+        yield from batches
+    finally:
+        batches.close()
+
+
+async def _async_resumed(
+    first: List[Dict[str, Any]],
+    batches: AsyncIterator[List[Dict[str, Any]]]
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    try:
+        yield first
+        async for events in batches:
+            yield events
+    finally:
+        await batches.aclose()
+
+
+def format_events_as_json(events: List[Dict[str, Any]]) -> str:
+    return b"".join(export_chunks([events], "json")).decode("utf-8")
+
+
+def format_events_as_csv(events: List[Dict[str, Any]]) -> str:
+    return b"".join(export_chunks([events], "csv")).decode("utf-8")
\ No newline at end of file
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from data.search_results import SearchResults
+
+
+DEFAULT_SEARCH_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SEARCH_CACHE_TTL = 30.0
+
+
+class SearchResultCache:
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_SEARCH_CACHE_MAX_BYTES,
+        ttl: float = DEFAULT_SEARCH_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if max_bytes <= 0:
+            raise ValueError(f"Invalid search cache size: {max_bytes}")
+        if ttl <= 0:
+            raise ValueError(f"Invalid search cache TTL: {ttl}")
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+
+        # Least recently used first, each with the time it was stored.
+        self._entries: "OrderedDict[str, Tuple[SearchResults, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.oversized = 0
+
+    def get(self, key: str, version: Any) -> Optional[SearchResults]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            results, stored_at = entry
+            if results.version != version or self._clock() - stored_at >= self.ttl:
+                self._discard(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, key: str, results: SearchResults) -> None:
+        with self._lock:
+            self._discard(key)
+            # One result set bigger than the whole budget would only flush everything else.
+            if results.nbytes > self.max_bytes:
+                self.oversized += 1
+                return
+
+            self._entries[key] = (results, self._clock())
+            self.nbytes += results.nbytes
+            while self.nbytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "oversized": self.oversized,
+            }
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[0].nbytes
@@ -0,0 +1,156 @@
+import json
+import logging
+import os
+import socket
+import stat
+import threading
+from typing import Any, Dict, Optional
+
+from core.message_framing import FrameDecoder, MessageFraming
+from data.deadline import Deadline
+from data.exceptions import DatabaseError
+from services.event_service import EventService
+
+logger = logging.getLogger(__name__)
+
+
+class SidecarServer:
+    # One process per host owns the event cache, the dashboard aggregator and the
+    # database polling; web workers ask it for search pages, dashboards and
+    # timelines over a Unix socket instead of each keeping their own.
+    def __init__(self, service: EventService, path: str):
+        if not path:
+            raise ValueError("Sidecar socket path is required")
+        self.service = service
+        self.path = path
+        self.connections_accepted = 0
+        self.requests = 0
+        self.errors = 0
+        self._listener: Optional[socket.socket] = None
+        self._accept_thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def start(self) -> None:
+        _remove_stale_socket(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.path)
+            os.chmod(self.path, 0o600)
+            listener.listen(128)
+        except OSError:
+            listener.close()
+            raise
+        self._listener = listener
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="sidecar-accept", daemon=True)
+        self._accept_thread.start()
+        logger.info(f"Aggregation sidecar listening on {self.path}")
+
+    def serve_forever(self) -> None:
+        if self._listener is None:
+            self.start()
+        try:
+            self._stopped.wait()
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+            self._listener = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self._accept_thread is not None:
+            self._accept_thread.join(timeout=1.0)
+            self._accept_thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections_accepted": self.connections_accepted,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+    def _accept_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                break
+            self.connections_accepted += 1
+            threading.Thread(target=self._serve_connection, args=(conn,), name="sidecar-conn", daemon=True).start()
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        decoder = FrameDecoder()
+        try:
+            while not self._stopped.is_set():
+                try:
+                    decoder.read_frame(conn)
+                except ConnectionResetError:
+                    break
+                if decoder.flags:
+                    raise ValueError(f"Unexpected frame flags {decoder.flags:#x}")
+                response = self._dispatch(decoder.decode_json())
+                conn.sendall(MessageFraming.frame_message(json.dumps(response, default=str)))
+        except Exception as e:
+            if not self._stopped.is_set():
+                logger.debug(f"Sidecar connection closed: {e}")
+        finally:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.requests += 1
+        method = request.get("method")
+        params = request.get("params") or {}
+        timeout = request.get("timeout")
+        deadline = Deadline(timeout) if timeout is not None else None
+        try:
+            if method == "search":
+                result = self.service.search(**params, deadline=deadline)
+            elif method == "dashboard":
+                result = self.service.get_dashboard_data(deadline)
+            elif method == "timeline":
+                result = self.service.get_timeline(**params, deadline=deadline)
+            else:
+                raise ValueError(f"Unknown sidecar method: {method!r}")
+        except Exception as e:
+            self.errors += 1
+            if not isinstance(e, (ValueError, DatabaseError)):
+                logger.error(f"Sidecar {method} failed: {type(e).__name__}: {e}", exc_info=True)
+            return {"error": type(e).__name__, "message": str(e), "retry_after": getattr(e, "retry_after", None)}
+        return {"result": result}
+
+
+def _remove_stale_socket(path: str) -> None:
+    # Left behind by a sidecar that didn't shut down cleanly; a live one, or
+    # anything that isn't a socket, is left alone and binding fails.
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise OSError(f"An aggregation sidecar is already listening on {path}")
+    finally:
+        probe.close()
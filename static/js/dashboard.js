@@ -2,47 +2,40 @@ const DashboardController = {
     charts: {},
     widgetStates: {},
     abortController: null,
+    bundleEndpoint: '/api/dashboard',
     
     widgets: {
         'active-agents': { 
-            endpoint: '/api/dashboard/active-agents', 
             containerId: 'active-agents-content', 
             renderer: 'renderActiveAgents' 
         },
         'recent-logins': { 
-            endpoint: '/api/dashboard/recent-logins', 
             containerId: 'recent-logins-content', 
             renderer: 'renderRecentLogins' 
         },
         'host-list': { 
-            endpoint: '/api/dashboard/hosts', 
             containerId: 'host-list-content', 
             renderer: 'renderHostList' 
         },
         'events-by-type': { 
-            endpoint: '/api/dashboard/events-by-type', 
             containerId: 'events-by-type-content', 
             isChart: true, 
             renderer: 'renderEventsByType' 
         },
         'events-by-severity': { 
-            endpoint: '/api/dashboard/events-by-severity', 
             containerId: 'events-by-severity-content', 
             isChart: true, 
             renderer: 'renderEventsBySeverity' 
         },
         'top-users': { 
-            endpoint: '/api/dashboard/top-users', 
             containerId: 'top-users-content', 
             renderer: 'renderTopUsers' 
         },
         'top-processes': { 
-            endpoint: '/api/dashboard/top-processes', 
             containerId: 'top-processes-content', 
             renderer: 'renderTopProcesses' 
         },
         'event-timeline': { 
-            endpoint: '/api/dashboard/timeline', 
             containerId: 'event-timeline-content', 
             isChart: true, 
             renderer: 'renderEventTimeline' 
@@ -133,42 +126,54 @@ const DashboardController = {
             }
         });
         
-        await Promise.allSettled(
-            Object.keys(this.widgets).map(name => this.refreshWidget(name))
-        );
+        try {
+            const data = await this.fetchBundle();
+            Object.keys(this.widgets).forEach(name => this.renderWidget(name, data));
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.error('Ошибка загрузки панели:', error);
+                Object.keys(this.widgets).forEach(name => this.renderWidget(name, { error: error.message }));
+            }
+        }
+    },
+
+    async fetchBundle() {
+        const response = await apiRequest(this.bundleEndpoint, { 
+            signal: this.abortController?.signal 
+        });
+        
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
     },
 
     async refreshWidget(widgetName) {
-        const widget = this.widgets[widgetName];
-        if (!widget) return;
+        if (!this.widgets[widgetName]) return;
         
-        const container = document.getElementById(widget.containerId);
         try {
-            const response = await apiRequest(widget.endpoint, { 
-                signal: this.abortController?.signal 
-            });
-            
-            if (!response.ok) throw new Error(`HTTP ${response.status}`);
-            
-            const data = await response.json();
-            if (data.error) return this.setWidgetError(widgetName, container, data.error);
-            
-            this[widget.renderer]?.(data, container);
-            this.widgetStates[widgetName] = { status: 'ok' };
-            
-            const card = document.querySelector(`[data-widget="${widgetName}"]`);
-            if (card) {
-                card.classList.remove('widget-error');
-                card.querySelector('.error-dot')?.remove();
-            }
+            this.renderWidget(widgetName, await this.fetchBundle());
         } catch (error) {
             if (error.name !== 'AbortError') {
                 console.error(`Ошибка загрузки ${widgetName}:`, error);
-                this.setWidgetError(widgetName, container, error.message);
+                this.renderWidget(widgetName, { error: error.message });
             }
         }
     },
 
+    renderWidget(widgetName, data) {
+        const widget = this.widgets[widgetName];
+        const container = document.getElementById(widget.containerId);
+        if (data.error) return this.setWidgetError(widgetName, container, data.error);
+        
+        this[widget.renderer]?.(data, container);
+        this.widgetStates[widgetName] = { status: 'ok' };
+        
+        const card = document.querySelector(`[data-widget="${widgetName}"]`);
+        if (card) {
+            card.classList.remove('widget-error');
+            card.querySelector('.error-dot')?.remove();
+        }
+    },
+
     setWidgetError(widgetName, container, message) {
         this.widgetStates[widgetName] = { status: 'error', message };
         
@@ -5,6 +5,10 @@ let currentFilters = {};
 let currentEvents = [];
 let isLoading = false;
 
+// Sent as X-Request-Timeout so the server gives up no later than the browser does.
+const SEARCH_TIMEOUT_MS = 10000;
+const EXPORT_TIMEOUT_MS = 30000;
+
 document.addEventListener('DOMContentLoaded', function() {
     loadEvents();
     
@@ -17,8 +21,9 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    const searchInput = document.getElementById('search-query');
-    if (searchInput) {
+    ['search-query', 'search-q'].forEach(function(id) {
+        const searchInput = document.getElementById(id);
+        if (!searchInput) return;
         let searchTimeout = null;
         searchInput.addEventListener('input', function() {
             clearTimeout(searchTimeout);
@@ -27,7 +32,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 loadEvents();
             }, 500);
         });
-    }
+    });
     
     const clearFiltersBtn = document.getElementById('clear-filters');
     if (clearFiltersBtn) {
@@ -84,6 +89,7 @@ document.addEventListener('DOMContentLoaded', function() {
 function getFilters() {
     return {
         query: document.getElementById('search-query')?.value || undefined,
+        q: document.getElementById('search-q')?.value || undefined,
         hostname: document.getElementById('search-hostname')?.value || undefined,
         start_date: document.getElementById('search-start-date')?.value || undefined,
         end_date: document.getElementById('search-end-date')?.value || undefined,
@@ -121,13 +127,14 @@ async function loadEvents() {
     });
     
     const controller = new AbortController();
-    const timeoutId = setTimeout(() => controller.abort(), 10000);
+    const timeoutId = setTimeout(() => controller.abort(), SEARCH_TIMEOUT_MS);
     
     try {
         const response = await fetch(`/api/events?${params.toString()}`, {
             credentials: 'include',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'X-Request-Timeout': String(SEARCH_TIMEOUT_MS / 1000)
             },
             signal: controller.signal
         });
@@ -162,6 +169,21 @@ async function loadEvents() {
             return;
         }
         
+        if (response.status === 400) {
+            const error = await response.json().catch(() => ({}));
+            if (tbody) {
+                tbody.innerHTML = `
+                    <tr>
+                        <td colspan="7" class="text-center p-8 text-red-500">
+                            <strong>Некорректный запрос</strong><br>
+                            ${escapeHtml(error.detail || 'Проверьте синтаксис поискового запроса.')}
+                        </td>
+                    </tr>
+                `;
+            }
+            return;
+        }
+        
         if (!response.ok) {
             throw new Error(`HTTP ${response.status}: ${response.statusText}`);
         }
@@ -394,11 +416,14 @@ async function exportData(format) {
     params.append('format', format);
     
     const controller = new AbortController();
-    const timeoutId = setTimeout(() => controller.abort(), 30000);
+    const timeoutId = setTimeout(() => controller.abort(), EXPORT_TIMEOUT_MS);
     
     try {
         const response = await fetch(`/api/events/export?${params.toString()}`, {
             credentials: 'include',
+            headers: {
+                'X-Request-Timeout': String(EXPORT_TIMEOUT_MS / 1000)
+            },
             signal: controller.signal
         });
         
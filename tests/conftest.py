@@ -0,0 +1,63 @@
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from benchmarks.events import synthetic_events
+from data.async_client import AsyncDatabaseClient
+from data.client import DatabaseClient, DatabaseConfig
+from data.local_server import LocalDatabaseServer
+
+EVENTS = DatabaseClient.SECURITY_EVENTS_COLLECTION
+
+
+@pytest.fixture
+def make_events() -> Callable[..., List[Dict[str, Any]]]:
+    return synthetic_events
+
+
+@pytest.fixture
+def database_server():
+    servers: List[LocalDatabaseServer] = []
+
+    def start(events: List[Dict[str, Any]] = (), server_class=LocalDatabaseServer, **kwargs) -> LocalDatabaseServer:
+        server = server_class({EVENTS: list(events)}, **kwargs)
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def database_config():
+    def config(server: LocalDatabaseServer, **kwargs) -> DatabaseConfig:
+        kwargs.setdefault("timeout", 5.0)
+        kwargs.setdefault("retry_attempts", 1)
+        return DatabaseConfig(host=server.host, port=server.port, **kwargs)
+
+    return config
+
+
+@pytest.fixture
+def database_client(database_config):
+    clients: List[DatabaseClient] = []
+
+    def connect(server: LocalDatabaseServer, **kwargs) -> DatabaseClient:
+        client = DatabaseClient(database_config(server, **kwargs))
+        clients.append(client)
+        return client
+
+    yield connect
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def async_database_client(database_config):
+    # The caller closes it inside its own event loop.
+    def connect(server: LocalDatabaseServer, **kwargs) -> AsyncDatabaseClient:
+        return AsyncDatabaseClient(database_config(server, **kwargs))
+
+    return connect
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List
+
+from hypothesis import HealthCheck, given, settings, strategies as st
+
+from data.dashboard import DashboardAggregator, _aggregate_dashboard_data
+from data.repository import _latest_events
+
+_TIMESTAMP_FORMATS = [
+    "2024-01-0{d}T{h:02d}:{m:02d}:0{s}Z",
+    "2024-01-0{d} {h:02d}:{m:02d}:0{s}",
+    "2024-01-0{d}T{h:02d}:{m:02d}:0{s}.5Z",
+    "2024-01-0{d}",
+    "2024-01-0{d}T{h:02d}:{m:02d}",
+]
+
+# Few distinct values, so ties in counts and times are common.
+timestamps = st.one_of(
+    st.builds(
+        lambda d, h, m, s, fmt: fmt.format(d=d, h=h, m=m, s=s),
+        st.integers(1, 3), st.integers(0, 23), st.sampled_from([0, 29, 30, 59]), st.integers(0, 2),
+        st.sampled_from(_TIMESTAMP_FORMATS)
+    ),
+    st.just("garbage"),
+    st.just(""),
+)
+
+events = st.fixed_dictionaries({}, optional={
+    "timestamp": timestamps,
+    "hostname": st.sampled_from(["web1", "web2", "db1", "", None]),
+    "event_type": st.sampled_from([
+        "user_login", "authentication_failure", "ssh_connection", "process_start", "file_access", None
+    ]),
+    "severity": st.sampled_from(["low", "high", "critical", None]),
+    "user": st.sampled_from(["root", "alice", "", None]),
+    "process": st.sampled_from(["sshd", "bash", "", None]),
+    "source": st.sampled_from(["syslog", "auditd"]),
+    "agent_last_seen": st.sampled_from(["2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z", "2024-01-03"]),
+})
+
+batches = st.lists(st.lists(events, max_size=12), max_size=8)
+
+
+def _expected(seen: List[Dict[str, Any]], window: int) -> Dict[str, Any]:
+    return _aggregate_dashboard_data(_latest_events(seen, window))
+
+
+def _numbered(batch: List[Dict[str, Any]], seen: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    documents = []
+    for event in batch:
+        document = dict(event, _id=len(seen))
+        seen.append(document)
+        documents.append(document)
+    return documents
+
+
+@settings(max_examples=500, deadline=None, suppress_health_check=list(HealthCheck))
+@given(batches, st.integers(1, 15), st.booleans())
+def test_snapshot_matches_aggregating_the_latest_events(event_batches, window, snapshot_between):
+    aggregator = DashboardAggregator(window)
+    seen: List[Dict[str, Any]] = []
+    for batch in event_batches:
+        aggregator.add(_numbered(batch, seen))
+        if snapshot_between:
+            assert aggregator.snapshot() == _expected(seen, window)
+    aggregator.complete_refresh()
+
+    assert aggregator.snapshot() == _expected(seen, window)
+    assert aggregator.delta_query() == ({"_id": {"$gt": len(seen) - 1}} if seen else {})
+
+
+@settings(max_examples=200, deadline=None, suppress_health_check=list(HealthCheck))
+@given(batches, batches, st.integers(1, 15))
+def test_full_reload_replaces_the_window_on_completion(old_batches, new_batches, window):
+    aggregator = DashboardAggregator(window)
+    old: List[Dict[str, Any]] = []
+    for batch in old_batches:
+        aggregator.add(_numbered(batch, old))
+    aggregator.complete_refresh()
+
+    reload = aggregator.new_window()
+    new: List[Dict[str, Any]] = []
+    for batch in new_batches:
+        aggregator.add(_numbered(batch, new), reload)
+        # Readers keep the old window until the reload completes.
+        assert aggregator.snapshot() == _expected(old, window)
+    aggregator.complete_refresh(reload)
+
+    assert aggregator.snapshot() == _expected(new, window)
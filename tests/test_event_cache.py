@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from data.deadline import Deadline
+from data.event_cache import EventCache
+from data.exceptions import TimeoutError
+from data.parallel_filter import ParallelFilter
+from data.repository import AsyncEventRepository
+from data.search_query import SearchQuery
+
+BUSY_SECONDS = 3.0
+
+SEARCHES = {
+    "find": lambda cache, search, deadline: cache.find(search, deadline=deadline),
+    "find_page": lambda cache, search, deadline: cache.find_page(search, 0, 10, deadline=deadline),
+    "results": lambda cache, search, deadline: cache.results(search, deadline=deadline),
+    "find_after": lambda cache, search, deadline: cache.find_after(search, None, 10, deadline=deadline),
+}
+
+
+@pytest.fixture
+def busy_parallel():
+    parallel = ParallelFilter(workers=1, threshold=1, chunk_size=500)
+    # The only worker is taken, so nothing the cache hands out gets an answer in time.
+    parallel._submit(time.sleep, BUSY_SECONDS)
+    yield parallel
+    parallel.close()
+
+
+@pytest.mark.parametrize("method", sorted(SEARCHES))
+def test_parallel_text_match_gives_up_at_the_deadline(make_events, busy_parallel, method):
+    cache = EventCache(parallel=busy_parallel)
+    cache.append(make_events(2000))
+    cache.complete_refresh()
+    # raw_log and command are per-row text, which goes to the workers.
+    search = SearchQuery.from_filters(query="kernel: event 1")
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        SEARCHES[method](cache, search, Deadline(0.2))
+    assert time.monotonic() - started < BUSY_SECONDS / 2
+
+    # The cache lock went with the timeout: other requests aren't stuck behind the workers.
+    found = []
+    reader = threading.Thread(target=lambda: found.append(cache.find(SearchQuery.from_filters(severity="high"))))
+    reader.start()
+    reader.join(1.0)
+    assert found and found[0]
+
+
+def test_text_match_without_workers_ignores_the_deadline(make_events):
+    cache = EventCache()
+    events = make_events(2000)
+    cache.append(events)
+    cache.complete_refresh()
+    search = SearchQuery.from_filters(query="kernel: event 1")
+
+    assert len(cache.find(search, deadline=Deadline(0))) == len(search.filter(events))
+
+
+def test_async_repository_keeps_cache_work_off_the_event_loop(
+    database_server, async_database_client, make_events, busy_parallel
+):
+    server = database_server(make_events(2000))
+
+    async def run():
+        client = async_database_client(server)
+        # Refreshed on every call, so the version check below runs a refresh too.
+        cache = EventCache(refresh_interval=0, parallel=busy_parallel)
+        repository = AsyncEventRepository(client, cache)
+        gaps = []
+
+        async def tick():
+            last = time.monotonic()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        async def check_version():
+            # Asked for while the scan below holds the cache lock in its worker thread.
+            await asyncio.sleep(0.1)
+            return await repository.results_version()
+
+        try:
+            await repository.find_filtered(severity="high")
+            version = cache.version
+            server.insert(client.SECURITY_EVENTS_COLLECTION, make_events(500, start=2000))
+            ticker = asyncio.ensure_future(tick())
+            scan, checked = await asyncio.gather(
+                repository.find_filtered(query="kernel: event 1", deadline=Deadline(0.5)),
+                check_version(),
+                return_exceptions=True
+            )
+            ticker.cancel()
+            return scan, checked, version, cache.stats()["events"], gaps
+        finally:
+            await client.close()
+
+    scan, checked, version, cached, gaps = asyncio.run(run())
+    assert isinstance(scan, TimeoutError)
+    assert checked > version
+    assert cached == 2500
+    assert len(gaps) >= 10
+    assert max(gaps) < 0.2
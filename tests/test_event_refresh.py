@@ -0,0 +1,205 @@
+import asyncio
+import random
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from data.async_client import AsyncDatabaseClient
+from data.client import DatabaseClient
+from data.dashboard import DashboardAggregator, _aggregate_dashboard_data
+from data.event_cache import EventCache, _encode_snapshot
+from data.event_snapshot import EventSnapshot, write_snapshot
+from data.exceptions import TimeoutError
+from data.repository import AsyncEventRepository, EventRepository, _latest_events
+from data.rollups import DAY, TimelineQuery
+
+BATCH_SIZE = 100
+WINDOW = 500
+
+
+class _CutShortClient(DatabaseClient):
+    # Cursors stop after `cut_after` batches, the way a refresh runs out of time.
+    cut_after: Optional[int] = None
+
+    def iter_find_batches(self, collection, query=None, batch_size=BATCH_SIZE, fields=None, deadline=None):
+        batches = super().iter_find_batches(collection, query, batch_size, fields, deadline)
+        with closing(batches):
+            for count, batch in enumerate(batches):
+                if self.cut_after is not None and count >= self.cut_after:
+                    raise TimeoutError("Deadline exceeded while reading the cursor")
+                yield batch
+
+
+class _AsyncCutShortClient(AsyncDatabaseClient):
+    cut_after: Optional[int] = None
+
+    async def iter_find_batches(self, collection, query=None, batch_size=BATCH_SIZE, fields=None, deadline=None):
+        batches = super().iter_find_batches(collection, query, batch_size, fields, deadline)
+        try:
+            count = 0
+            async for batch in batches:
+                if self.cut_after is not None and count >= self.cut_after:
+                    raise TimeoutError("Deadline exceeded while reading the cursor")
+                count += 1
+                yield batch
+        finally:
+            await batches.aclose()
+
+
+def _shuffled(events: List[Dict[str, Any]], seed: int) -> List[Dict[str, Any]]:
+    # Stored, and so returned, in no particular _id order.
+    events = list(events)
+    random.Random(seed).shuffle(events)
+    return events
+
+
+def _ids(events: List[Dict[str, Any]]) -> List[Any]:
+    return sorted(event["_id"] for event in events)
+
+
+@pytest.fixture
+def events(make_events) -> List[Dict[str, Any]]:
+    return _shuffled(make_events(2000), seed=1)
+
+
+@pytest.fixture
+def more_events(make_events) -> List[Dict[str, Any]]:
+    return _shuffled(make_events(1000, start=2000), seed=2)
+
+
+def test_cut_short_cache_refresh_loses_no_events(database_server, database_config, events, more_events):
+    server = database_server(events)
+    client = _CutShortClient(database_config(server))
+    cache = EventCache(refresh_interval=0)
+    aggregator = DashboardAggregator(WINDOW)
+    repository = EventRepository(client, cache, aggregator)
+    try:
+        client.cut_after = 5
+        assert not repository._cache_ready(None)
+        assert cache.delta_query() == {}
+        assert cache.stats()["events"] == 5 * BATCH_SIZE
+
+        client.cut_after = None
+        assert _ids(repository.find_filtered()) == _ids(events)
+        assert cache.stats()["events"] == len(events)
+        assert aggregator.snapshot() == _aggregate_dashboard_data(_latest_events(events, WINDOW))
+
+        server.insert(client.SECURITY_EVENTS_COLLECTION, more_events)
+        client.cut_after = 3
+        # A failed refresh leaves the cache usable.
+        assert repository._cache_ready(None)
+        assert cache.delta_query() == {"_id": {"$gt": 1999}}
+        client.cut_after = 2
+        assert repository._cache_ready(None)
+
+        client.cut_after = None
+        everything = events + more_events
+        assert _ids(repository.find_filtered()) == _ids(everything)
+        assert cache.stats()["events"] == len(everything)
+        assert cache.delta_query() == {"_id": {"$gt": 2999}}
+        assert aggregator.snapshot() == _aggregate_dashboard_data(_latest_events(everything, WINDOW))
+    finally:
+        client.close()
+
+
+def test_cut_short_dashboard_refresh_counts_every_event_once(database_server, database_config, events, more_events):
+    server = database_server(events)
+    client = _CutShortClient(database_config(server))
+    aggregator = DashboardAggregator(WINDOW, rollup_retention={DAY: None})
+    repository = EventRepository(client, aggregator=aggregator)
+    timeline = TimelineQuery(resolution=DAY)
+    try:
+        client.cut_after = 4
+        with pytest.raises(TimeoutError):
+            repository.dashboard_data()
+        assert aggregator.delta_query() == {}
+
+        client.cut_after = None
+        assert repository.dashboard_data() == _aggregate_dashboard_data(_latest_events(events, WINDOW))
+
+        server.insert(client.SECURITY_EVENTS_COLLECTION, more_events)
+        client.cut_after = 2
+        with pytest.raises(TimeoutError):
+            repository.dashboard_data()
+
+        client.cut_after = None
+        everything = events + more_events
+        assert repository.dashboard_data() == _aggregate_dashboard_data(_latest_events(everything, WINDOW))
+        assert aggregator.delta_query() == {"_id": {"$gt": 2999}}
+        # Rollups count every event ever added: once each, however many refreshes it took.
+        assert repository.timeline(timeline) == EventRepository(client).timeline(timeline)
+    finally:
+        client.close()
+
+
+def test_cut_short_async_cache_refresh_loses_no_events(database_server, database_config, events, more_events):
+    server = database_server(events)
+
+    async def run():
+        client = _AsyncCutShortClient(database_config(server))
+        cache = EventCache(refresh_interval=0)
+        aggregator = DashboardAggregator(WINDOW)
+        repository = AsyncEventRepository(client, cache, aggregator)
+        try:
+            client.cut_after = 5
+            assert not await repository._cache_ready(None)
+            assert cache.delta_query() == {}
+
+            client.cut_after = None
+            await repository.find_filtered()
+            server.insert(client.SECURITY_EVENTS_COLLECTION, more_events)
+            client.cut_after = 3
+            assert await repository._cache_ready(None)
+
+            client.cut_after = None
+            return await repository.find_filtered(), cache.stats()["events"], aggregator.snapshot()
+        finally:
+            await client.close()
+
+    found, cached, snapshot = asyncio.run(run())
+    everything = events + more_events
+    assert _ids(found) == _ids(everything)
+    assert cached == len(everything)
+    assert snapshot == _aggregate_dashboard_data(_latest_events(everything, WINDOW))
+
+
+def test_async_warm_start_seeds_the_aggregator_off_the_event_loop(
+    tmp_path, database_server, database_config, make_events
+):
+    events = make_events(50000)
+    path = str(tmp_path / "events.snapshot")
+    loaded = EventCache()
+    loaded.append(events)
+    loaded.complete_refresh()
+    write_snapshot(path, *_encode_snapshot(loaded._columns))
+    server = database_server(events)
+
+    async def run():
+        client = AsyncDatabaseClient(database_config(server))
+        cache = EventCache(snapshot=EventSnapshot(path))
+        assert cache.snapshot.loads == 1
+        aggregator = DashboardAggregator(WINDOW)
+        repository = AsyncEventRepository(client, cache, aggregator)
+        gaps = []
+
+        async def tick():
+            last = time.monotonic()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        ticker = asyncio.ensure_future(tick())
+        try:
+            # Replays every event loaded from the snapshot into the aggregator.
+            return await repository.dashboard_data(), gaps
+        finally:
+            ticker.cancel()
+            await client.close()
+
+    dashboard, gaps = asyncio.run(run())
+    assert dashboard == _aggregate_dashboard_data(_latest_events(events, WINDOW))
+    assert max(gaps, default=0) < 0.2
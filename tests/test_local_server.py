@@ -0,0 +1,236 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from benchmarks.events import SEVERITIES
+from core.message_framing import FrameDecoder, MessageFraming
+from data.client import DatabaseClient
+from data.local_server import LocalDatabaseServer
+from data.multiplex import MULTIPLEX_FEATURE, MultiplexedConnection
+
+SLOW = "slow_events"
+SLOW_SECONDS = 0.3
+
+
+class _SlowCollectionServer(LocalDatabaseServer):
+    # Finds on SLOW take a while, so responses to requests sent after them overtake them.
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get("collection") == SLOW:
+            time.sleep(SLOW_SECONDS)
+        return super()._dispatch(request)
+
+
+class _LegacyServer(LocalDatabaseServer):
+    # A server from before the hello handshake.
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get("operation") == "hello":
+            return {"status": "error", "message": "Unsupported operation: hello"}
+        return super()._dispatch(request)
+
+
+def _find(collection: str, query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"database": "siem", "operation": "find", "collection": collection, "query": query or {}}
+
+
+def _send(sock: socket.socket, request: Dict[str, Any], request_id: Optional[int] = None) -> None:
+    sock.sendall(MessageFraming.frame_message(json.dumps(request), request_id))
+
+
+def _receive(sock: socket.socket):
+    decoder = FrameDecoder()
+    decoder.read_frame(sock)
+    return decoder.request_id, decoder.decode_json()
+
+
+def _connect(server: LocalDatabaseServer, features: List[str]) -> socket.socket:
+    sock = socket.create_connection(server.address, timeout=5.0)
+    if features:
+        _send(sock, {"database": "siem", "operation": "hello", "features": features})
+        _, response = _receive(sock)
+        assert response["status"] == "ok"
+    return sock
+
+
+@pytest.fixture
+def slow_server(database_server, make_events):
+    server = database_server(make_events(50), server_class=_SlowCollectionServer)
+    server.insert(SLOW, make_events(5, start=1000))
+    return server
+
+
+def test_tagged_responses_come_back_out_of_order(slow_server):
+    with _connect(slow_server, [MULTIPLEX_FEATURE]) as sock:
+        _send(sock, _find(SLOW), request_id=7)
+        _send(sock, _find(DatabaseClient.SECURITY_EVENTS_COLLECTION, {"severity": "high"}), request_id=8)
+
+        first_id, first = _receive(sock)
+        second_id, second = _receive(sock)
+
+    assert (first_id, second_id) == (8, 7)
+    assert first["data"] and all(event["severity"] == "high" for event in first["data"])
+    assert len(second["data"]) == 5
+
+
+def test_hello_without_multiplex_leaves_connection_untagged(slow_server):
+    with _connect(slow_server, ["compression"]) as sock:
+        _send(sock, _find(SLOW), request_id=1)
+        # The server drops the connection rather than answer out of turn.
+        with pytest.raises((ConnectionError, OSError)):
+            _receive(sock)
+
+
+def test_tagged_frame_before_hello_is_rejected(slow_server):
+    with _connect(slow_server, []) as sock:
+        _send(sock, _find(SLOW), request_id=1)
+        with pytest.raises((ConnectionError, OSError)):
+            _receive(sock)
+
+
+def test_untagged_requests_after_hello_are_answered_in_order(slow_server):
+    with _connect(slow_server, [MULTIPLEX_FEATURE]) as sock:
+        _send(sock, _find(SLOW))
+        _send(sock, _find(DatabaseClient.SECURITY_EVENTS_COLLECTION))
+
+        first_id, first = _receive(sock)
+        second_id, second = _receive(sock)
+
+    assert (first_id, second_id) == (None, None)
+    assert (len(first["data"]), len(second["data"])) == (5, 50)
+
+
+def test_multiplexed_connection_matches_responses_to_requests(slow_server):
+    mux = MultiplexedConnection(_connect(slow_server, [MULTIPLEX_FEATURE]))
+    results: Dict[str, Any] = {}
+    finished: List[str] = []
+
+    def request(name: str, collection: str, severity: str) -> None:
+        payload = mux.request(json.dumps(_find(collection, {"severity": severity})), timeout=5.0)
+        results[name] = json.loads(payload)["data"]
+        finished.append(name)
+
+    threads = [threading.Thread(target=request, args=("slow", SLOW, "low"))]
+    threads += [
+        threading.Thread(target=request, args=(severity, DatabaseClient.SECURITY_EVENTS_COLLECTION, severity))
+        for severity in SEVERITIES
+    ]
+    try:
+        threads[0].start()
+        time.sleep(0.05)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join(5.0)
+    finally:
+        mux.close()
+
+    assert finished[-1] == "slow"
+    assert all(event["severity"] == "low" for event in results["slow"])
+    assert sum(len(results[severity]) for severity in SEVERITIES) == 50
+    for severity in SEVERITIES:
+        assert results[severity]
+        assert all(event["severity"] == severity for event in results[severity])
+
+
+def test_abandoned_request_does_not_break_the_connection(slow_server):
+    mux = MultiplexedConnection(_connect(slow_server, [MULTIPLEX_FEATURE]))
+    try:
+        with pytest.raises(socket.timeout):
+            mux.request(json.dumps(_find(SLOW)), timeout=0.05)
+        payload = mux.request(json.dumps(_find(DatabaseClient.SECURITY_EVENTS_COLLECTION)), timeout=5.0)
+        assert len(json.loads(payload)["data"]) == 50
+
+        # The late response to the abandoned request is dropped, not handed to the next caller.
+        time.sleep(SLOW_SECONDS)
+        payload = mux.request(json.dumps(_find(DatabaseClient.SECURITY_EVENTS_COLLECTION)), timeout=5.0)
+        assert len(json.loads(payload)["data"]) == 50
+        assert mux.is_open and mux.in_flight == 0
+    finally:
+        mux.close()
+
+
+def test_client_shares_one_connection_for_concurrent_finds(slow_server, database_client):
+    client = database_client(slow_server, multiplex=True, compression="zlib")
+    results: Dict[str, List[Dict[str, Any]]] = {}
+
+    def find(name: str, collection: str) -> None:
+        results[name] = client.find(collection)
+
+    threads = [threading.Thread(target=find, args=(SLOW, SLOW))]
+    threads += [
+        threading.Thread(target=find, args=(f"events-{i}", DatabaseClient.SECURITY_EVENTS_COLLECTION))
+        for i in range(4)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5.0)
+
+    assert time.perf_counter() - started < 2 * SLOW_SECONDS
+    assert len(results[SLOW]) == 5
+    assert all(len(results[f"events-{i}"]) == 50 for i in range(4))
+    assert client._multiplex_enabled
+    assert slow_server.connections_accepted == 1
+
+
+@pytest.mark.parametrize("server_class, features", [
+    (LocalDatabaseServer, []),
+    (LocalDatabaseServer, ["compression"]),
+    (_LegacyServer, None),
+])
+def test_client_falls_back_to_pooled_connections(database_server, database_client, make_events, server_class, features):
+    kwargs = {} if features is None else {"features": features}
+    server = database_server(make_events(30), server_class=server_class, **kwargs)
+    client = database_client(server, multiplex=True)
+
+    assert len(client.find_security_events({"severity": "high"})) == len(
+        [event for event in make_events(30) if event["severity"] == "high"]
+    )
+    assert not client._multiplex_enabled
+    assert client._get_multiplexed_connection() is None
+    assert len(client.find_security_events()) == 30
+
+
+def test_async_client_multiplexes_out_of_order(slow_server, async_database_client):
+    async def run():
+        client = async_database_client(slow_server, multiplex=True)
+        try:
+            order: List[str] = []
+
+            async def find(name: str, collection: str) -> List[Dict[str, Any]]:
+                data = await client.find(collection)
+                order.append(name)
+                return data
+
+            slow = asyncio.ensure_future(find("slow", SLOW))
+            await asyncio.sleep(0.05)
+            fast = await find("fast", DatabaseClient.SECURITY_EVENTS_COLLECTION)
+            return order, await slow, fast, client._multiplex_enabled
+        finally:
+            await client.close()
+
+    order, slow, fast, multiplexed = asyncio.run(run())
+    assert order == ["fast", "slow"]
+    assert (len(slow), len(fast)) == (5, 50)
+    assert multiplexed
+    assert slow_server.connections_accepted == 1
+
+
+def test_async_client_falls_back_without_hello(database_server, async_database_client, make_events):
+    server = database_server(make_events(30), server_class=_LegacyServer)
+
+    async def run():
+        client = async_database_client(server, multiplex=True)
+        try:
+            return await client.find_security_events(), client._multiplex_enabled
+        finally:
+            await client.close()
+
+    events, multiplexed = asyncio.run(run())
+    assert len(events) == 30
+    assert not multiplexed
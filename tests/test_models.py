@@ -0,0 +1,70 @@
+import gc
+import json
+
+from benchmarks.events import synthetic_events
+from core.models import MISSING, SecurityEvent, pack_event, unpack_event
+from data.search_results import EventListResults
+
+
+def test_from_dict_defaults_missing_fields():
+    event = SecurityEvent.from_dict({"hostname": "web1"})
+
+    assert event.hostname == "web1"
+    assert (event.id, event.timestamp, event.severity, event.raw_log) == (None, "", "", "")
+    assert (event.user, event.process, event.command) == (None, None, None)
+
+
+def test_to_dict_has_every_field():
+    event = SecurityEvent.from_dict({"_id": 7, "hostname": "web1", "agent_last_seen": "2024-01-01"})
+
+    assert event.to_dict() == {
+        "_id": 7, "timestamp": "", "hostname": "web1", "source": "", "event_type": "",
+        "severity": "", "user": None, "process": None, "command": None, "raw_log": ""
+    }
+
+
+def test_security_event_is_a_mutable_record():
+    event = SecurityEvent.from_dict({"_id": 1, "severity": "low"})
+    event.severity = "high"
+
+    assert event.to_dict()["severity"] == "high"
+    assert event == SecurityEvent.from_dict({"_id": 1, "severity": "high"})
+    assert event != tuple(event.to_dict().values())
+
+
+def test_packed_rows_give_back_the_document():
+    documents = json.loads(json.dumps(synthetic_events(500)))
+    documents[3].pop("user", None)
+    documents[4]["user"] = None
+    documents[5]["nested"] = {"a": [1, 2]}
+
+    rows = [pack_event(document) for document in documents]
+
+    assert [unpack_event(row) for row in rows] == documents
+    assert MISSING not in unpack_event(rows[3]).values()
+    assert "user" not in unpack_event(rows[3])
+
+
+def test_packed_rows_share_categorical_values_and_leave_the_gc():
+    documents = json.loads(json.dumps(synthetic_events(200)))
+    rows = [pack_event(document) for document in documents]
+    gc.collect()
+
+    # Extras and the MISSING marker are objects the GC has to follow.
+    plain = [row for row in rows if row[-1] is None and MISSING not in row]
+    assert len(plain) > len(rows) // 2
+    assert not any(gc.is_tracked(row) for row in plain)
+    hosts = {}
+    for row in rows:
+        assert hosts.setdefault(row[2], row[2]) is row[2]
+
+
+def test_event_list_results_pages():
+    documents = json.loads(json.dumps(synthetic_events(300)))
+    results = EventListResults(documents, version=3)
+
+    assert (results.total, results.version) == (300, 3)
+    assert results.page(0, 50) == documents[:50]
+    assert results.page(280, 50) == documents[280:]
+    assert results.page(400, 50) == []
+    assert 0 < results.nbytes
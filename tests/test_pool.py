@@ -0,0 +1,54 @@
+import asyncio
+import socket
+
+from data.pool import ConnectionPool
+
+
+def test_pool_opens_min_size_connections_on_first_use(database_server, database_client, make_events):
+    client = database_client(database_server(make_events(10)), pool_min_size=3)
+    assert client.pool_stats()["size"] == 0
+
+    assert len(client.find_security_events({})) == 10
+
+    assert client.pool_stats() == {"size": 3, "idle": 3, "in_use": 0, "max_size": 10}
+
+
+def test_async_pool_opens_min_size_connections_on_first_use(
+    database_server, async_database_client, make_events
+):
+    server = database_server(make_events(10))
+
+    async def run():
+        client = async_database_client(server, pool_min_size=3)
+        try:
+            before = client.pool_stats()["size"]
+            found = await client.find_security_events({})
+            return before, len(found), client.pool_stats()
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == (0, 10, {"size": 3, "idle": 3, "in_use": 0, "max_size": 10})
+
+
+def test_pool_tops_up_after_dropping_below_min_size(database_server):
+    server = database_server()
+    opened = []
+
+    def connect(timeout):
+        opened.append(socket.create_connection((server.host, server.port), timeout))
+        return opened[-1]
+
+    pool = ConnectionPool(connect, min_size=2, max_size=4)
+    try:
+        conn = pool.acquire()
+        assert (len(opened), pool.stats()["idle"]) == (2, 1)
+        pool.discard(conn)
+        pool.discard(pool.acquire())
+        assert pool.stats()["size"] == 0
+
+        # Having to connect again brings the pool back up to min_size.
+        pool.release(pool.acquire())
+        assert len(opened) == 4
+        assert pool.stats() == {"size": 2, "idle": 2, "in_use": 0, "max_size": 4}
+    finally:
+        pool.close()
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from benchmarks.events import synthetic_events
+from data.event_cache import EventCache
+from data.query_translator import SUPPORTED_OPERATORS, translate_filters
+from data.repository import EventRepository
+from data.search_query import DateRange, SearchQuery
+from data.timestamps import parse_event_date
+
+FILTERS = [
+    {"start_date": "2024-03-01"},
+    {"end_date": "2024-06-30"},
+    {"start_date": "2024-03-01", "end_date": "2024-06-30"},
+    {"start_date": "2024-03-05", "end_date": "2024-03-05"},
+    {"hostname": "host-2", "start_date": "2024-03-01"},
+    {"severity": "high", "end_date": "2024-01-31"},
+    {"query": "kernel", "start_date": "2024-11-01", "event_type": "login"},
+]
+
+# Timestamps the date filters have to treat as datetime.min, and one strptime
+# reads although it isn't zero-padded.
+ODD_TIMESTAMPS = [None, "", "garbage", "not-a-dateZ", "2024-13-45T00:00:00", "2024-3-5T10:00:00", 1709600000]
+
+
+@pytest.fixture(scope="module")
+def events() -> List[Dict[str, Any]]:
+    documents = synthetic_events(3000)
+    for i, timestamp in enumerate(ODD_TIMESTAMPS * 20):
+        document = dict(documents[i], _id=10000 + i)
+        if timestamp is None:
+            del document["timestamp"]
+        else:
+            document["timestamp"] = timestamp
+        documents.append(document)
+    return documents
+
+
+def _reference(
+    events: List[Dict[str, Any]],
+    query: Optional[str] = None,
+    hostname: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    severity: Optional[str] = None,
+    event_type: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    # The date filter from before the query compiler, with the other filters as compiled.
+    filtered = SearchQuery.from_filters(
+        query=query, hostname=hostname, severity=severity, event_type=event_type
+    ).filter(events)
+    if start_date:
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        filtered = [e for e in filtered if _parse(e.get("timestamp", "")) >= start]
+    if end_date:
+        end = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+        filtered = [e for e in filtered if _parse(e.get("timestamp", "")) <= end]
+    return filtered
+
+
+def _parse(timestamp: Any) -> datetime:
+    return parse_event_date(timestamp) if isinstance(timestamp, str) else datetime.min
+
+
+def _ids(events: List[Dict[str, Any]]) -> List[Any]:
+    return sorted(event["_id"] for event in events)
+
+
+def test_end_date_is_not_pushed_down():
+    translation = translate_filters(SUPPORTED_OPERATORS, start_date="2024-03-01", end_date="2024-06-30")
+
+    assert translation.query == {"timestamp": {"$gte": "2024-03-01"}}
+    assert translation.residual.terms == (DateRange(datetime(2024, 3, 1), datetime(2024, 6, 30)),)
+    assert not translation.fully_pushed_down
+
+
+def test_date_range_stays_in_process_without_gte():
+    translation = translate_filters(SUPPORTED_OPERATORS - {"$gte"}, start_date="2024-03-01")
+
+    assert translation.query == {}
+    assert translation.residual.terms == (DateRange(datetime(2024, 3, 1), None),)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_database_and_cache_match_in_process_date_semantics(database_server, database_client, events, filters):
+    # The local server can't compare a number with a date string.
+    server = database_server([e for e in events if not isinstance(e.get("timestamp"), int)])
+    client = database_client(server)
+    documents = server.collections[client.SECURITY_EVENTS_COLLECTION]
+    expected = _ids(_reference(documents, **filters))
+
+    uncached = EventRepository(client)
+    cached = EventRepository(client, cache=EventCache())
+
+    assert expected
+    assert _ids(uncached.find_filtered(**filters)) == expected
+    assert _ids(cached.find_filtered(**filters)) == expected
+    assert _ids(SearchQuery.from_filters(**filters).filter(documents)) == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_in_process_filter_matches_reference_for_any_timestamp_type(events, filters):
+    assert _ids(SearchQuery.from_filters(**filters).filter(events)) == _ids(_reference(events, **filters))
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+
+import data.repository
+from data.external_sort import ExternalSorter
+from data.repository import AsyncEventRepository, EventRepository, _event_order
+
+RUN_SIZE = 300
+
+
+class _RecordingSorter(ExternalSorter):
+    # Small runs, so a few thousand events spill; notes the threads that sort and merge.
+    threads = set()
+
+    def __init__(self, key):
+        super().__init__(key, run_size=RUN_SIZE)
+
+    def spill(self):
+        self.threads.add(threading.current_thread())
+        super().spill()
+
+    def batches(self, batch_size):
+        for batch in super().batches(batch_size):
+            self.threads.add(threading.current_thread())
+            yield batch
+
+
+@pytest.fixture
+def recording_sorter(monkeypatch):
+    _RecordingSorter.threads = set()
+    monkeypatch.setattr(data.repository, "ExternalSorter", _RecordingSorter)
+    return _RecordingSorter
+
+
+def test_iter_filtered_streams_events_in_order(database_server, database_client, make_events, recording_sorter):
+    events = make_events(2000)
+    client = database_client(database_server(events))
+
+    batches = list(EventRepository(client).iter_filtered(severity="high", batch_size=100))
+
+    expected = sorted((e for e in events if e["severity"] == "high"), key=_event_order)
+    assert [event["_id"] for batch in batches for event in batch] == [event["_id"] for event in expected]
+    assert all(len(batch) <= 100 for batch in batches)
+
+
+def test_async_iter_filtered_sorts_and_merges_off_the_event_loop(
+    database_server, async_database_client, make_events, recording_sorter
+):
+    events = make_events(3000)
+    server = database_server(events)
+
+    async def run():
+        client = async_database_client(server)
+        try:
+            repository = AsyncEventRepository(client)
+            return [event async for batch in repository.iter_filtered(batch_size=100) for event in batch]
+        finally:
+            await client.close()
+
+    found = asyncio.run(run())
+
+    assert [event["_id"] for event in found] == [event["_id"] for event in sorted(events, key=_event_order)]
+    assert recording_sorter.threads
+    assert threading.main_thread() not in recording_sorter.threads
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import socket
+import tempfile
+
+import pytest
+
+from data import exceptions
+from data.client import DatabaseClient
+from data.dashboard import DashboardAggregator
+from data.event_cache import EventCache
+from data.repository import AsyncEventRepository, EventRepository
+from data.sidecar_client import AsyncSidecarClient, SidecarClient, SidecarUnavailableError
+from services.event_service import AsyncEventService, EventService
+from services.sidecar import SidecarServer
+
+CLIENTS = [SidecarClient, AsyncSidecarClient]
+
+
+class _TrippedService(EventService):
+    # The database's circuit breaker is open: the sidecar relays when to retry.
+    def get_dashboard_data(self, deadline=None):
+        raise exceptions.CircuitOpenError("Circuit open for the database", retry_after=2.5)
+
+
+@pytest.fixture
+def sidecar_path():
+    # Unix socket paths are short; pytest's tmp_path can be too long for one.
+    with tempfile.TemporaryDirectory(prefix="sidecar") as directory:
+        yield os.path.join(directory, "sidecar.sock")
+
+
+@pytest.fixture
+def sidecar(sidecar_path, database_server, database_config, make_events):
+    servers = []
+
+    def start(service_class=EventService):
+        database = database_server(make_events(500))
+        client = DatabaseClient(database_config(database))
+        repository = EventRepository(client, EventCache(), DashboardAggregator())
+        server = SidecarServer(service_class(repository), sidecar_path)
+        server.start()
+        servers.append((server, client))
+        return server, database
+
+    yield start
+    for server, client in servers:
+        server.stop()
+        client.close()
+
+
+def _call(client_class, path, method, params=None):
+    if client_class is SidecarClient:
+        client = SidecarClient(path, timeout=5.0)
+        try:
+            return client.call(method, params or {})
+        finally:
+            client.close()
+
+    async def run():
+        client = AsyncSidecarClient(path, timeout=5.0)
+        try:
+            return await client.call(method, params or {})
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def _raised(client_class, path, method, params=None):
+    with pytest.raises(Exception) as raised:
+        _call(client_class, path, method, params)
+    return raised.value
+
+
+@pytest.mark.parametrize("client_class", CLIENTS)
+def test_sidecar_answers_like_the_service(sidecar, sidecar_path, client_class):
+    server, _ = sidecar()
+    params = {"filters": {"severity": "high"}, "page": 1, "page_size": 20}
+
+    assert _call(client_class, sidecar_path, "search", params) == server.service.search(**params)
+    assert _call(client_class, sidecar_path, "dashboard") == server.service.get_dashboard_data()
+
+
+def test_stale_socket_is_replaced(sidecar, sidecar_path):
+    # Bound by a sidecar that died without unlinking it: nothing listens any more.
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(sidecar_path)
+    stale.close()
+
+    sidecar()
+
+    assert _call(SidecarClient, sidecar_path, "dashboard")["total_events"] == 500
+
+
+def test_live_sidecar_keeps_its_socket(sidecar, sidecar_path):
+    sidecar()
+
+    with pytest.raises(OSError, match="already listening"):
+        sidecar()
+    assert _call(SidecarClient, sidecar_path, "dashboard")["total_events"] == 500
+
+
+def test_other_files_are_left_alone(sidecar, sidecar_path):
+    with open(sidecar_path, "w") as f:
+        f.write("not a socket")
+
+    with pytest.raises(OSError):
+        sidecar()
+    with open(sidecar_path) as f:
+        assert f.read() == "not a socket"
+
+
+@pytest.mark.parametrize("client_class", CLIENTS)
+def test_known_errors_are_relayed_by_name(sidecar, sidecar_path, client_class):
+    _, database = sidecar(_TrippedService)
+
+    error = _raised(client_class, sidecar_path, "dashboard")
+    assert type(error) is exceptions.CircuitOpenError
+    assert error.retry_after == 2.5
+
+    error = _raised(client_class, sidecar_path, "unknown")
+    assert type(error) is ValueError
+
+    database.stop()
+    error = _raised(client_class, sidecar_path, "search", {"page": 1, "page_size": 20})
+    assert isinstance(error, exceptions.DatabaseError)
+    assert not isinstance(error, SidecarUnavailableError)
+
+
+@pytest.mark.parametrize("client_class", CLIENTS)
+def test_unknown_remote_errors_make_the_sidecar_unavailable(sidecar, sidecar_path, client_class):
+    server, _ = sidecar()
+
+    # A TypeError inside the sidecar is its own failure, not the caller's.
+    error = _raised(client_class, sidecar_path, "search", {"page": 1, "page_size": 20, "bogus": True})
+    assert type(error) is SidecarUnavailableError
+    assert "TypeError" in str(error)
+    assert server.errors == 1
+
+
+@pytest.mark.parametrize("client_class", CLIENTS)
+def test_missing_sidecar_is_unavailable(sidecar_path, client_class):
+    error = _raised(client_class, sidecar_path, "dashboard")
+    assert type(error) is SidecarUnavailableError
+
+
+def test_services_fall_back_to_the_database(
+    sidecar_path, database_server, database_client, async_database_client, make_events
+):
+    database = database_server(make_events(300))
+    client = database_client(database)
+    expected = EventService(EventRepository(client)).search({"severity": "high"}, 1, 20)
+    assert expected["events"]
+
+    sidecar_client = SidecarClient(sidecar_path, timeout=1.0)
+    try:
+        service = EventService(EventRepository(client), sidecar=sidecar_client)
+        assert service.search({"severity": "high"}, 1, 20) == expected
+        assert sidecar_client.failures == 1
+    finally:
+        sidecar_client.close()
+
+    async def run():
+        async_client = async_database_client(database)
+        async_sidecar = AsyncSidecarClient(sidecar_path, timeout=1.0)
+        try:
+            service = AsyncEventService(AsyncEventRepository(async_client), sidecar=async_sidecar)
+            return await service.search({"severity": "high"}, 1, 20), async_sidecar.failures
+        finally:
+            await async_sidecar.close()
+            await async_client.close()
+
+    assert asyncio.run(run()) == (expected, 1)
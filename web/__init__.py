@@ -1,8 +1,12 @@
 from .dependencies import (
     get_config,
     get_auth_service,
-    get_event_service,
-    get_db_client,
+    get_async_event_service,
+    get_async_db_client,
+    close_async_db_client,
+    database_health,
+    cache_stats,
+    get_request_deadline,
     require_auth,
     get_current_user,
     check_auth_status,
@@ -11,8 +15,12 @@ from .dependencies import (
 __all__ = [
     "get_config",
     "get_auth_service",
-    "get_event_service",
-    "get_db_client",
+    "get_async_event_service",
+    "get_async_db_client",
+    "close_async_db_client",
+    "database_health",
+    "cache_stats",
+    "get_request_deadline",
     "require_auth",
     "get_current_user",
     "check_auth_status",
@@ -6,7 +6,7 @@ from fastapi.responses import Response, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 
-from web.dependencies import get_config
+from web.dependencies import get_config, close_async_db_client, database_health, cache_stats
 from web.routers import auth_router, pages_router, api_router
 
 # Загрузка переменных из .env файла
@@ -43,7 +43,9 @@ def create_app() -> FastAPI:
     
     @app.get("/health")
     async def health_check():
-        return {"status": "healthy", "service": "siem-web"}
+        database = database_health()
+        status_text = "healthy" if database["status"] == "ok" else "degraded"
+        return {"status": status_text, "service": "siem-web", "database": database, "caches": cache_stats()}
     
     return app
 
@@ -100,6 +102,7 @@ def _add_lifecycle_events(app: FastAPI) -> None:
         logger.info("SIEM Web Interface shutting down...")
         
         try:
+            await close_async_db_client()
             logger.info("SIEM Web Interface shutdown complete")
         except Exception as e:
             logger.error(f"Error during shutdown: {e}", exc_info=True)
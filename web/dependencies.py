@@ -1,21 +1,64 @@
 import logging
-from typing import Optional
+import threading
+from typing import Optional, Any, Callable, Dict
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
 from core.config import Config, load_config
 from data.client import DatabaseClient, DatabaseConfig
-from data.repository import EventRepository
+from data.async_client import AsyncDatabaseClient
+from data.circuit_breaker import CLOSED
+from data.dashboard import DashboardAggregator
+from data.deadline import Deadline
+from data.event_cache import EventCache
+from data.event_snapshot import EventSnapshot
+from data.parallel_filter import ParallelFilter
+from data.repository import EventRepository, AsyncEventRepository
+from data.sidecar_client import AsyncSidecarClient
 from services.auth_service import AuthService
-from services.event_service import EventService
+from services.dashboard_snapshot import DashboardSnapshotCache, AsyncDashboardSnapshotCache
+from services.event_service import EventService, AsyncEventService
+from services.search_cache import SearchResultCache
 
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBasic(auto_error=False)
 
+
+class _Singleton:
+    # One per process, made on first use. Sync dependencies run in FastAPI's
+    # thread pool, hence the lock.
+    def __init__(self):
+        self.value: Any = None
+        self._lock = threading.Lock()
+    
+    def get(self, create: Callable[[], Any], enabled: bool = True) -> Any:
+        if self.value is None and enabled:
+            with self._lock:
+                if self.value is None:
+                    self.value = create()
+        return self.value
+    
+    def reset(self) -> Any:
+        with self._lock:
+            value, self.value = self.value, None
+        return value
+
+
 _config: Optional[Config] = None
+_async_db_client = _Singleton()
+_parallel_filter = _Singleton()
+_async_event_cache = _Singleton()
+_async_dashboard_aggregator = _Singleton()
+_async_dashboard_snapshots = _Singleton()
+_async_search_results = _Singleton()
+_async_sidecar_client = _Singleton()
+
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+# Leaves time to serialize and send the response before the browser gives up.
+REQUEST_DEADLINE_MARGIN = 0.5
 
 
 def get_config() -> Config:
@@ -25,21 +68,200 @@ def get_config() -> Config:
     return _config
 
 
-def get_db_client(config: Config = Depends(get_config)) -> DatabaseClient:
-    return DatabaseClient(DatabaseConfig(
+def _database_config(config: Config) -> DatabaseConfig:
+    return DatabaseConfig(
         host=config.db_host,
         port=config.db_port,
-        database="siem"
-    ))
+        database="siem",
+        pool_min_size=config.db_pool_min_size,
+        pool_max_size=config.db_pool_max_size,
+        pool_idle_timeout=config.db_pool_idle_timeout,
+        multiplex=config.db_multiplex,
+        query_operators=config.db_query_operators,
+        compression=config.db_compression,
+        compression_threshold=config.db_compression_threshold,
+        circuit_failure_threshold=config.db_circuit_failure_threshold,
+        circuit_reset_timeout=config.db_circuit_reset_timeout
+    )
+
+
+def _create_event_cache(config: Config, parallel: Optional[ParallelFilter]) -> Optional[EventCache]:
+    if config.event_cache_max_bytes == 0:
+        return None
+    return EventCache(
+        max_bytes=config.event_cache_max_bytes,
+        refresh_interval=config.event_cache_refresh_interval,
+        max_staleness=config.event_cache_max_staleness,
+        parallel=parallel,
+        snapshot=_create_event_snapshot(config)
+    )
+
+
+def _create_event_snapshot(config: Config) -> Optional[EventSnapshot]:
+    if config.event_snapshot_path is None:
+        return None
+    return EventSnapshot(config.event_snapshot_path, interval=config.event_snapshot_interval)
+
+
+def _create_dashboard_snapshots(config: Config, cache_class: type) -> Optional[Any]:
+    if config.dashboard_cache_ttl == 0:
+        return None
+    return cache_class(
+        ttl=config.dashboard_cache_ttl,
+        max_staleness=config.dashboard_cache_max_staleness,
+        refresh_timeout=config.web_request_timeout
+    )
+
+
+def _create_search_results(config: Config) -> Optional[SearchResultCache]:
+    if config.search_cache_max_bytes == 0:
+        return None
+    return SearchResultCache(max_bytes=config.search_cache_max_bytes, ttl=config.search_cache_ttl)
+
+
+async def get_async_db_client(config: Config = Depends(get_config)) -> AsyncDatabaseClient:
+    return _async_db_client.get(lambda: AsyncDatabaseClient(_database_config(config)))
+
+
+def _create_parallel_filter(config: Config) -> Optional[ParallelFilter]:
+    if config.parallel_filter_workers == 0:
+        return None
+    return ParallelFilter(workers=config.parallel_filter_workers, threshold=config.parallel_filter_threshold)
+
+
+def get_parallel_filter(config: Config = Depends(get_config)) -> Optional[ParallelFilter]:
+    # One worker pool for the sync and async paths; submitting to it is thread-safe.
+    return _parallel_filter.get(
+        lambda: _create_parallel_filter(config),
+        config.parallel_filter_workers > 0 and config.sidecar_path is None
+    )
+
+
+async def get_async_event_cache(
+    config: Config = Depends(get_config),
+    parallel: Optional[ParallelFilter] = Depends(get_parallel_filter)
+) -> Optional[EventCache]:
+    return _async_event_cache.get(lambda: _create_event_cache(config, parallel), config.sidecar_path is None)
+
+
+def _create_dashboard_aggregator(config: Config) -> DashboardAggregator:
+    return DashboardAggregator(
+        rollup_retention=config.rollup_retention,
+        sketch_range=config.dashboard_sketch_range or None,
+        sketch_top_error=config.dashboard_sketch_top_error,
+        sketch_distinct_error=config.dashboard_sketch_distinct_error
+    )
+
+
+async def get_async_dashboard_aggregator(config: Config = Depends(get_config)) -> Optional[DashboardAggregator]:
+    return _async_dashboard_aggregator.get(
+        lambda: _create_dashboard_aggregator(config), config.sidecar_path is None
+    )
+
+
+async def get_async_dashboard_snapshots(
+    config: Config = Depends(get_config)
+) -> Optional[AsyncDashboardSnapshotCache]:
+    return _async_dashboard_snapshots.get(
+        lambda: _create_dashboard_snapshots(config, AsyncDashboardSnapshotCache)
+    )
+
+
+async def get_async_search_results(config: Config = Depends(get_config)) -> Optional[SearchResultCache]:
+    return _async_search_results.get(lambda: _create_search_results(config), config.sidecar_path is None)
+
+
+async def get_async_sidecar_client(config: Config = Depends(get_config)) -> Optional[AsyncSidecarClient]:
+    return _async_sidecar_client.get(
+        lambda: AsyncSidecarClient(config.sidecar_path, timeout=config.web_request_timeout),
+        config.sidecar_path is not None
+    )
+
+
+def create_sidecar_service(config: Config) -> EventService:
+    # Run by the sidecar process: the cache, aggregator and search results a worker
+    # would otherwise keep, shared by every worker that asks over the socket.
+    parallel = _create_parallel_filter(config)
+    repository = EventRepository(
+        DatabaseClient(_database_config(config)),
+        _create_event_cache(config, parallel),
+        _create_dashboard_aggregator(config),
+        parallel
+    )
+    return EventService(
+        repository,
+        _create_dashboard_snapshots(config, DashboardSnapshotCache),
+        _create_search_results(config)
+    )
+
+
+async def close_async_db_client() -> None:
+    for singleton in (
+        _async_event_cache, _async_dashboard_aggregator, _async_dashboard_snapshots, _async_search_results
+    ):
+        singleton.reset()
+    parallel = _parallel_filter.reset()
+    if parallel is not None:
+        parallel.close()
+    for singleton in (_async_sidecar_client, _async_db_client):
+        closeable = singleton.reset()
+        if closeable is not None:
+            await closeable.close()
+
+
+def database_health() -> Dict[str, Any]:
+    circuits = {}
+    if _async_db_client.value is not None:
+        circuits["async"] = _async_db_client.value.circuit_stats()
+    
+    healthy = all(circuit["state"] == CLOSED for circuit in circuits.values())
+    return {"status": "ok" if healthy else "degraded", "circuits": circuits}
+
+
+def cache_stats() -> Dict[str, Any]:
+    # Hit rates and sizes for tuning the SIEM_*_CACHE_* settings.
+    caches: Dict[str, Any] = {}
+    for name, cache in (
+        ("async_event_cache", _async_event_cache),
+        ("async_dashboard_snapshots", _async_dashboard_snapshots),
+        ("async_search_results", _async_search_results),
+        ("parallel_filter", _parallel_filter),
+        ("async_sidecar", _async_sidecar_client),
+    ):
+        if cache.value is not None:
+            caches[name] = cache.value.stats()
+    return caches
+
+
+def get_request_deadline(request: Request, config: Config = Depends(get_config)) -> Deadline:
+    timeout = config.web_request_timeout
+    header = request.headers.get(REQUEST_TIMEOUT_HEADER)
+    if header:
+        try:
+            requested = float(header)
+            if 0 < requested < timeout:
+                timeout = requested
+        except ValueError:
+            logger.debug(f"Ignoring invalid {REQUEST_TIMEOUT_HEADER} header: {header!r}")
+    
+    return Deadline(max(0.0, timeout - REQUEST_DEADLINE_MARGIN))
 
 
 def get_auth_service(config: Config = Depends(get_config)) -> AuthService:
     return AuthService(config)
 
 
-def get_event_service(db_client: DatabaseClient = Depends(get_db_client)) -> EventService:
-    repository = EventRepository(db_client)
-    return EventService(repository)
+async def get_async_event_service(
+    db_client: AsyncDatabaseClient = Depends(get_async_db_client),
+    cache: Optional[EventCache] = Depends(get_async_event_cache),
+    aggregator: Optional[DashboardAggregator] = Depends(get_async_dashboard_aggregator),
+    snapshots: Optional[AsyncDashboardSnapshotCache] = Depends(get_async_dashboard_snapshots),
+    results: Optional[SearchResultCache] = Depends(get_async_search_results),
+    parallel: Optional[ParallelFilter] = Depends(get_parallel_filter),
+    sidecar: Optional[AsyncSidecarClient] = Depends(get_async_sidecar_client)
+) -> AsyncEventService:
+    repository = AsyncEventRepository(db_client, cache, aggregator, parallel)
+    return AsyncEventService(repository, snapshots, results, sidecar)
 
 
 def require_auth(
@@ -2,24 +2,40 @@ import logging
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 
-from web.dependencies import require_auth, get_event_service
-from services.event_service import EventService
-from data.client import ConnectionError, QueryError, DatabaseError
+from web.dependencies import require_auth, get_async_event_service, get_request_deadline
+from services.event_export import EXPORT_FORMATS, EXPORT_MEDIA_TYPES
+from services.event_service import AsyncEventService
+from data.client import ConnectionError, QueryError, DatabaseError, CircuitOpenError, TimeoutError
+from data.dashboard import _empty_dashboard_data
+from data.deadline import Deadline
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["api"])
 
-def _get_dashboard_field(
-    event_service: EventService,
+# Bundle key -> dashboard data field, the same keys the per-panel routes return.
+DASHBOARD_PANELS = {
+    "agents": "active_agents",
+    "logins": "recent_logins",
+    "hosts": "host_list",
+    "event_types": "events_by_type",
+    "severities": "events_by_severity",
+    "users": "top_users",
+    "processes": "top_processes",
+    "timeline": "event_timeline",
+}
+
+async def _get_dashboard_field(
+    event_service: AsyncEventService,
     field: str,
-    default=None
+    default=None,
+    deadline: Optional[Deadline] = None
 ):
     try:
-        dashboard_data = event_service.get_dashboard_data()
+        dashboard_data = await event_service.get_dashboard_data(deadline)
         
         if "error" in dashboard_data:
             error_msg = dashboard_data["error"]
@@ -41,86 +57,195 @@ def _get_dashboard_field(
         return {"data": default if default else [], "error": str(e)}
 
 
+@router.get("/dashboard")
+async def get_dashboard(
+    username: str = Depends(require_auth),
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
+):
+    logger.debug(f"User {username} requesting dashboard bundle")
+    try:
+        dashboard_data = await event_service.get_dashboard_data(deadline)
+    except Exception as e:
+        logger.error(f"Unexpected error fetching dashboard bundle: {e}", exc_info=True)
+        dashboard_data = _empty_dashboard_data(error=str(e))
+    
+    empty = _empty_dashboard_data()
+    bundle = {
+        panel: dashboard_data.get(field, empty[field])
+        for panel, field in DASHBOARD_PANELS.items()
+    }
+    bundle["total_events"] = dashboard_data.get("total_events", 0)
+    for key in ("distinct_hosts", "distinct_users"):
+        if key in dashboard_data:
+            bundle[key] = dashboard_data[key]
+    if "error" in dashboard_data:
+        logger.error(f"Dashboard bundle retrieval failed: {dashboard_data['error']}")
+        bundle["error"] = dashboard_data["error"]
+    return bundle
+
+
 @router.get("/dashboard/active-agents")
 async def get_active_agents(
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} requesting active agents data")
-    result = _get_dashboard_field(event_service, "active_agents")
+    result = await _get_dashboard_field(event_service, "active_agents", deadline=deadline)
     return {"agents": result} if isinstance(result, list) else {"agents": [], **result}
 
 
 @router.get("/dashboard/recent-logins")
 async def get_recent_logins(
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} requesting recent logins data")
-    result = _get_dashboard_field(event_service, "recent_logins")
+    result = await _get_dashboard_field(event_service, "recent_logins", deadline=deadline)
     return {"logins": result} if isinstance(result, list) else {"logins": [], **result}
 
 
 @router.get("/dashboard/hosts")
 async def get_hosts(
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} requesting hosts data")
-    result = _get_dashboard_field(event_service, "host_list")
+    result = await _get_dashboard_field(event_service, "host_list", deadline=deadline)
     return {"hosts": result} if isinstance(result, list) else {"hosts": [], **result}
 
 
 @router.get("/dashboard/events-by-type")
 async def get_events_by_type(
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} requesting events by type data")
-    result = _get_dashboard_field(event_service, "events_by_type")
+    result = await _get_dashboard_field(event_service, "events_by_type", deadline=deadline)
     return {"event_types": result} if isinstance(result, list) else {"event_types": [], **result}
 
 
 @router.get("/dashboard/events-by-severity")
 async def get_events_by_severity(
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} requesting events by severity data")
-    result = _get_dashboard_field(event_service, "events_by_severity")
+    result = await _get_dashboard_field(event_service, "events_by_severity", deadline=deadline)
     return {"severities": result} if isinstance(result, list) else {"severities": [], **result}
 
 
 @router.get("/dashboard/top-users")
 async def get_top_users(
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} requesting top users data")
-    result = _get_dashboard_field(event_service, "top_users")
+    result = await _get_dashboard_field(event_service, "top_users", deadline=deadline)
     return {"users": result} if isinstance(result, list) else {"users": [], **result}
 
 
 @router.get("/dashboard/top-processes")
 async def get_top_processes(
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} requesting top processes data")
-    result = _get_dashboard_field(event_service, "top_processes")
+    result = await _get_dashboard_field(event_service, "top_processes", deadline=deadline)
     return {"processes": result} if isinstance(result, list) else {"processes": [], **result}
 
 
 @router.get("/dashboard/timeline")
 async def get_event_timeline(
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} requesting event timeline data")
     default_timeline = [{"hour": h, "event_count": 0} for h in range(24)]
-    result = _get_dashboard_field(event_service, "event_timeline", default_timeline)
+    result = await _get_dashboard_field(event_service, "event_timeline", default_timeline, deadline)
     return {"timeline": result} if isinstance(result, list) else {"timeline": default_timeline, **result}
 
+
+@router.get("/timeline")
+async def get_timeline(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    resolution: Optional[str] = None,
+    severity: Optional[str] = None,
+    event_type: Optional[str] = None,
+    hostname: Optional[str] = None,
+    username: str = Depends(require_auth),
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
+):
+    logger.debug(f"User {username} requesting timeline with start={start}, end={end}, "
+                 f"resolution={resolution}, severity={severity}, event_type={event_type}, "
+                 f"hostname={hostname}")
+    
+    try:
+        filters = {
+            "start": start,
+            "end": end,
+            "severity": severity,
+            "event_type": event_type,
+            "hostname": hostname,
+        }
+        
+        return await event_service.get_timeline(filters=filters, resolution=resolution, deadline=deadline)
+        
+    except ValueError as e:
+        logger.warning(f"Invalid timeline request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"Database circuit open during timeline request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database unavailable: {e}",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    except ConnectionError as e:
+        logger.error(f"Database connection error during timeline request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Database connection failed: {e}"
+        )
+    except QueryError as e:
+        logger.error(f"Database query error during timeline request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Database query failed: {e}"
+        )
+    except TimeoutError as e:
+        logger.warning(f"Database timeout during timeline request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Database request timed out: {e}"
+        )
+    except DatabaseError as e:
+        logger.error(f"Database error during timeline request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Database error: {e}"
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error during timeline request: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Timeline failed: {e}"
+        )
+
+
 @router.get("/events")
 async def search_events(
     query: Optional[str] = None,
@@ -129,14 +254,18 @@ async def search_events(
     end_date: Optional[str] = None,
     severity: Optional[str] = None,
     event_type: Optional[str] = None,
+    q: Optional[str] = None,
     page: int = 1,
     page_size: int = 50,
+    after: Optional[str] = None,
+    include_total: bool = False,
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
     logger.debug(f"User {username} searching events with query={query}, hostname={hostname}, "
                  f"start_date={start_date}, end_date={end_date}, severity={severity}, "
-                 f"event_type={event_type}, page={page}, page_size={page_size}")
+                 f"event_type={event_type}, q={q}, page={page}, page_size={page_size}, after={after}")
     
     try:
         filters = {
@@ -146,14 +275,34 @@ async def search_events(
             "end_date": end_date,
             "severity": severity,
             "event_type": event_type,
+            "q": q,
         }
         
-        result = event_service.search(filters=filters, page=page, page_size=page_size)
+        result = await event_service.search(
+            filters=filters, page=page, page_size=page_size, deadline=deadline,
+            after=after, include_total=include_total
+        )
         
-        logger.info(f"Search returned {result['total']} events, showing page {result['page']}/{result['total_pages']}")
+        if after is None:
+            logger.info(f"Search returned {result['total']} events, showing page {result['page']}/{result['total_pages']}")
+        else:
+            logger.info(f"Search returned {len(result['events'])} events after cursor {after!r}")
         
         return result
         
+    except ValueError as e:
+        logger.warning(f"Invalid search request: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except CircuitOpenError as e:
+        logger.warning(f"Database circuit open during event search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database unavailable: {e}",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
     except ConnectionError as e:
         logger.error(f"Database connection error during event search: {e}")
         raise HTTPException(
@@ -166,6 +315,12 @@ async def search_events(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"Database query failed: {e}"
         )
+    except TimeoutError as e:
+        logger.warning(f"Database timeout during event search: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Database request timed out: {e}"
+        )
     except DatabaseError as e:
         logger.error(f"Database error during event search: {e}")
         raise HTTPException(
@@ -189,18 +344,22 @@ async def export_events(
     end_date: Optional[str] = None,
     severity: Optional[str] = None,
     event_type: Optional[str] = None,
+    q: Optional[str] = None,
+    gzip: bool = False,
     username: str = Depends(require_auth),
-    event_service: EventService = Depends(get_event_service)
+    event_service: AsyncEventService = Depends(get_async_event_service),
+    deadline: Deadline = Depends(get_request_deadline)
 ):
-    logger.info(f"User {username} exporting events in {format} format with filters: "
+    logger.info(f"User {username} exporting events in {format} format (gzip={gzip}) with filters: "
                 f"query={query}, hostname={hostname}, start_date={start_date}, "
-                f"end_date={end_date}, severity={severity}, event_type={event_type}")
+                f"end_date={end_date}, severity={severity}, event_type={event_type}, q={q}")
     
-    if format.lower() not in ("json", "csv"):
+    format = format.lower()
+    if format not in EXPORT_FORMATS:
         logger.warning(f"Invalid export format requested: {format}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid export format: {format}. Supported formats: json, csv"
+            detail=f"Invalid export format: {format}. Supported formats: {', '.join(EXPORT_FORMATS)}"
         )
     
     try:
@@ -211,19 +370,20 @@ async def export_events(
             "end_date": end_date,
             "severity": severity,
             "event_type": event_type,
+            "q": q,
         }
         
-        content = event_service.export(filters=filters, format=format)
+        # Streamed as it's written; errors past the first batch can only cut the download short.
+        chunks = await event_service.export(filters=filters, format=format, deadline=deadline, compress=gzip)
         
-        if format.lower() == "csv":
-            media_type = "text/csv"
-            filename = "events_export.csv"
-        else:
-            media_type = "application/json"
-            filename = "events_export.json"
+        media_type = EXPORT_MEDIA_TYPES[format]
+        filename = f"events_export.{format}"
+        if gzip:
+            media_type = "application/gzip"
+            filename += ".gz"
         
-        return Response(
-            content=content,
+        return StreamingResponse(
+            chunks,
             media_type=media_type,
             headers={
                 "Content-Disposition": f'attachment; filename="{filename}"'
@@ -236,6 +396,13 @@ async def export_events(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except CircuitOpenError as e:
+        logger.warning(f"Database circuit open during export: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Database unavailable: {e}",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
     except ConnectionError as e:
         logger.error(f"Database connection error during export: {e}")
         raise HTTPException(
@@ -248,6 +415,12 @@ async def export_events(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"Database query failed: {e}"
         )
+    except TimeoutError as e:
+        logger.warning(f"Database timeout during export: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Database request timed out: {e}"
+        )
     except DatabaseError as e:
         logger.error(f"Database error during export: {e}")
         raise HTTPException(